@@ -0,0 +1,111 @@
+"""Thread-safe in-memory repository with lock-striped storage
+
+InMemoryRepository keeps one plain dict and no locks. Under a threaded
+server a scan such as ``get_by_attribute`` can die with "dictionary
+changed size during iteration" while another request adds a user, and
+two updates of one object can interleave.
+
+ConcurrentInMemoryRepository splits the objects over ``shards`` dicts,
+each guarded by its own lock and picked by the hash of the object id.
+Single-object operations only lock their shard, so writers on different
+objects do not wait for each other. ``get_all`` takes every shard lock
+(always in the same order) just long enough to copy the references, so
+it returns a consistent point-in-time snapshot; scans then run on that
+copy without holding any lock.
+
+Secondary indexes (see :mod:`app.persistence.indexes`) span every
+shard, so they have one more lock, taken before the shard lock by
+writes and alone by index lookups. A unique index check and the write
+it guards happen under that lock, so two threads cannot both insert
+the same email. Repositories without indexes never take it.
+"""
+import threading
+from contextlib import nullcontext
+
+from app.persistence.repository import InMemoryRepository
+
+DEFAULT_SHARDS = 16
+
+
+class ConcurrentInMemoryRepository(InMemoryRepository):
+    """InMemoryRepository safe to share between threads"""
+
+    def __init__(self, shards=DEFAULT_SHARDS, indexes=None):
+        """Create *shards* empty dicts, each with its own lock
+
+        *indexes* lists the secondary indexes to maintain.
+        """
+        if shards < 1:
+            raise ValueError("shards must be a positive integer")
+        self._shards = [{} for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._indexes = list(indexes or [])
+        self._index_lock = threading.Lock()
+
+    def _indexing(self):
+        return self._index_lock if self._indexes else nullcontext()
+
+    def _lookup(self, index, op, value):
+        with self._index_lock:
+            return index.lookup(op, value)
+
+    def _shard(self, obj_id):
+        index = hash(obj_id) % len(self._shards)
+        return self._shards[index], self._locks[index]
+
+    def add(self, obj):
+        """Add an object to the repository
+
+        Raises ValueError, storing nothing, if *obj* breaks a unique index.
+        """
+        shard, lock = self._shard(obj.id)
+        with self._indexing():
+            self._check_indexes(obj)
+            with lock:
+                shard[obj.id] = obj
+            self._reindex(obj)
+
+    def get(self, obj_id):
+        """Retrieve an object by its ID"""
+        shard, lock = self._shard(obj_id)
+        with lock:
+            return shard.get(obj_id)
+
+    def get_all(self):
+        """Retrieve a consistent snapshot of all objects"""
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            objs = []
+            for shard in self._shards:
+                objs.extend(shard.values())
+            return objs
+        finally:
+            for lock in reversed(self._locks):
+                lock.release()
+
+    def update(self, obj_id, data):
+        """Update an object with new data"""
+        shard, lock = self._shard(obj_id)
+        with self._indexing(), lock:
+            obj = shard.get(obj_id)
+            if obj:
+                self._update_indexed(obj, data)
+
+    def delete(self, obj_id):
+        """Delete an object by its ID"""
+        shard, lock = self._shard(obj_id)
+        with self._indexing():
+            with lock:
+                removed = shard.pop(obj_id, None)
+            if removed is not None:
+                self._unindex(obj_id)
+
+    def get_by_attribute(self, attr_name, attr_value):
+        """Find an object by a specific attribute (index or snapshot scan)"""
+        if self._index_for(attr_name, 'eq') is not None:
+            return super().get_by_attribute(attr_name, attr_value)
+        for obj in self.get_all():
+            if hasattr(obj, attr_name) and getattr(obj, attr_name) == attr_value:
+                return obj
+        return None
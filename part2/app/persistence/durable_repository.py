@@ -0,0 +1,375 @@
+"""Durable in-memory repository: operation log plus compacted snapshots
+
+Reads are served from memory exactly like InMemoryRepository. Every
+add/update/delete is also appended to an operation log, and a background
+thread periodically writes a compacted snapshot and starts a new log.
+On startup the repository loads the latest snapshot and replays the logs
+written after it.
+
+Files in ``data_dir`` for the User repository:
+
+    user.snapshot         {"generation": N, "objects": [...]}
+    user.<N>.log          operations since snapshot N (one record per op)
+
+Object references (``place.owner``, ``review.user``...) are stored as ids
+and resolved across repositories by :func:`resolve_references` once every
+repository of the facade is loaded. Back-reference lists (``user.places``,
+``place.reviews``) are not logged; they are rebuilt from the owning side.
+"""
+import glob
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+from app.models.base_model import BaseModel
+from app.persistence.repository import InMemoryRepository
+
+try:
+    import msgpack
+except ImportError:  # optional: only needed for log_format="msgpack"
+    msgpack = None
+
+FSYNC_POLICIES = ('always', 'interval', 'never')
+LOG_FORMATS = ('json', 'msgpack')
+
+# (model name, list attribute) -> (child model name, child attribute)
+BACK_REFERENCES = {
+    ('User', 'places'): ('Place', 'owner'),
+    ('Place', 'reviews'): ('Review', 'place'),
+}
+
+
+class Reference:
+    """Placeholder for a referenced object until it is resolved"""
+    __slots__ = ('id',)
+
+    def __init__(self, obj_id):
+        self.id = obj_id
+
+
+def encode_state(obj):
+    """Turn an object's attributes into a JSON/msgpack friendly dict"""
+    def encode(value):
+        if isinstance(value, (BaseModel, Reference)):
+            return {'$ref': value.id}
+        if isinstance(value, datetime):
+            return {'$dt': value.isoformat()}
+        if isinstance(value, (list, tuple)):
+            return [encode(item) for item in value]
+        return value
+
+    name = type(obj).__name__
+    return {
+        key: encode(value) for key, value in vars(obj).items()
+        if (name, key) not in BACK_REFERENCES
+    }
+
+
+def decode_state(model, state):
+    """Rebuild a *model* instance from :func:`encode_state` output"""
+    def decode(value):
+        if isinstance(value, dict):
+            if '$ref' in value:
+                return Reference(value['$ref'])
+            if '$dt' in value:
+                return datetime.fromisoformat(value['$dt'])
+        if isinstance(value, list):
+            return [decode(item) for item in value]
+        return value
+
+    obj = model.__new__(model)  # skip __init__: state is already validated
+    obj.__dict__.update({key: decode(value) for key, value in state.items()})
+    for (name, attr) in BACK_REFERENCES:
+        if name == model.__name__:
+            setattr(obj, attr, [])
+    return obj
+
+
+def resolve_references(repositories):
+    """Swap Reference placeholders for objects and rebuild back-references
+
+    Safe to call again: back-reference lists are rebuilt from scratch.
+    """
+    by_id = {}
+    for repo in repositories:
+        by_id.update((obj.id, obj) for obj in repo.get_all())
+
+    def resolve(value):
+        if isinstance(value, Reference):
+            return by_id.get(value.id)
+        if isinstance(value, list):
+            return [item for item in map(resolve, value) if item is not None]
+        return value
+
+    for obj in by_id.values():
+        for key, value in list(vars(obj).items()):
+            if isinstance(value, (Reference, list)):
+                setattr(obj, key, resolve(value))
+
+    children = sorted(by_id.values(), key=lambda o: o.created_at)
+    for (parent_name, attr), (child_name, child_attr) in BACK_REFERENCES.items():
+        for obj in by_id.values():
+            if type(obj).__name__ == parent_name:
+                setattr(obj, attr, [])
+        for child in children:
+            if type(child).__name__ != child_name:
+                continue
+            parent = getattr(child, child_attr, None)
+            if parent is not None and type(parent).__name__ == parent_name:
+                getattr(parent, attr).append(child)
+
+
+class _JsonCodec:
+    @staticmethod
+    def dumps(record):
+        return (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
+
+    @staticmethod
+    def iter_records(data):
+        """Yield (record, end offset); stop at a torn or corrupt tail"""
+        offset = 0
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b'\n'):
+                return
+            try:
+                record = json.loads(line)
+            except ValueError:
+                return
+            offset += len(line)
+            yield record, offset
+
+
+class _MsgpackCodec:
+    @staticmethod
+    def dumps(record):
+        return msgpack.packb(record, use_bin_type=True)
+
+    @staticmethod
+    def iter_records(data):
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(data)
+        try:
+            for record in unpacker:
+                yield record, unpacker.tell()
+        except (msgpack.ExtraData, ValueError):
+            return
+
+
+_open_repositories = {}
+_open_lock = threading.Lock()
+
+
+def open_repository(model, data_dir, **options):
+    """Return the process-wide repository for *model* in *data_dir*
+
+    Two repositories appending to the same log would corrupt it, so every
+    facade of the process shares one instance per file.
+    """
+    key = (os.path.abspath(data_dir), model)
+    with _open_lock:
+        repo = _open_repositories.get(key)
+        if repo is None or repo.closed:
+            repo = _open_repositories[key] = DurableInMemoryRepository(
+                model, data_dir, **options
+            )
+        return repo
+
+
+class DurableInMemoryRepository(InMemoryRepository):
+    """InMemoryRepository whose writes survive a restart"""
+
+    def __init__(self, model, data_dir, name=None, log_format='json',
+                 fsync='interval', fsync_interval=1.0, snapshot_interval=300.0,
+                 snapshot_ops=10000, indexes=None):
+        """Load the latest snapshot, replay the log and start appending
+
+        Args:
+            model: class of the stored objects (used to rebuild them)
+            data_dir: directory holding the snapshot and log files
+            name: file prefix (defaults to the lower-case class name)
+            log_format: "json" (JSON lines) or "msgpack"
+            fsync: "always" (every operation), "interval" (at most once
+                   per ``fsync_interval`` seconds) or "never" (OS decides)
+            snapshot_interval: seconds between background snapshots
+                   (0 disables the timer)
+            snapshot_ops: also snapshot after this many logged operations
+            indexes: secondary indexes, rebuilt from the loaded objects
+        """
+        super().__init__(indexes)
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {', '.join(FSYNC_POLICIES)}")
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f"log_format must be one of {', '.join(LOG_FORMATS)}")
+        if log_format == 'msgpack' and msgpack is None:
+            raise ImportError("log_format='msgpack' requires the msgpack package")
+
+        self.model = model
+        self.data_dir = data_dir
+        self.name = name or model.__name__.lower()
+        self.codec = _MsgpackCodec if log_format == 'msgpack' else _JsonCodec
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.snapshot_ops = snapshot_ops
+        self._lock = threading.RLock()
+        self._snapshot_lock = threading.Lock()
+        self._last_fsync = time.monotonic()
+        self._ops_since_snapshot = 0
+        self._closed = threading.Event()
+
+        os.makedirs(data_dir, exist_ok=True)
+        self.generation = self._load()
+        self._log = open(self._log_path(self.generation), 'ab')
+
+        self._timer = None
+        if snapshot_interval:
+            self._timer = threading.Thread(
+                target=self._snapshot_loop, args=(snapshot_interval,),
+                name=f'{self.name}-snapshots', daemon=True,
+            )
+            self._timer.start()
+
+    # -------- repository API --------
+    def add(self, obj):
+        """Add an object and log it"""
+        with self._lock:
+            super().add(obj)
+            self._append({'op': 'put', 'state': encode_state(obj)})
+
+    def update(self, obj_id, data):
+        """Update an object and log its new state"""
+        with self._lock:
+            obj = self.get(obj_id)
+            if obj:
+                self._update_indexed(obj, data)
+                self._append({'op': 'put', 'state': encode_state(obj)})
+
+    def save(self, obj_id):
+        """Log the current state of an object changed in place"""
+        with self._lock:
+            obj = self.get(obj_id)
+            if obj:
+                self._append({'op': 'put', 'state': encode_state(obj)})
+
+    def delete(self, obj_id):
+        """Delete an object and log the deletion"""
+        with self._lock:
+            if obj_id in self._storage:
+                super().delete(obj_id)
+                self._append({'op': 'del', 'id': obj_id})
+
+    # -------- log --------
+    def _log_path(self, generation):
+        return os.path.join(self.data_dir, f'{self.name}.{generation}.log')
+
+    def _snapshot_path(self):
+        return os.path.join(self.data_dir, f'{self.name}.snapshot')
+
+    def _append(self, record):
+        self._log.write(self.codec.dumps(record))
+        self._log.flush()
+        if self.fsync == 'always' or (
+            self.fsync == 'interval'
+            and time.monotonic() - self._last_fsync >= self.fsync_interval
+        ):
+            os.fsync(self._log.fileno())
+            self._last_fsync = time.monotonic()
+        self._ops_since_snapshot += 1
+        if self.snapshot_ops and self._ops_since_snapshot >= self.snapshot_ops:
+            self._ops_since_snapshot = 0
+            threading.Thread(target=self.snapshot, daemon=True).start()
+
+    # -------- startup --------
+    def _load(self):
+        """Load snapshot + logs into memory; return the current generation"""
+        states, generation = {}, 0
+        if os.path.exists(self._snapshot_path()):
+            with open(self._snapshot_path(), 'rb') as f:
+                snapshot = json.load(f)
+            generation = snapshot['generation']
+            states = {state['id']: state for state in snapshot['objects']}
+
+        pattern = re.compile(re.escape(self.name) + r'\.(\d+)\.log$')
+        logs = sorted(
+            (int(m.group(1)), path)
+            for path in glob.glob(os.path.join(self.data_dir, f'{self.name}.*.log'))
+            if (m := pattern.search(path))
+        )
+        for log_generation, path in logs:
+            if log_generation < generation:
+                os.remove(path)  # already folded into the snapshot
+                continue
+            self._replay(path, states)
+            generation = log_generation
+
+        self._storage = {
+            obj_id: decode_state(self.model, state)
+            for obj_id, state in states.items()
+        }
+        for obj in self._storage.values():
+            self._reindex(obj)
+        return generation
+
+    def _replay(self, path, states):
+        with open(path, 'rb') as f:
+            data = f.read()
+        end = 0
+        for record, end in self.codec.iter_records(data):
+            if record['op'] == 'put':
+                states[record['state']['id']] = record['state']
+            else:
+                states.pop(record['id'], None)
+        if end < len(data):
+            # Torn write from a crash: drop the partial record
+            with open(path, 'r+b') as f:
+                f.truncate(end)
+
+    # -------- snapshots --------
+    def snapshot(self):
+        """Write a compacted snapshot and retire the logs it covers
+
+        Only the in-memory encoding and the switch to a new log happen
+        under the write lock; the snapshot is written in the background.
+        """
+        with self._snapshot_lock:
+            with self._lock:
+                if self._log.closed:
+                    return
+                objects = [encode_state(obj) for obj in self._storage.values()]
+                old_generation = self.generation
+                self.generation += 1
+                self._log.flush()
+                os.fsync(self._log.fileno())
+                self._log.close()
+                self._log = open(self._log_path(self.generation), 'ab')
+                self._ops_since_snapshot = 0
+
+            tmp = self._snapshot_path() + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'generation': self.generation, 'objects': objects}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self._snapshot_path())
+            os.remove(self._log_path(old_generation))
+
+    def _snapshot_loop(self, interval):
+        while not self._closed.wait(interval):
+            try:
+                self.snapshot()
+            except OSError:
+                pass  # keep logging; the next round retries
+
+    @property
+    def closed(self):
+        return self._closed.is_set()
+
+    def close(self):
+        """Stop the snapshot timer and flush the log to disk"""
+        self._closed.set()
+        with self._snapshot_lock, self._lock:
+            if not self._log.closed:
+                self._log.flush()
+                os.fsync(self._log.fileno())
+                self._log.close()
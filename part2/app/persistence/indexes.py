@@ -0,0 +1,110 @@
+"""Secondary indexes for InMemoryRepository
+
+An index is declared when the repository is created and kept up to date
+by its add/update/delete methods::
+
+    users = InMemoryRepository(indexes=[UniqueIndex('email')])
+    places = InMemoryRepository(indexes=[SortedIndex('price')])
+
+Hash indexes answer ``get_by_attribute`` and ``eq`` lookups in O(1);
+sorted indexes answer ``lt``/``lte``/``gt``/``gte`` in O(log n).
+Objects must be changed through the repository: an attribute set
+directly on a stored object is not seen by its indexes.
+"""
+from bisect import bisect_left, bisect_right, insort
+from operator import itemgetter
+
+_value = itemgetter(0)
+
+
+class HashIndex:
+    """Maps each value of *attr* to the ids of the objects holding it"""
+
+    unique = False
+    operators = ('eq',)
+
+    def __init__(self, attr):
+        self.attr = attr
+        self._buckets = {}
+        self._values = {}  # obj_id -> indexed value, to remove stale entries
+
+    def check(self, obj):
+        """Raise ValueError if *obj* cannot be inserted (unique indexes)"""
+
+    def insert(self, obj):
+        value = getattr(obj, self.attr, None)
+        self._values[obj.id] = value
+        self._buckets.setdefault(value, set()).add(obj.id)
+
+    def remove(self, obj_id):
+        if obj_id not in self._values:
+            return
+        value = self._values.pop(obj_id)
+        bucket = self._buckets[value]
+        bucket.discard(obj_id)
+        if not bucket:
+            del self._buckets[value]
+
+    def lookup(self, op, value):
+        """Return the ids matching ``attr == value``"""
+        return set(self._buckets.get(value, ()))
+
+
+class UniqueIndex(HashIndex):
+    """HashIndex that rejects a second object with the same non-null value"""
+
+    unique = True
+
+    def check(self, obj):
+        value = getattr(obj, self.attr, None)
+        if value is None:
+            return
+        holders = self._buckets.get(value, set()) - {obj.id}
+        if holders:
+            raise ValueError(f"Duplicate value for unique index {self.attr}: {value!r}")
+
+
+class SortedIndex:
+    """Keeps ``(value, id)`` pairs of *attr* sorted for range lookups
+
+    None values are left out: they never satisfy a comparison.
+    """
+
+    unique = False
+    operators = ('lt', 'lte', 'gt', 'gte')
+
+    def __init__(self, attr):
+        self.attr = attr
+        self._entries = []
+        self._values = {}
+
+    def check(self, obj):
+        """Sorted indexes accept every object"""
+
+    def insert(self, obj):
+        value = getattr(obj, self.attr, None)
+        if value is None:
+            return
+        self._values[obj.id] = value
+        insort(self._entries, (value, obj.id))
+
+    def remove(self, obj_id):
+        if obj_id not in self._values:
+            return
+        entry = (self._values.pop(obj_id), obj_id)
+        del self._entries[bisect_left(self._entries, entry)]
+
+    def lookup(self, op, value):
+        """Return the ids matching ``attr <op> value``"""
+        if value is None:
+            return set()
+        entries = self._entries
+        if op == 'lt':
+            matched = entries[:bisect_left(entries, value, key=_value)]
+        elif op == 'lte':
+            matched = entries[:bisect_right(entries, value, key=_value)]
+        elif op == 'gt':
+            matched = entries[bisect_right(entries, value, key=_value):]
+        else:
+            matched = entries[bisect_left(entries, value, key=_value):]
+        return {obj_id for _, obj_id in matched}
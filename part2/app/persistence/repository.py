@@ -1,6 +1,15 @@
 """Repository pattern implementation for data persistence"""
+import operator
 from abc import ABC, abstractmethod
 
+COMPARATORS = {
+    'eq': operator.eq,
+    'lt': operator.lt,
+    'lte': operator.le,
+    'gt': operator.gt,
+    'gte': operator.ge,
+}
+
 class Repository(ABC):
     """Abstract base class for repository pattern"""
     
@@ -34,17 +43,68 @@ class Repository(ABC):
         """Find an object by a specific attribute"""
         pass
 
+    @abstractmethod
+    def find_by_attribute(self, attr_name, attr_value, op='eq'):
+        """Find every object whose attribute compares *op* to the value"""
+        pass
+
 
 class InMemoryRepository(Repository):
     """In-memory implementation of the repository pattern"""
     
-    def __init__(self):
-        """Initialize the in-memory storage"""
+    def __init__(self, indexes=None):
+        """Initialize the in-memory storage
+
+        *indexes* lists the secondary indexes to maintain (see
+        :mod:`app.persistence.indexes`); lookups on other attributes scan.
+        """
         self._storage = {}
+        self._indexes = list(indexes or [])
+
+    # -------- secondary indexes --------
+    def _index_for(self, attr, op):
+        for index in self._indexes:
+            if index.attr == attr and op in index.operators:
+                return index
+        return None
+
+    def _check_indexes(self, obj):
+        for index in self._indexes:
+            index.check(obj)
+
+    def _reindex(self, obj):
+        for index in self._indexes:
+            index.remove(obj.id)
+            index.insert(obj)
+
+    def _unindex(self, obj_id):
+        for index in self._indexes:
+            index.remove(obj_id)
+
+    def _lookup(self, index, op, value):
+        return index.lookup(op, value)
+
+    def _update_indexed(self, obj, data):
+        """Apply *data* to *obj*; on a unique index clash restore the
+        indexed attributes and raise ValueError"""
+        old = {index.attr: getattr(obj, index.attr, None) for index in self._indexes}
+        obj.update(data)
+        try:
+            self._check_indexes(obj)
+        except ValueError:
+            for attr, value in old.items():
+                setattr(obj, attr, value)
+            raise
+        self._reindex(obj)
 
     def add(self, obj):
-        """Add an object to the repository"""
+        """Add an object to the repository
+
+        Raises ValueError, storing nothing, if *obj* breaks a unique index.
+        """
+        self._check_indexes(obj)
         self._storage[obj.id] = obj
+        self._reindex(obj)
 
     def get(self, obj_id):
         """Retrieve an object by its ID"""
@@ -58,16 +118,45 @@ class InMemoryRepository(Repository):
         """Update an object with new data"""
         obj = self.get(obj_id)
         if obj:
-            obj.update(data)
+            self._update_indexed(obj, data)
 
     def delete(self, obj_id):
         """Delete an object by its ID"""
         if obj_id in self._storage:
             del self._storage[obj_id]
+            self._unindex(obj_id)
 
     def get_by_attribute(self, attr_name, attr_value):
         """Find an object by a specific attribute"""
+        index = self._index_for(attr_name, 'eq')
+        if index is not None:
+            for obj_id in self._lookup(index, 'eq', attr_value):
+                return self.get(obj_id)
+            return None
         for obj in self._storage.values():
             if hasattr(obj, attr_name) and getattr(obj, attr_name) == attr_value:
                 return obj
         return None
+
+    def find_by_attribute(self, attr_name, attr_value, op='eq'):
+        """Find every object whose attribute compares *op* to the value
+
+        *op* is one of eq, lt, lte, gt, gte. An index declared for the
+        attribute and operator answers without scanning.
+        """
+        if op not in COMPARATORS:
+            raise ValueError(f"Unknown operator: {op}")
+        index = self._index_for(attr_name, op)
+        if index is not None:
+            objs = (self.get(obj_id) for obj_id in self._lookup(index, op, attr_value))
+            return [obj for obj in objs if obj is not None]
+        compare = COMPARATORS[op]
+        matches = []
+        for obj in self.get_all():
+            try:
+                matched = compare(getattr(obj, attr_name, None), attr_value)
+            except TypeError:  # e.g. None < 5: never a match
+                matched = False
+            if matched:
+                matches.append(obj)
+        return matches
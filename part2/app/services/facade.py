@@ -1,32 +1,67 @@
 """Facade pattern implementation for simplified access to business logic"""
-from app.persistence.repository import InMemoryRepository
+import threading
+
+from config import Config
+from app.persistence.concurrent_repository import ConcurrentInMemoryRepository
+from app.persistence.durable_repository import open_repository, resolve_references
+from app.persistence.indexes import UniqueIndex
 from app.models.user import User
 from app.models.place import Place
 from app.models.review import Review
 from app.models.amenity import Amenity
 
+# Serializes "is this email free?" + write, which span two repository calls
+_email_lock = threading.Lock()
+
 class HBnBFacade:
     """Facade class for managing all application operations"""
     
-    def __init__(self):
-        """Initialize repositories for all entities"""
-        self.user_repo = InMemoryRepository()
-        self.place_repo = InMemoryRepository()
-        self.review_repo = InMemoryRepository()
-        self.amenity_repo = InMemoryRepository()
+    def __init__(self, data_dir=None):
+        """Initialize repositories for all entities
+
+        With a data directory (argument or REPOSITORY_DATA_DIR) the
+        repositories log every write and reload it on restart. Users
+        are indexed by email, so registration and login look the address
+        up instead of scanning every user.
+        """
+        data_dir = data_dir or Config.REPOSITORY_DATA_DIR
+        if not data_dir:
+            shards = Config.REPOSITORY_SHARDS
+            self.user_repo = ConcurrentInMemoryRepository(
+                shards, indexes=[UniqueIndex('email')])
+            self.place_repo = ConcurrentInMemoryRepository(shards)
+            self.review_repo = ConcurrentInMemoryRepository(shards)
+            self.amenity_repo = ConcurrentInMemoryRepository(shards)
+            return
+
+        options = {
+            'log_format': Config.REPOSITORY_LOG_FORMAT,
+            'fsync': Config.REPOSITORY_FSYNC,
+            'fsync_interval': Config.REPOSITORY_FSYNC_INTERVAL,
+            'snapshot_interval': Config.REPOSITORY_SNAPSHOT_INTERVAL,
+            'snapshot_ops': Config.REPOSITORY_SNAPSHOT_OPS,
+        }
+        self.user_repo = open_repository(User, data_dir,
+                                         indexes=[UniqueIndex('email')], **options)
+        self.place_repo = open_repository(Place, data_dir, **options)
+        self.review_repo = open_repository(Review, data_dir, **options)
+        self.amenity_repo = open_repository(Amenity, data_dir, **options)
+        resolve_references([self.user_repo, self.place_repo,
+                            self.review_repo, self.amenity_repo])
     
     # ========== User Management ==========
     
     def create_user(self, user_data):
         """Create a new user"""
-        # Check if email already exists
-        existing_user = self.get_user_by_email(user_data.get('email', ''))
-        if existing_user:
-            raise ValueError("Email already registered")
-        
-        # Create new user
-        user = User(**user_data)
-        self.user_repo.add(user)
+        with _email_lock:
+            # Check if email already exists
+            existing_user = self.get_user_by_email(user_data.get('email', ''))
+            if existing_user:
+                raise ValueError("Email already registered")
+
+            # Create new user
+            user = User(**user_data)
+            self.user_repo.add(user)
         return user
     
     def get_user(self, user_id):
@@ -47,13 +82,14 @@ class HBnBFacade:
         if not user:
             return None
         
-        # Check email uniqueness if email is being updated
-        if 'email' in user_data and user_data['email'].lower() != user.email:
-            existing = self.get_user_by_email(user_data['email'])
-            if existing:
-                raise ValueError("Email already registered")
-        
-        user.update(user_data)
+        with _email_lock:
+            # Check email uniqueness if email is being updated
+            if 'email' in user_data and user_data['email'].lower() != user.email:
+                existing = self.get_user_by_email(user_data['email'])
+                if existing:
+                    raise ValueError("Email already registered")
+
+            self.user_repo.update(user.id, user_data)
         return user
     
     # ========== Place Management ==========
@@ -93,7 +129,7 @@ class HBnBFacade:
         place_data.pop('owner_id', None)
         place_data.pop('owner', None)
         
-        place.update(place_data)
+        self.place_repo.update(place.id, place_data)
         return place
     
     # ========== Review Management ==========
@@ -142,7 +178,7 @@ class HBnBFacade:
         if not review:
             return None
         
-        review.update(review_data)
+        self.review_repo.update(review.id, review_data)
         return review
     
     def delete_review(self, review_id):
@@ -180,5 +216,5 @@ class HBnBFacade:
         if not amenity:
             return None
         
-        amenity.update(amenity_data)
+        self.amenity_repo.update(amenity.id, amenity_data)
         return amenity
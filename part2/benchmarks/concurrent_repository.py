@@ -0,0 +1,86 @@
+"""
+Read throughput of the in-memory repositories while writes happen.
+
+Reader threads call ``get`` and ``get_by_attribute`` while one writer
+thread keeps adding and deleting objects. The plain InMemoryRepository
+has no locking, so its scans can fail with "dictionary changed size
+during iteration" (counted as errors). ConcurrentInMemoryRepository
+scans a point-in-time snapshot instead.
+
+Usage (from part2/):
+    python -m benchmarks.concurrent_repository [--seconds 3] [--objects 2000]
+"""
+import argparse
+import random
+import threading
+import time
+
+from app.models.amenity import Amenity
+from app.persistence.concurrent_repository import ConcurrentInMemoryRepository
+from app.persistence.repository import InMemoryRepository
+
+
+def run(repo, seconds, readers, objects):
+    ids = []
+    for i in range(objects):
+        amenity = Amenity(f'Amenity {i}')
+        repo.add(amenity)
+        ids.append(amenity.id)
+
+    stop = threading.Event()
+    reads = [0] * readers
+    errors = [0] * readers
+    writes = [0]
+
+    def writer():
+        while not stop.is_set():
+            amenity = Amenity('Temp')
+            repo.add(amenity)
+            repo.delete(amenity.id)
+            writes[0] += 1
+
+    def reader(slot):
+        rng = random.Random(slot)
+        while not stop.is_set():
+            try:
+                for _ in range(50):
+                    repo.get(rng.choice(ids))
+                repo.get_by_attribute('name', 'missing')
+                reads[slot] += 51
+            except RuntimeError:
+                errors[slot] += 1
+
+    threads = [threading.Thread(target=writer)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(reads) / seconds, writes[0] / seconds, sum(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--objects', type=int, default=2000)
+    parser.add_argument('--shards', type=int, default=16)
+    parser.add_argument('--readers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    print(f"{args.objects} objects, 1 writer thread, {args.seconds:g}s per run")
+    for label, factory in (
+        ('InMemoryRepository', InMemoryRepository),
+        (f'Concurrent ({args.shards} shards)',
+         lambda: ConcurrentInMemoryRepository(args.shards)),
+    ):
+        for readers in args.readers:
+            reads, writes, errors = run(factory(), args.seconds, readers,
+                                        args.objects)
+            print(f"{label:>26} {readers:2d} readers: {reads:10.0f} reads/s "
+                  f"{writes:8.0f} writes/s {errors:6d} scan errors")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,16 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     DEBUG = False
 
+    # Durable in-memory repositories (unset = memory only, lost on restart)
+    REPOSITORY_DATA_DIR = os.getenv('REPOSITORY_DATA_DIR')
+    REPOSITORY_LOG_FORMAT = os.getenv('REPOSITORY_LOG_FORMAT', 'json')  # or msgpack
+    REPOSITORY_FSYNC = os.getenv('REPOSITORY_FSYNC', 'interval')  # always/interval/never
+    REPOSITORY_FSYNC_INTERVAL = float(os.getenv('REPOSITORY_FSYNC_INTERVAL', 1.0))
+    REPOSITORY_SNAPSHOT_INTERVAL = float(os.getenv('REPOSITORY_SNAPSHOT_INTERVAL', 300))
+    REPOSITORY_SNAPSHOT_OPS = int(os.getenv('REPOSITORY_SNAPSHOT_OPS', 10000))
+    # Lock stripes of the thread-safe in-memory repositories
+    REPOSITORY_SHARDS = int(os.getenv('REPOSITORY_SHARDS', 16))
+
 class DevelopmentConfig(Config):
     """Development environment configuration"""
     DEBUG = True
@@ -0,0 +1,151 @@
+"""Tests for the thread-safe in-memory repository"""
+import threading
+import unittest
+
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.user import User
+from app.persistence.concurrent_repository import ConcurrentInMemoryRepository
+from app.persistence.indexes import HashIndex, SortedIndex, UniqueIndex
+
+
+class TestConcurrentInMemoryRepository(unittest.TestCase):
+    """Test cases for ConcurrentInMemoryRepository"""
+
+    def setUp(self):
+        self.repo = ConcurrentInMemoryRepository(shards=4)
+
+    def test_basic_operations(self):
+        """add/get/update/delete behave like InMemoryRepository"""
+        wifi = Amenity('Wifi')
+        self.repo.add(wifi)
+        self.assertIs(self.repo.get(wifi.id), wifi)
+        self.repo.update(wifi.id, {'name': 'Fast Wifi'})
+        self.assertIs(self.repo.get_by_attribute('name', 'Fast Wifi'), wifi)
+        self.repo.delete(wifi.id)
+        self.assertIsNone(self.repo.get(wifi.id))
+        self.assertEqual(self.repo.get_all(), [])
+
+    def test_invalid_shard_count(self):
+        with self.assertRaises(ValueError):
+            ConcurrentInMemoryRepository(shards=0)
+
+    def test_scans_survive_concurrent_writes(self):
+        """Snapshots never fail and always see whole add+delete pairs"""
+        for i in range(100):
+            self.repo.add(Amenity(f'Seed {i}'))
+        stop = threading.Event()
+        errors, sizes = [], set()
+
+        def writer():
+            # Each writer holds at most one extra object at a time
+            while not stop.is_set():
+                amenity = Amenity('Temp')
+                self.repo.add(amenity)
+                self.repo.delete(amenity.id)
+
+        def reader():
+            try:
+                for _ in range(200):
+                    self.repo.get_by_attribute('name', 'missing')
+                    sizes.add(len(self.repo.get_all()))
+            except Exception as exc:  # pragma: no cover - reported below
+                errors.append(exc)
+
+        writers = [threading.Thread(target=writer) for _ in range(2)]
+        readers = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in writers + readers:
+            thread.start()
+        for thread in readers:
+            thread.join()
+        stop.set()
+        for thread in writers:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertTrue(sizes <= {100, 101, 102})
+
+
+class TestIndexedConcurrentRepository(unittest.TestCase):
+    """Test cases for secondary indexes on ConcurrentInMemoryRepository"""
+
+    def setUp(self):
+        self.users = ConcurrentInMemoryRepository(
+            shards=4, indexes=[UniqueIndex('email')])
+
+    def make_user(self, email):
+        return User('Jane', 'Doe', email)
+
+    def test_email_lookup_does_not_scan(self):
+        """get_by_attribute on an indexed attribute never copies the shards"""
+        for i in range(50):
+            self.users.add(self.make_user(f'user{i}@example.com'))
+        self.users.get_all = None  # any scan would fail
+        self.assertEqual(
+            self.users.get_by_attribute('email', 'user7@example.com').email,
+            'user7@example.com',
+        )
+        self.assertIsNone(self.users.get_by_attribute('email', 'no@example.com'))
+
+    def test_unique_index_follows_writes(self):
+        """Duplicates are refused; updates and deletes move the entries"""
+        jane = self.make_user('jane@example.com')
+        john = self.make_user('john@example.com')
+        self.users.add(jane)
+        self.users.add(john)
+        with self.assertRaises(ValueError):
+            self.users.add(self.make_user('jane@example.com'))
+        with self.assertRaises(ValueError):
+            self.users.update(john.id, {'email': 'jane@example.com'})
+        self.assertEqual(john.email, 'john@example.com')
+        self.users.update(jane.id, {'email': 'janet@example.com'})
+        self.assertIsNone(self.users.get_by_attribute('email', 'jane@example.com'))
+        self.users.delete(jane.id)
+        self.assertIsNone(self.users.get_by_attribute('email', 'janet@example.com'))
+        self.users.add(self.make_user('janet@example.com'))
+
+    def test_concurrent_duplicates(self):
+        """Only one of many threads adding the same email succeeds"""
+        added, barrier = [], threading.Barrier(8)
+
+        def register():
+            barrier.wait()
+            try:
+                self.users.add(self.make_user('race@example.com'))
+                added.append(True)
+            except ValueError:
+                pass
+
+        threads = [threading.Thread(target=register) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(added), 1)
+        self.assertEqual(len(self.users.get_all()), 1)
+
+    def test_find_by_attribute(self):
+        """Hash and sorted indexes answer the same as a scan"""
+        owner = self.make_user('owner@example.com')
+        indexed = ConcurrentInMemoryRepository(
+            shards=4, indexes=[HashIndex('title'), SortedIndex('price')])
+        plain = ConcurrentInMemoryRepository(shards=4)
+        for title, price in [('Loft', 80.0), ('Hut', 40.0), ('Barn', 40.0),
+                             ('Villa', 300.0)]:
+            place = Place(title, '', price, 1.0, 2.0, owner)
+            indexed.add(place)
+            plain.add(place)
+        for attr, value, op in [('title', 'Hut', 'eq'), ('price', 40.0, 'lte'),
+                                ('price', 40.0, 'gt'), ('price', 300.0, 'lt'),
+                                ('price', 80.0, 'gte')]:
+            self.assertEqual(
+                sorted(p.title for p in indexed.find_by_attribute(attr, value, op)),
+                sorted(p.title for p in plain.find_by_attribute(attr, value, op)),
+            )
+        self.assertEqual(len(indexed.find_by_attribute('price', 40.0, 'lte')), 2)
+        with self.assertRaises(ValueError):
+            plain.find_by_attribute('price', 1, 'between')
+
+
+if __name__ == '__main__':
+    unittest.main()
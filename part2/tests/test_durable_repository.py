@@ -0,0 +1,144 @@
+"""Tests for the durable in-memory repository"""
+import glob
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.user import User
+from app.persistence.durable_repository import DurableInMemoryRepository, msgpack
+from app.services.facade import HBnBFacade
+
+
+class TestDurableInMemoryRepository(unittest.TestCase):
+    """Test cases for logging, replay and snapshots"""
+
+    def setUp(self):
+        """Create an empty data directory, removed after the repositories close"""
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir)
+
+    def open(self, model=Amenity, **options):
+        options.setdefault('snapshot_interval', 0)
+        repo = DurableInMemoryRepository(model, self.data_dir, **options)
+        self.addCleanup(repo.close)
+        return repo
+
+    def test_replay_restores_writes(self):
+        """add/update/delete survive a restart"""
+        repo = self.open(fsync='always')
+        wifi, pool = Amenity('Wifi'), Amenity('Pool')
+        repo.add(wifi)
+        repo.add(pool)
+        repo.update(wifi.id, {'name': 'Fast Wifi'})
+        repo.delete(pool.id)
+        repo.close()
+
+        reopened = self.open()
+        self.assertEqual([a.name for a in reopened.get_all()], ['Fast Wifi'])
+        restored = reopened.get(wifi.id)
+        self.assertEqual(restored.created_at, wifi.created_at)
+        self.assertIsInstance(restored, Amenity)
+
+    def test_snapshot_compacts_the_log(self):
+        """A snapshot replaces the old log and is loaded on restart"""
+        repo = self.open()
+        for i in range(5):
+            repo.add(Amenity(f'Amenity {i}'))
+        repo.snapshot()
+        repo.add(Amenity('After snapshot'))
+        repo.close()
+
+        logs = glob.glob(os.path.join(self.data_dir, 'amenity.*.log'))
+        self.assertEqual([os.path.basename(p) for p in logs], ['amenity.1.log'])
+        self.assertEqual(len(self.open().get_all()), 6)
+
+    def test_snapshot_after_operation_count(self):
+        """snapshot_ops triggers a background snapshot"""
+        repo = self.open(snapshot_ops=3)
+        for i in range(3):
+            repo.add(Amenity(f'Amenity {i}'))
+        for _ in range(100):
+            if os.path.exists(os.path.join(self.data_dir, 'amenity.snapshot')):
+                break
+            time.sleep(0.01)
+        self.assertTrue(os.path.exists(os.path.join(self.data_dir, 'amenity.snapshot')))
+
+    def test_torn_tail_is_dropped(self):
+        """A partial last record (crash mid-write) is ignored and truncated"""
+        repo = self.open()
+        repo.add(Amenity('Wifi'))
+        repo.close()
+        log = os.path.join(self.data_dir, 'amenity.0.log')
+        with open(log, 'ab') as f:
+            f.write(b'{"op":"put","sta')
+
+        self.assertEqual(len(self.open().get_all()), 1)
+        with open(log, 'rb') as f:
+            self.assertTrue(f.read().endswith(b'\n'))
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack_log(self):
+        """The msgpack log format replays like the JSON one"""
+        repo = self.open(log_format='msgpack')
+        repo.add(Amenity('Wifi'))
+        repo.close()
+        self.assertEqual(self.open(log_format='msgpack').get_all()[0].name, 'Wifi')
+
+    def test_invalid_fsync_policy(self):
+        with self.assertRaises(ValueError):
+            self.open(fsync='sometimes')
+
+
+class TestDurableFacade(unittest.TestCase):
+    """Test cases for the facade in durable mode"""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for repo in self.repos:
+            repo.close()
+        shutil.rmtree(self.data_dir)
+
+    def make_facade(self):
+        facade = HBnBFacade(data_dir=self.data_dir)
+        self.repos = [facade.user_repo, facade.place_repo,
+                      facade.review_repo, facade.amenity_repo]
+        return facade
+
+    def test_references_are_restored(self):
+        """Owners, places and reviews are linked again after a restart"""
+        facade = self.make_facade()
+        owner = facade.create_user({'first_name': 'Jane', 'last_name': 'Doe',
+                                    'email': 'jane@example.com'})
+        guest = facade.create_user({'first_name': 'John', 'last_name': 'Doe',
+                                    'email': 'john@example.com'})
+        place = facade.create_place({'title': 'Loft', 'description': '',
+                                     'price': 80.0, 'latitude': 1.0,
+                                     'longitude': 2.0, 'owner_id': owner.id})
+        facade.create_review({'text': 'Great', 'rating': 5,
+                              'user_id': guest.id, 'place_id': place.id})
+        facade.update_user(guest.id, {'first_name': 'Johnny'})
+        for repo in self.repos:
+            repo.close()
+
+        facade = self.make_facade()
+        place = facade.get_place(place.id)
+        self.assertIsInstance(place.owner, User)
+        self.assertIs(place.owner, facade.get_user(owner.id))
+        self.assertEqual(facade.get_user(owner.id).places, [place])
+        self.assertIsInstance(place.reviews[0].place, Place)
+        self.assertEqual(place.reviews[0].user.first_name, 'Johnny')
+        # The email index is rebuilt from the reloaded users
+        self.assertIs(facade.get_user_by_email('jane@example.com'),
+                      facade.get_user(owner.id))
+        with self.assertRaises(ValueError):
+            facade.user_repo.add(User('Jane', 'Twin', 'jane@example.com'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,11 +8,13 @@ from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
 
+from app.persistence.replicas import RoutingSession
+
 # Initialize extensions
 bcrypt = Bcrypt()
 jwt = JWTManager()
-# SQLAlchemy instance reused across the project
-db = SQLAlchemy()
+# SQLAlchemy instance reused across the project; reads may go to replicas
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
 def create_app(config_class="config.DevelopmentConfig"):
@@ -36,6 +38,42 @@ def create_app(config_class="config.DevelopmentConfig"):
     jwt.init_app(app)
     db.init_app(app)  # <‑‑ SQLAlchemy ready (tables will be created later)
 
+    # REPOSITORY_BACKEND: memory / sqlite / mysql / cached (fails fast)
+    from app.persistence.backends import register_repositories
+    register_repositories(app)
+
+    # One commit per request instead of one per repository call
+    from app.persistence.unit_of_work import register_request_scope
+    register_request_scope(app)
+
+    # Round-robin reads over DATABASE_REPLICA_URLS (no-op when unset)
+    from app.persistence.replicas import init_replicas
+    init_replicas(app, db)
+
+    # ID_STRATEGY / ID_BINARY: id generation and VARCHAR(36) vs BINARY(16)
+    from app.models.ids import register_id_storage
+    register_id_storage(app, db)
+
+    # WAL, mmap, busy_timeout... on every SQLite connection
+    from app.persistence.sqlite_pragmas import register_sqlite_pragmas
+    register_sqlite_pragmas(app, db)
+
+    # Checkout latency / in-use / overflow counters for every engine
+    from app.persistence.pool_metrics import register_pool_metrics
+    register_pool_metrics(app, db)
+
+    # Optional single writer thread for facade writes (group commit)
+    from app.persistence.write_dispatcher import register_write_dispatcher
+    register_write_dispatcher(app)
+
+    # `flask audit-indexes`: EXPLAIN the facade's queries, flag full scans
+    from app.persistence.schema_audit import register_schema_audit
+    register_schema_audit(app)
+
+    # `flask repair-ratings`: recompute place rating aggregates
+    from app.persistence.place_ratings import register_rating_repair
+    register_rating_repair(app)
+
     # ── 4. Configure RESTX API shell ───────────────────────────────────────
     api = Api(
         app,
@@ -66,6 +104,7 @@ def create_app(config_class="config.DevelopmentConfig"):
         places_ns,
         reviews_ns,
         amenities_ns,
+        metrics_ns,
     )
 
     api.add_namespace(auth_ns, path="/auth")
@@ -73,5 +112,6 @@ def create_app(config_class="config.DevelopmentConfig"):
     api.add_namespace(places_ns, path="/places")
     api.add_namespace(reviews_ns, path="/reviews")
     api.add_namespace(amenities_ns, path="/amenities")
+    api.add_namespace(metrics_ns, path="/metrics")
 
     return app
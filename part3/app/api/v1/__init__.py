@@ -4,5 +4,7 @@ from app.api.v1.users import api as users_ns
 from app.api.v1.places import api as places_ns
 from app.api.v1.reviews import api as reviews_ns
 from app.api.v1.amenities import api as amenities_ns
+from app.api.v1.metrics import api as metrics_ns
 
-__all__ = ['auth_ns', 'users_ns', 'places_ns', 'reviews_ns', 'amenities_ns']
\ No newline at end of file
+__all__ = ['auth_ns', 'users_ns', 'places_ns', 'reviews_ns', 'amenities_ns',
+           'metrics_ns']
\ No newline at end of file
@@ -2,6 +2,9 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt
 from app.services.facade import HBnBFacade
+from app.api.v1.pagination import (
+    IDS_PARAM, PAGE_PARAMS, batch_response, ids_arg, page_args, page_response
+)
 
 api = Namespace('amenities', description='Amenity operations')
 facade = HBnBFacade()
@@ -11,6 +14,13 @@ amenity_model = api.model('Amenity', {
     'name': fields.String(required=True, description='Name of the amenity')
 })
 
+def amenity_summary(amenity):
+    """Fields shown in amenity listings"""
+    return {
+        'id': amenity.id,
+        'name': amenity.name
+    }
+
 @api.route('/')
 class AmenityList(Resource):
     @jwt_required()
@@ -37,14 +47,21 @@ class AmenityList(Resource):
         except ValueError as e:
             api.abort(400, str(e))
     
+    @api.doc(params=dict(PAGE_PARAMS, **IDS_PARAM))
     @api.response(200, 'List of amenities retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
     def get(self):
-        """Get all amenities (Public)"""
-        amenities = facade.get_all_amenities()
-        return [{
-            'id': amenity.id,
-            'name': amenity.name
-        } for amenity in amenities], 200
+        """Get one page of amenities, or a batch with ?ids= (Public)"""
+        try:
+            ids = ids_arg()
+            if ids is not None:
+                return batch_response(
+                    *facade.get_amenities_by_ids(ids), amenity_summary
+                )
+            amenities, next_cursor = facade.get_amenities_page(*page_args())
+        except ValueError as e:
+            api.abort(400, str(e))
+        return page_response(amenities, next_cursor, amenity_summary)
 
 @api.route('/<string:amenity_id>')
 class AmenityResource(Resource):
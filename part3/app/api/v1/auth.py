@@ -1,10 +1,11 @@
 """Authentication API endpoints"""
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt
-from app.services import facade
+from app.services.facade import HBnBFacade
 
 # Create namespace
 api = Namespace('auth', description='Authentication operations')
+facade = HBnBFacade()
 
 # Model for input validation
 login_model = api.model('Login', {
@@ -72,11 +73,9 @@ class ProtectedResource(Resource):
 class CreateFirstAdmin(Resource):
     def post(self):
         """Create first admin user (TEMPORARY - Remove in production)"""
-        # Check if any admin exists
-        users = facade.get_all_users()
-        for user in users:
-            if user.is_admin:
-                return {'error': 'Admin already exists'}, 400
+        # Check if any admin exists (SELECT 1, no users loaded)
+        if facade.admin_exists():
+            return {'error': 'Admin already exists'}, 400
         
         # Create admin user
         admin_data = {
@@ -0,0 +1,19 @@
+"""Operational metrics endpoints"""
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import jwt_required, get_jwt
+from app.persistence.pool_metrics import pool_metrics
+
+api = Namespace('metrics', description='Operational metrics')
+
+@api.route('/pool')
+class PoolMetricsResource(Resource):
+    @jwt_required()
+    @api.response(200, 'Pool counters retrieved successfully')
+    @api.response(403, 'Admin privileges required')
+    @api.response(401, 'Authentication required')
+    @api.doc(security='Bearer')
+    def get(self):
+        """Get connection-pool counters for every engine (Admin only)"""
+        if not get_jwt().get('is_admin', False):
+            api.abort(403, "Admin privileges required")
+        return pool_metrics(), 200
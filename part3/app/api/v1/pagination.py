@@ -0,0 +1,96 @@
+"""Shared keyset-pagination helpers for the list endpoints"""
+from urllib.parse import urlencode
+
+from flask import current_app, request
+
+# Query parameters documented on every paginated list endpoint
+PAGE_PARAMS = {
+    'cursor': 'Opaque cursor returned in the previous page\'s X-Next-Cursor header',
+    'limit': 'Maximum number of items to return',
+    'order_by': 'created_at (oldest first, default) or -created_at (newest first)',
+}
+
+# Documented on list endpoints that also accept a batch lookup
+IDS_PARAM = {
+    'ids': 'Comma-separated ids to fetch in one request (replaces paging)',
+}
+
+
+def page_args():
+    """Read ``(cursor, limit, order_by)`` from the query string.
+
+    The limit falls back to ``PAGE_SIZE_DEFAULT`` and is capped at
+    ``PAGE_SIZE_MAX``. Raises ValueError on a malformed limit.
+    """
+    cursor = request.args.get('cursor') or None
+    order_by = request.args.get('order_by', 'created_at')
+    raw_limit = request.args.get('limit')
+    if raw_limit is None:
+        limit = current_app.config.get('PAGE_SIZE_DEFAULT', 50)
+    else:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            raise ValueError("limit must be a positive integer")
+    return cursor, min(limit, current_app.config.get('PAGE_SIZE_MAX', 200)), order_by
+
+
+def ids_arg():
+    """Return the ``?ids=a,b,c`` list, or None when the parameter is absent.
+
+    At most ``PAGE_SIZE_MAX`` ids are accepted per request.
+    """
+    raw = request.args.get('ids')
+    if raw is None:
+        return None
+    ids = [obj_id.strip() for obj_id in raw.split(',') if obj_id.strip()]
+    if not ids:
+        raise ValueError("ids must list at least one id")
+    if len(ids) > current_app.config.get('PAGE_SIZE_MAX', 200):
+        raise ValueError("Too many ids requested")
+    return ids
+
+
+def batch_response(found, missing, serialize):
+    """Build the response for an ``?ids=`` batch lookup.
+
+    Objects keep the requested order; ids that do not exist are listed in
+    the ``X-Missing-Ids`` header instead of failing the whole request.
+    """
+    headers = {'X-Missing-Ids': ','.join(missing)} if missing else {}
+    return [serialize(item) for item in found], 200, headers
+
+
+def filter_args(spec):
+    """Build repository filters from the query string.
+
+    *spec* maps a query parameter to ``(filter_key, type)``, e.g.
+    ``{'min_price': ('price__gte', float)}``; absent parameters are skipped
+    and values that do not convert raise ValueError.
+    """
+    filters = {}
+    for param, (key, cast) in spec.items():
+        raw = request.args.get(param)
+        if raw is None or raw == '':
+            continue
+        try:
+            filters[key] = cast(raw)
+        except ValueError:
+            raise ValueError(f"Invalid value for {param}")
+    return filters
+
+
+def page_response(items, next_cursor, serialize):
+    """Build the ``(body, status, headers)`` tuple for a list endpoint.
+
+    The body stays a plain JSON array; the next page is advertised through
+    ``X-Next-Cursor`` and an RFC 8288 ``Link: <...>; rel="next"`` header.
+    """
+    headers = {}
+    if next_cursor:
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        next_url = f"{request.base_url}?{urlencode(args)}"
+        headers['X-Next-Cursor'] = next_cursor
+        headers['Link'] = f'<{next_url}>; rel="next"'
+    return [serialize(item) for item in items], 200, headers
@@ -1,7 +1,12 @@
 ﻿"""Place API endpoints"""
+from flask import current_app
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services.facade import HBnBFacade
+from app.api.v1.pagination import (
+    IDS_PARAM, PAGE_PARAMS, batch_response, filter_args, ids_arg, page_args,
+    page_response
+)
 
 api = Namespace('places', description='Place operations')
 facade = HBnBFacade()
@@ -15,6 +20,15 @@ place_model = api.model('Place', {
     'longitude': fields.Float(required=True, description='Longitude')
 })
 
+# Query-string filters pushed down to the repository
+PLACE_FILTERS = {
+    'owner_id': ('owner_id', str),
+    'min_price': ('price__gte', float),
+    'max_price': ('price__lte', float),
+    'title': ('title__prefix', str),
+    'min_rating': ('rating_avg__gte', float),
+}
+
 place_update_model = api.model('PlaceUpdate', {
     'title': fields.String(description='Title of the place'),
     'description': fields.String(description='Description of the place'),
@@ -23,6 +37,18 @@ place_update_model = api.model('PlaceUpdate', {
     'longitude': fields.Float(description='Longitude')
 })
 
+def place_summary(place):
+    """Fields shown in place listings"""
+    return {
+        'id': place.id,
+        'title': place.title,
+        'price': place.price,
+        'latitude': place.latitude,
+        'longitude': place.longitude,
+        'review_count': place.review_count,
+        'rating_avg': place.rating_avg
+    }
+
 @api.route('/')
 class PlaceList(Resource):
     @jwt_required()
@@ -53,17 +79,29 @@ class PlaceList(Resource):
         except ValueError as e:
             api.abort(400, str(e))
     
+    @api.doc(params=dict(
+        PAGE_PARAMS,
+        **IDS_PARAM,
+        owner_id='Only places owned by this user',
+        min_price='Minimum price per night',
+        max_price='Maximum price per night',
+        title='Title prefix',
+        min_rating='Minimum average rating',
+    ))
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(400, 'Invalid pagination or filter parameters')
     def get(self):
-        """Get all places (Public endpoint)"""
-        places = facade.get_all_places()
-        return [{
-            'id': place.id,
-            'title': place.title,
-            'price': place.price,
-            'latitude': place.latitude,
-            'longitude': place.longitude
-        } for place in places], 200
+        """Get one page of places, or a batch with ?ids= (Public endpoint)"""
+        try:
+            ids = ids_arg()
+            if ids is not None:
+                return batch_response(*facade.get_places_by_ids(ids), place_summary)
+            places, next_cursor = facade.get_places_page(
+                *page_args(), filters=filter_args(PLACE_FILTERS)
+            )
+        except ValueError as e:
+            api.abort(400, str(e))
+        return page_response(places, next_cursor, place_summary)
 
 @api.route('/<string:place_id>')
 class PlaceResource(Resource):
@@ -75,6 +113,10 @@ class PlaceResource(Resource):
         if not place:
             api.abort(404, "Place not found")
         
+        # First page only: the rest via /reviews/places/<id>/reviews?cursor=
+        reviews, next_cursor = facade.get_place_reviews_page(
+            place_id, limit=current_app.config.get('PAGE_SIZE_DEFAULT', 50)
+        )
         return {
             'id': place.id,
             'title': place.title,
@@ -82,7 +124,9 @@ class PlaceResource(Resource):
             'price': place.price,
             'latitude': place.latitude,
             'longitude': place.longitude,
-            'owner_id': place.owner.id if place.owner else None,
+            'owner_id': place.owner_id,
+            'review_count': place.review_count,
+            'rating_avg': place.rating_avg,
             'owner': {
                 'id': place.owner.id,
                 'first_name': place.owner.first_name,
@@ -96,8 +140,9 @@ class PlaceResource(Resource):
                 'id': review.id,
                 'text': review.text,
                 'rating': review.rating,
-                'user_id': review.user.id
-            } for review in place.reviews]
+                'user_id': review.user_id
+            } for review in reviews],
+            'reviews_next_cursor': next_cursor
         }, 200
     
     @jwt_required()
@@ -115,12 +160,13 @@ class PlaceResource(Resource):
             current_user_claims = get_jwt()
             is_admin = current_user_claims.get('is_admin', False)
             
-            place = facade.get_place(place_id)
-            if not place:
+            # Single-column lookup: the place itself is loaded by the update
+            owner_id = facade.get_place_owner_id(place_id)
+            if owner_id is None:
                 api.abort(404, "Place not found")
             
             # Check if the current user is the owner OR admin
-            if not is_admin and place.owner.id != current_user_id:
+            if not is_admin and owner_id != current_user_id:
                 api.abort(403, "Unauthorized action")
             
             place_data = api.payload
@@ -2,6 +2,7 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services.facade import HBnBFacade
+from app.api.v1.pagination import PAGE_PARAMS, filter_args, page_args, page_response
 
 api = Namespace('reviews', description='Review operations')
 facade = HBnBFacade()
@@ -13,6 +14,13 @@ review_model = api.model('Review', {
     'place_id': fields.String(required=True, description='ID of the place')
 })
 
+# Query-string filters pushed down to the repository
+REVIEW_FILTERS = {
+    'place_id': ('place_id', str),
+    'user_id': ('user_id', str),
+    'min_rating': ('rating__gte', int),
+}
+
 review_update_model = api.model('ReviewUpdate', {
     'text': fields.String(description='Text of the review'),
     'rating': fields.Integer(description='Rating (1-5)')
@@ -36,22 +44,16 @@ class ReviewList(Resource):
             review_data = api.payload
             place_id = review_data.get('place_id')
             
-            # Get the place
-            place = facade.get_place(place_id)
-            if not place:
+            # Get the place owner (single-column lookup, no place graph)
+            owner_id = facade.get_place_owner_id(place_id)
+            if owner_id is None:
                 api.abort(400, "Place not found")
             
             # Regular users cannot review their own places
-            if not is_admin and place.owner.id == current_user_id:
+            if not is_admin and owner_id == current_user_id:
                 api.abort(400, "You cannot review your own place")
             
-            # Regular users cannot review same place twice
-            if not is_admin:
-                user_reviews = facade.get_all_reviews()
-                for review in user_reviews:
-                    if review.user.id == current_user_id and review.place.id == place_id:
-                        api.abort(400, "You have already reviewed this place")
-            
+            # Reviewing the same place twice is refused by the facade
             # Add user_id to review data
             review_data['user_id'] = current_user_id
             
@@ -60,23 +62,35 @@ class ReviewList(Resource):
                 'id': new_review.id,
                 'text': new_review.text,
                 'rating': new_review.rating,
-                'user_id': new_review.user.id,
-                'place_id': new_review.place.id
+                'user_id': new_review.user_id,
+                'place_id': new_review.place_id
             }, 201
         except ValueError as e:
             api.abort(400, str(e))
     
+    @api.doc(params=dict(
+        PAGE_PARAMS,
+        place_id='Only reviews of this place',
+        user_id='Only reviews written by this user',
+        min_rating='Minimum rating (1-5)',
+    ))
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(400, 'Invalid pagination or filter parameters')
     def get(self):
-        """Get all reviews"""
-        reviews = facade.get_all_reviews()
-        return [{
+        """Get one page of reviews"""
+        try:
+            reviews, next_cursor = facade.get_reviews_page(
+                *page_args(), filters=filter_args(REVIEW_FILTERS)
+            )
+        except ValueError as e:
+            api.abort(400, str(e))
+        return page_response(reviews, next_cursor, lambda review: {
             'id': review.id,
             'text': review.text,
             'rating': review.rating,
-            'user_id': review.user.id if review.user else None,
-            'place_id': review.place.id if review.place else None
-        } for review in reviews], 200
+            'user_id': review.user_id,
+            'place_id': review.place_id
+        })
 
 @api.route('/<string:review_id>')
 class ReviewResource(Resource):
@@ -91,8 +105,8 @@ class ReviewResource(Resource):
             'id': review.id,
             'text': review.text,
             'rating': review.rating,
-            'user_id': review.user.id if review.user else None,
-            'place_id': review.place.id if review.place else None
+            'user_id': review.user_id,
+            'place_id': review.place_id
         }, 200
     
     @jwt_required()
@@ -115,7 +129,7 @@ class ReviewResource(Resource):
                 api.abort(404, "Review not found")
             
             # Check if the current user created the review OR is admin
-            if not is_admin and review.user.id != current_user_id:
+            if not is_admin and review.user_id != current_user_id:
                 api.abort(403, "Unauthorized action")
             
             review_data = api.payload
@@ -149,7 +163,7 @@ class ReviewResource(Resource):
             api.abort(404, "Review not found")
         
         # Check if the current user created the review OR is admin
-        if not is_admin and review.user.id != current_user_id:
+        if not is_admin and review.user_id != current_user_id:
             api.abort(403, "Unauthorized action")
         
         if facade.delete_review(review_id):
@@ -158,18 +172,24 @@ class ReviewResource(Resource):
 
 @api.route('/places/<string:place_id>/reviews')
 class PlaceReviewList(Resource):
+    @api.doc(params=PAGE_PARAMS)
     @api.response(200, 'Reviews for place retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
     @api.response(404, 'Place not found')
     def get(self, place_id):
-        """Get all reviews for a specific place"""
-        place = facade.get_place(place_id)
-        if not place:
+        """Get one page of the reviews of a specific place"""
+        if not facade.place_exists(place_id):
             api.abort(404, "Place not found")
         
-        reviews = facade.get_reviews_by_place(place_id)
-        return [{
+        try:
+            reviews, next_cursor = facade.get_place_reviews_page(
+                place_id, *page_args()
+            )
+        except ValueError as e:
+            api.abort(400, str(e))
+        return page_response(reviews, next_cursor, lambda review: {
             'id': review.id,
             'text': review.text,
             'rating': review.rating,
-            'user_id': review.user.id if review.user else None
-        } for review in reviews], 200
\ No newline at end of file
+            'user_id': review.user_id
+        })
\ No newline at end of file
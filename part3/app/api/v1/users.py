@@ -2,6 +2,9 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services.facade import HBnBFacade
+from app.api.v1.pagination import (
+    IDS_PARAM, PAGE_PARAMS, batch_response, ids_arg, page_args, page_response
+)
 
 # Create namespace
 api = Namespace('users', description='User operations')
@@ -32,6 +35,15 @@ user_update_model = api.model('UserUpdate', {
     'password': fields.String(description='New password', min_length=6)
 })
 
+def user_summary(user):
+    """Public fields shown in user listings"""
+    return {
+        'id': user.id,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'email': user.email
+    }
+
 @api.route('/')
 class UserList(Resource):
     @api.expect(user_model, validate=True)
@@ -55,16 +67,19 @@ class UserList(Resource):
         except ValueError as e:
             api.abort(400, str(e))
     
+    @api.doc(params=dict(PAGE_PARAMS, **IDS_PARAM))
     @api.response(200, 'List of users retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
     def get(self):
-        """Retrieve a list of all users (Public)"""
-        users = facade.get_all_users()
-        return [{
-            'id': user.id,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'email': user.email
-        } for user in users], 200
+        """Retrieve one page of users, or a batch with ?ids= (Public)"""
+        try:
+            ids = ids_arg()
+            if ids is not None:
+                return batch_response(*facade.get_users_by_ids(ids), user_summary)
+            users, next_cursor = facade.get_users_page(*page_args())
+        except ValueError as e:
+            api.abort(400, str(e))
+        return page_response(users, next_cursor, user_summary)
 
 @api.route('/admin')
 class AdminUserCreate(Resource):
@@ -2,6 +2,8 @@
 Suhail Al-aboud <10675@holbertonstudents.com>
 SQLAlchemy-mapped Amenity entity with relationships.
 """
+from sqlalchemy import Index
+
 from app import db
 from .base_model import BaseModel
 
@@ -13,10 +15,15 @@ class Amenity(BaseModel):
 
     name = db.Column(db.String(100), nullable=False, unique=True)
 
+    __table_args__ = (
+        Index("ix_amenities_created", "created_at", "id"),
+    )
+
     # ── Relationships (many-to-many) ────────────────────────────────────
     places = db.relationship(
         "Place",
         secondary="place_amenity",
         back_populates="amenities",
-        lazy="selectin",
+        lazy="write_only",  # every place with this amenity: never load it all
+        passive_deletes=True,
     )
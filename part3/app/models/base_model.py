@@ -4,9 +4,9 @@ BaseModel definition mapped to SQLAlchemy.
 All other business-logic models should inherit from this class.
 """
 from datetime import datetime
-import uuid
 
 from app import db
+from .ids import IdType, new_id
 
 
 class BaseModel(db.Model):
@@ -14,10 +14,11 @@ class BaseModel(db.Model):
 
     __abstract__ = True  # prevents SQLAlchemy from creating a table for BaseModel
 
+    # Time-ordered by default; string in Python, VARCHAR or BINARY(16) in SQL
     id = db.Column(
-        db.String(36),
+        IdType(),
         primary_key=True,
-        default=lambda: str(uuid.uuid4()),
+        default=new_id,
     )
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(
@@ -26,6 +27,26 @@ class BaseModel(db.Model):
         onupdate=datetime.utcnow,
     )
 
+    def __init__(self, **kwargs):
+        """Fill *id* and timestamps eagerly so unsaved objects are usable.
+
+        Column defaults only fire at flush time; the in-memory repository
+        and keyset cursors need them as soon as the object exists. Scalar
+        defaults (``review_count=0``, ``is_admin=False``) are applied too.
+        """
+        super().__init__(**kwargs)
+        for column in self.__table__.columns:
+            default = column.default
+            if (default is not None and default.is_scalar
+                    and getattr(self, column.key) is None):
+                setattr(self, column.key, default.arg)
+        if self.id is None:
+            self.id = new_id()
+        if self.created_at is None:
+            self.created_at = datetime.utcnow()
+        if self.updated_at is None:
+            self.updated_at = self.created_at
+
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
@@ -0,0 +1,211 @@
+"""
+Primary key strategy.
+
+``ID_STRATEGY`` picks how new ids are generated:
+
+    uuid4   random UUID (the historic ids)
+    uuid7   time-ordered UUID: 48-bit millisecond timestamp, then random
+            bits (same 36-character form as uuid4)
+    ulid    time-ordered ULID: 26 Crockford base32 characters
+
+Time-ordered ids are generated monotonically within a process, so new
+rows are appended at the right edge of every primary-key and foreign-key
+index instead of being scattered over it, and rows with the same
+``created_at`` still page in creation order.
+
+Ids are strings everywhere in Python and in the API. With ``ID_BINARY``
+the columns are ``BINARY(16)`` instead of ``VARCHAR(36)``: :class:`IdType`
+converts at the driver boundary, reading the storage format from the
+engine's dialect (see :func:`register_id_storage`). Switching either
+setting on an existing database needs a data migration.
+"""
+import os
+import threading
+import time
+import uuid
+
+from flask import current_app, has_app_context
+from sqlalchemy import BINARY, String
+from sqlalchemy.types import TypeDecorator
+
+DEFAULT_ID_STRATEGY = "uuid7"
+ID_STRATEGIES = ("uuid4", "uuid7", "ulid")
+
+# Crockford base32, as used by ULID (sorts like the underlying integer)
+_ULID_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_ULID_VALUES = {char: value for value, char in enumerate(_ULID_ALPHABET)}
+_ULID_VALUES.update({char.lower(): value for char, value in _ULID_VALUES.items()})
+
+
+class _MonotonicClock:
+    """Yields ``(milliseconds, random)`` pairs that never go backwards.
+
+    Within one millisecond the random part of the previous id is
+    incremented instead of drawn again (the ULID monotonic rule), so ids
+    from one process sort in creation order.
+    """
+
+    def __init__(self, random_bits):
+        self._bits = random_bits
+        self._lock = threading.Lock()
+        self._last = (0, 0)
+
+    def next(self):
+        now = time.time_ns() // 1_000_000
+        with self._lock:
+            last_ms, last_random = self._last
+            if now > last_ms:
+                pair = (now, int.from_bytes(os.urandom(16)) >> (128 - self._bits))
+            elif last_random + 1 < 1 << self._bits:
+                pair = (last_ms, last_random + 1)
+            else:  # random part exhausted: borrow the next millisecond
+                pair = (last_ms + 1, 0)
+            self._last = pair
+            return pair
+
+
+_uuid7_clock = _MonotonicClock(74)
+_ulid_clock = _MonotonicClock(80)
+
+
+def uuid4_id():
+    """Return a new random UUID as a 36-character string"""
+    return str(uuid.uuid4())
+
+
+def uuid7_id():
+    """Return a new UUIDv7 (RFC 9562) as a 36-character string"""
+    ms, rand = _uuid7_clock.next()
+    value = (
+        ms << 80
+        | 0x7 << 76                      # version
+        | (rand >> 62) << 64             # rand_a: 12 bits
+        | 0b10 << 62                     # RFC 4122 variant
+        | rand & ((1 << 62) - 1)         # rand_b: 62 bits
+    )
+    return str(uuid.UUID(int=value))
+
+
+def encode_ulid(value):
+    """Encode a 128-bit integer as 26 Crockford base32 characters"""
+    chars = []
+    for _ in range(26):
+        chars.append(_ULID_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def decode_ulid(text):
+    """Decode a ULID string to its 128-bit integer (ValueError if invalid)"""
+    if len(text) != 26 or text[0] not in "01234567":
+        raise ValueError(f"Invalid ULID: {text!r}")
+    value = 0
+    for char in text:
+        try:
+            value = value << 5 | _ULID_VALUES[char]
+        except KeyError:
+            raise ValueError(f"Invalid ULID: {text!r}") from None
+    return value
+
+
+def ulid_id():
+    """Return a new ULID as a 26-character string"""
+    ms, rand = _ulid_clock.next()
+    return encode_ulid(ms << 80 | rand)
+
+
+_GENERATORS = {"uuid4": uuid4_id, "uuid7": uuid7_id, "ulid": ulid_id}
+
+
+def check_id_strategy(strategy):
+    """Return *strategy* or raise ValueError if it is not known"""
+    if strategy not in _GENERATORS:
+        raise ValueError(
+            f"Unknown ID_STRATEGY {strategy!r}; expected one of "
+            f"{', '.join(ID_STRATEGIES)}"
+        )
+    return strategy
+
+
+def new_id():
+    """Generate an id with the current app's ``ID_STRATEGY``"""
+    strategy = DEFAULT_ID_STRATEGY
+    if has_app_context():
+        strategy = current_app.config.get("ID_STRATEGY", DEFAULT_ID_STRATEGY)
+    return _GENERATORS[check_id_strategy(strategy)]()
+
+
+# ── Storage ──────────────────────────────────────────────────────────────
+def id_to_bytes(value):
+    """Return the 16 bytes of a UUID or ULID string (ValueError otherwise)"""
+    if len(value) == 26:
+        return decode_ulid(value).to_bytes(16)
+    return uuid.UUID(value).bytes
+
+
+def bytes_to_id(raw, id_format):
+    """Render 16 stored bytes as a ``"ulid"`` or ``"uuid"`` string"""
+    if id_format == "ulid":
+        return encode_ulid(int.from_bytes(raw))
+    return str(uuid.UUID(bytes=bytes(raw)))
+
+
+def binary_id_format(config):
+    """Return the binary storage format for *config*, or None for strings"""
+    if not config.get("ID_BINARY"):
+        return None
+    strategy = check_id_strategy(config.get("ID_STRATEGY", DEFAULT_ID_STRATEGY))
+    return "ulid" if strategy == "ulid" else "uuid"
+
+
+class IdType(TypeDecorator):
+    """String id stored as ``VARCHAR(36)`` or, per engine, ``BINARY(16)``"""
+
+    impl = String(36)
+    cache_ok = True
+
+    @staticmethod
+    def _format(dialect):
+        return getattr(dialect, "hbnb_binary_ids", None)
+
+    def load_dialect_impl(self, dialect):
+        if self._format(dialect):
+            return dialect.type_descriptor(BINARY(16))
+        return dialect.type_descriptor(String(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None or not self._format(dialect):
+            return value
+        try:
+            return id_to_bytes(value)
+        except ValueError:
+            # Not an id of ours (e.g. a lookup of "missing"): matches no row
+            return value.encode("utf-8")
+
+    def process_result_value(self, value, dialect):
+        id_format = self._format(dialect)
+        if value is None or not id_format:
+            return value
+        return bytes_to_id(value, id_format)
+
+
+def configure_id_storage(engine, id_format):
+    """Store ids of *engine* as BINARY(16) in *id_format* (None: strings).
+
+    Must run before the engine compiles its first statement: the column
+    type of each dialect is resolved once.
+    """
+    engine.dialect.hbnb_binary_ids = id_format
+
+
+def register_id_storage(app, db):
+    """Validate ``ID_STRATEGY`` and apply ``ID_BINARY`` to every engine"""
+    check_id_strategy(app.config.get("ID_STRATEGY", DEFAULT_ID_STRATEGY))
+    id_format = binary_id_format(app.config)
+    with app.app_context():
+        engines = list(db.engines.values())
+    router = app.extensions.get("hbnb_replicas")
+    if router is not None:
+        engines.extend(router.replicas)
+    for engine in engines:
+        configure_id_storage(engine, id_format)
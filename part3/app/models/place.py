@@ -2,16 +2,23 @@
 Suhail Al-aboud <10675@holbertonstudents.com>
 SQLAlchemy-mapped Place entity with relationships.
 """
+from sqlalchemy import Index
+
 from app import db
 from .base_model import BaseModel
+from .ids import IdType
 
 # ────────────────────────────────────────────────────────────────────────
 # Association table (many-to-many) between places and amenities
 # ────────────────────────────────────────────────────────────────────────
 place_amenity = db.Table(
     "place_amenity",
-    db.Column("place_id",  db.String(36), db.ForeignKey("places.id"),     primary_key=True),
-    db.Column("amenity_id", db.String(36), db.ForeignKey("amenities.id"), primary_key=True),
+    db.Column("place_id",  IdType(), db.ForeignKey("places.id", ondelete="CASCADE"),
+              primary_key=True),
+    db.Column("amenity_id", IdType(), db.ForeignKey("amenities.id", ondelete="CASCADE"),
+              primary_key=True),
+    # The primary key covers place -> amenities; this one amenity -> places
+    Index("ix_place_amenity_amenity", "amenity_id"),
 )
 
 
@@ -29,16 +36,27 @@ class Place(BaseModel):
     latitude  = db.Column(db.Float, nullable=True)
     longitude = db.Column(db.Float, nullable=True)
 
+    # ── Rating aggregates (kept by the facade's review writes) ───────────
+    review_count = db.Column(db.Integer, nullable=False, default=0,
+                             server_default="0")
+    rating_sum   = db.Column(db.Integer, nullable=False, default=0,
+                             server_default="0")
+    rating_avg   = db.Column(db.Float, nullable=True)  # None until reviewed
+
     # ── Ownership ────────────────────────────────────────────────────────
-    owner_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
-    owner    = db.relationship("User", back_populates="places", lazy="joined")
+    owner_id = db.Column(IdType(), db.ForeignKey("users.id", ondelete="CASCADE"),
+                         nullable=False)
+    # Relationships are lazy; eager loading is chosen per call by the
+    # facade's loading profiles (app.persistence.loading)
+    owner    = db.relationship("User", back_populates="places", lazy="select")
 
-    # ── Reviews one-to-many ──────────────────────────────────────────────
+    # ── Reviews one-to-many (write-only: append, count and page in SQL) ─
     reviews = db.relationship(
         "Review",
         back_populates="place",
-        lazy="selectin",
+        lazy="write_only",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     # ── Amenities many-to-many ───────────────────────────────────────────
@@ -46,12 +64,26 @@ class Place(BaseModel):
         "Amenity",
         secondary="place_amenity",
         back_populates="places",
-        lazy="selectin",
+        lazy="select",
     )
 
+    # ── Indexes (see app.persistence.schema_audit) ──────────────────────
+    __table_args__ = (
+        # A user's places, keyset-paged; also the owner_id foreign key index
+        Index("ix_places_owner_created", "owner_id", "created_at", "id"),
+        Index("ix_places_price", "price"),
+        Index("ix_places_created", "created_at", "id"),
+        Index("ix_places_rating_avg", "rating_avg"),
+    )
+
+    # Written only by repository increment(), never from request payloads
+    RATING_FIELDS = ("review_count", "rating_sum", "rating_avg")
+    # increment() ratio: rating_avg = rating_sum / review_count
+    RATING_AVERAGE = {"rating_avg": ("rating_sum", "review_count")}
+
     # ------------------------------------------------------------------
     # Helper methods
     # ------------------------------------------------------------------
     def add_review(self, review):
-        """Append a review (for API parity)."""
-        self.reviews.append(review)
+        """Append a review without loading the existing ones."""
+        self.reviews.add(review)
@@ -2,10 +2,11 @@
 Suhail Al-aboud <10675@holbertonstudents.com>
 SQLAlchemy-mapped Review entity with relationships.
 """
-from sqlalchemy import CheckConstraint
+from sqlalchemy import CheckConstraint, Index, UniqueConstraint
 
 from app import db
 from .base_model import BaseModel
+from .ids import IdType
 
 
 class Review(BaseModel):
@@ -17,13 +18,21 @@ class Review(BaseModel):
     rating = db.Column(db.Integer, nullable=False)
 
     # ── Foreign keys ────────────────────────────────────────────────────
-    user_id  = db.Column(db.String(36), db.ForeignKey("users.id"),  nullable=False)
-    place_id = db.Column(db.String(36), db.ForeignKey("places.id"), nullable=False)
+    user_id  = db.Column(IdType(), db.ForeignKey("users.id", ondelete="CASCADE"),
+                         nullable=False)
+    place_id = db.Column(IdType(), db.ForeignKey("places.id", ondelete="CASCADE"),
+                         nullable=False)
 
     # ── Relationships ───────────────────────────────────────────────────
-    user  = db.relationship("User",  back_populates="reviews", lazy="joined")
-    place = db.relationship("Place", back_populates="reviews", lazy="joined")
+    user  = db.relationship("User",  back_populates="reviews", lazy="select")
+    place = db.relationship("Place", back_populates="reviews", lazy="select")
 
+    # ── Indexes (see app.persistence.schema_audit) ──────────────────────
     __table_args__ = (
         CheckConstraint("rating BETWEEN 1 AND 5", name="chk_rating_range"),
+        # One review per user and place; also serves lookups by user_id
+        UniqueConstraint("user_id", "place_id", name="uq_reviews_user_place"),
+        # Reviews of a place, keyset-paged on (created_at, id)
+        Index("ix_reviews_place_created", "place_id", "created_at", "id"),
+        Index("ix_reviews_created", "created_at", "id"),
     )
@@ -2,6 +2,7 @@
 Suhail Al-aboud <10675@holbertonstudents.com>
 SQLAlchemy-mapped User entity with relationships.
 """
+from sqlalchemy import Index
 from sqlalchemy.orm import relationship, validates
 
 from app import db, bcrypt
@@ -20,18 +21,26 @@ class User(BaseModel):
     password   = db.Column(db.String(128), nullable=False)
     is_admin   = db.Column(db.Boolean, default=False)
 
-    # ── Relationships ────────────────────────────────────────────────────
+    __table_args__ = (
+        Index("ix_users_is_admin", "is_admin"),  # admin_exists()
+        Index("ix_users_created", "created_at", "id"),
+    )
+
+    # ── Relationships (write-only: never loaded as a whole) ─────────────
+    # Deleting a user relies on ON DELETE CASCADE (passive_deletes)
     places = relationship(
         "Place",
         back_populates="owner",
-        lazy="selectin",
+        lazy="write_only",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     reviews = relationship(
         "Review",
         back_populates="user",
-        lazy="selectin",
+        lazy="write_only",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     # ------------------------------------------------------------------
@@ -64,5 +73,5 @@ class User(BaseModel):
     # Helper methods
     # ------------------------------------------------------------------
     def add_place(self, place):
-        """Append a place to this user's listings (for API parity)."""
-        self.places.append(place)
+        """Append a place to this user's listings (nothing is loaded)."""
+        self.places.add(place)
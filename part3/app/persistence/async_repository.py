@@ -0,0 +1,372 @@
+"""
+AsyncSQLAlchemyRepository: the Repository contract on SQLAlchemy's asyncio
+extension, for serving the API from an ASGI worker without holding a
+thread per request.
+
+Statements come from the builders in ``sqlalchemy_repository`` so both
+repositories run the same SQL. Sessions are ``AsyncSession`` objects from
+a factory built by :func:`create_session_factory` (``aiosqlite`` for
+SQLite, ``asyncmy`` for MySQL).
+
+:func:`async_unit_of_work` mirrors ``unit_of_work``: the outermost unit
+opens a session and commits it, nested units join it and only flush.
+Reads outside a unit use a short-lived session; the objects they return
+are detached, so relationships must come from the active loading profile
+(see ``loading``): there is no lazy load after the session closes.
+"""
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+
+from sqlalchemy import select, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm.util import identity_key
+
+from app.models.ids import configure_id_storage
+from app.persistence.loading import loader_options
+from app.persistence.repository import DEFAULT_CHUNK_SIZE, check_page_args, chunked
+from app.persistence.sqlalchemy_repository import (
+    columns_statement,
+    count_statement,
+    exists_statement,
+    find_statement,
+    increment_statement,
+    page_statement,
+    split_page,
+    stream_statement,
+    validated_values,
+)
+
+# Sync driver -> asyncio driver used for the same database
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+asyncmy",
+    "mysql+pymysql": "mysql+asyncmy",
+    "mysql+mysqldb": "mysql+asyncmy",
+}
+
+_session = ContextVar("hbnb_async_session", default=None)
+
+
+def async_database_uri(uri):
+    """Return *uri* with its driver swapped for the asyncio equivalent"""
+    url = make_url(uri)
+    driver = ASYNC_DRIVERS.get(url.drivername)
+    if driver is None:
+        if url.get_dialect().is_async:
+            return uri
+        raise ValueError(f"No asyncio driver known for {url.drivername}")
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def create_session_factory(uri, id_format=None, **engine_options):
+    """Build an ``async_sessionmaker`` for *uri* (sync URIs are converted).
+
+    *id_format* is the binary id storage (see ``app.models.ids``), None
+    when ids are stored as strings.
+    """
+    engine = create_async_engine(async_database_uri(uri), **engine_options)
+    configure_id_storage(engine.sync_engine, id_format)
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+def current_session():
+    """Return the AsyncSession of the active unit of work, or None"""
+    return _session.get()
+
+
+@asynccontextmanager
+async def async_unit_of_work(session_factory):
+    """Join the active async unit of work, or open (and commit) a new one"""
+    session = _session.get()
+    if session is not None:
+        yield session
+        await session.flush()
+        return
+
+    async with session_factory() as session:
+        token = _session.set(session)
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            _session.reset(token)
+
+
+@asynccontextmanager
+async def _reading(session_factory):
+    """Use the active unit's session, or a short-lived one for this read"""
+    session = _session.get()
+    if session is not None:
+        yield session
+    else:
+        async with session_factory() as session:
+            yield session
+
+
+def async_transactional(method):
+    """Run an async facade method inside :func:`async_unit_of_work`"""
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        async with async_unit_of_work(self.session_factory):
+            return await method(self, *args, **kwargs)
+    return wrapper
+
+
+class AsyncRepository(ABC):
+    """Abstract base class for asyncio repositories (see ``Repository``)"""
+
+    @abstractmethod
+    async def add(self, obj):
+        pass
+
+    @abstractmethod
+    async def get(self, obj_id):
+        pass
+
+    @abstractmethod
+    async def get_many(self, obj_ids, chunk_size=None):
+        pass
+
+    @abstractmethod
+    async def get_all(self):
+        pass
+
+    @abstractmethod
+    async def update(self, obj_id, data):
+        pass
+
+    @abstractmethod
+    async def delete(self, obj_id):
+        pass
+
+    @abstractmethod
+    async def get_by_attribute(self, attr_name, attr_value):
+        pass
+
+    @abstractmethod
+    async def find(self, filters=None, order_by=None, limit=None, offset=0):
+        pass
+
+    @abstractmethod
+    async def get_page(self, cursor=None, limit=None, order_by="created_at",
+                       filters=None):
+        pass
+
+    @abstractmethod
+    async def exists(self, **criteria):
+        pass
+
+    @abstractmethod
+    async def count(self, **criteria):
+        pass
+
+    @abstractmethod
+    async def get_columns(self, obj_id, *columns):
+        pass
+
+    @abstractmethod
+    def iter_all(self, chunk_size=None, filters=None):
+        """Return an async iterator over the matching objects"""
+
+    @abstractmethod
+    async def add_many(self, objs, chunk_size=None):
+        pass
+
+    @abstractmethod
+    async def update_many(self, updates, chunk_size=None):
+        pass
+
+    @abstractmethod
+    async def increment(self, obj_id, deltas, ratios=None):
+        """Atomically add *deltas* to one object's counters"""
+        pass
+
+    @abstractmethod
+    async def delete_many(self, obj_ids, chunk_size=None):
+        pass
+
+
+class AsyncSQLAlchemyRepository(AsyncRepository):
+    """AsyncSession-backed repository for one mapped *model*"""
+
+    def __init__(self, model, session_factory, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.model = model
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+
+    def _chunk_size(self, chunk_size):
+        return self.chunk_size if chunk_size is None else chunk_size
+
+    # -------- basic CRUD --------
+    async def add(self, obj):
+        async with async_unit_of_work(self.session_factory) as session:
+            session.add(obj)
+
+    async def get(self, obj_id):
+        async with _reading(self.session_factory) as session:
+            return await session.get(self.model, obj_id,
+                                     options=loader_options(self.model))
+
+    async def get_many(self, obj_ids, chunk_size=None):
+        """Fetch many rows with one ``IN`` query per chunk."""
+        wanted = list(dict.fromkeys(obj_ids))
+        by_id = {}
+        async with _reading(self.session_factory) as session:
+            for chunk in chunked(wanted, self._chunk_size(chunk_size)):
+                stmt = (
+                    select(self.model).where(self.model.id.in_(chunk))
+                    .options(*loader_options(self.model))
+                )
+                for obj in (await session.execute(stmt)).scalars():
+                    by_id[obj.id] = obj
+        found = [by_id[obj_id] for obj_id in wanted if obj_id in by_id]
+        missing = [obj_id for obj_id in wanted if obj_id not in by_id]
+        return found, missing
+
+    async def get_all(self):
+        async with _reading(self.session_factory) as session:
+            stmt = select(self.model).options(*loader_options(self.model))
+            return (await session.execute(stmt)).scalars().all()
+
+    async def update(self, obj_id, data):
+        async with async_unit_of_work(self.session_factory) as session:
+            obj = await session.get(self.model, obj_id)
+            if obj:
+                obj.update(data)
+
+    async def delete(self, obj_id):
+        async with async_unit_of_work(self.session_factory) as session:
+            obj = await session.get(self.model, obj_id)
+            if obj:
+                await session.delete(obj)
+
+    # -------- extra helpers --------
+    async def get_by_attribute(self, attr_name, attr_value):
+        stmt = (
+            select(self.model).filter_by(**{attr_name: attr_value}).limit(1)
+            .options(*loader_options(self.model))
+        )
+        async with _reading(self.session_factory) as session:
+            return (await session.execute(stmt)).scalars().first()
+
+    # -------- queries that skip ORM hydration --------
+    async def exists(self, **criteria):
+        """``SELECT 1 ... LIMIT 1``: no object or relationship is loaded."""
+        stmt = exists_statement(self.model, criteria)
+        async with _reading(self.session_factory) as session:
+            return (await session.execute(stmt)).scalar() is not None
+
+    async def count(self, **criteria):
+        """``SELECT count(*)`` over the rows matching *criteria*."""
+        stmt = count_statement(self.model, criteria)
+        async with _reading(self.session_factory) as session:
+            return (await session.execute(stmt)).scalar_one()
+
+    async def get_columns(self, obj_id, *columns):
+        """Select only *columns* of one row; returns a dict or None."""
+        stmt = columns_statement(self.model, obj_id, columns)
+        async with _reading(self.session_factory) as session:
+            row = (await session.execute(stmt)).first()
+        return dict(row._mapping) if row is not None else None
+
+    # -------- streaming --------
+    async def iter_all(self, chunk_size=None, filters=None):
+        """Stream rows with ``yield_per`` over an async server-side cursor.
+
+        Relationships are not loaded (``raiseload``). Chunks are expunged
+        from the session once the caller moves past them.
+        """
+        stmt = stream_statement(self.model, filters, self._chunk_size(chunk_size))
+        async with _reading(self.session_factory) as session:
+            result = await session.stream_scalars(stmt)
+            try:
+                async for chunk in result.partitions():
+                    for obj in chunk:
+                        yield obj
+                    for obj in chunk:
+                        if obj in session:
+                            session.expunge(obj)
+            finally:
+                await result.close()
+
+    # -------- querying --------
+    async def find(self, filters=None, order_by=None, limit=None, offset=0):
+        """Compile filters, ordering and slicing into a single SELECT."""
+        stmt = find_statement(self.model, filters, order_by, limit, offset)
+        stmt = stmt.options(*loader_options(self.model))
+        async with _reading(self.session_factory) as session:
+            return (await session.execute(stmt)).scalars().all()
+
+    # -------- pagination --------
+    async def get_page(self, cursor=None, limit=None, order_by="created_at",
+                       filters=None):
+        """Keyset page on (created_at, id); fetches limit + 1 rows, no OFFSET."""
+        limit = check_page_args(limit, order_by)
+        stmt = page_statement(self.model, cursor, limit, order_by, filters)
+        stmt = stmt.options(*loader_options(self.model))
+        async with _reading(self.session_factory) as session:
+            rows = (await session.execute(stmt)).scalars().all()
+        return split_page(rows, limit)
+
+    # -------- bulk writes (one commit per call, or per enclosing unit) --------
+    async def add_many(self, objs, chunk_size=None):
+        """INSERT in executemany batches of *chunk_size*, then commit once."""
+        ids = []
+        async with async_unit_of_work(self.session_factory) as session:
+            for chunk in chunked(objs, self._chunk_size(chunk_size)):
+                session.add_all(chunk)
+                await session.flush()
+                ids.extend(obj.id for obj in chunk)
+        return ids
+
+    async def update_many(self, updates, chunk_size=None):
+        """Bulk UPDATE by primary key; unknown ids are skipped and rows
+        are checked by :func:`validated_values`."""
+        now = datetime.utcnow()
+        count = 0
+        async with async_unit_of_work(self.session_factory) as session:
+            for chunk in chunked(updates, self._chunk_size(chunk_size)):
+                stmt = select(self.model.id).where(self.model.id.in_(chunk))
+                found = set((await session.execute(stmt)).scalars())
+                rows = [
+                    {"updated_at": now,
+                     **validated_values(self.model, updates[obj_id]),
+                     "id": obj_id}
+                    for obj_id in chunk if obj_id in found
+                ]
+                if rows:
+                    await session.execute(update(self.model), rows)
+                count += len(rows)
+        return count
+
+    async def increment(self, obj_id, deltas, ratios=None):
+        """One atomic ``UPDATE ... SET col = col + :delta``, then commit."""
+        async with async_unit_of_work(self.session_factory) as session:
+            result = await session.execute(
+                increment_statement(self.model, obj_id, deltas, ratios)
+            )
+            obj = session.identity_map.get(identity_key(self.model, obj_id))
+            if obj is not None:
+                session.expire(obj, [*deltas, *(ratios or {})])
+        return result.rowcount == 1
+
+    async def delete_many(self, obj_ids, chunk_size=None):
+        """Load each chunk with one IN query and delete it, then commit once."""
+        count = 0
+        async with async_unit_of_work(self.session_factory) as session:
+            for chunk in chunked(obj_ids, self._chunk_size(chunk_size)):
+                stmt = select(self.model).where(self.model.id.in_(chunk))
+                objs = (await session.execute(stmt)).scalars().all()
+                for obj in objs:
+                    await session.delete(obj)
+                await session.flush()
+                count += len(objs)
+        return count
@@ -0,0 +1,126 @@
+"""
+Repository backends selected by the ``REPOSITORY_BACKEND`` setting.
+
+* ``memory``  - InMemoryRepository with secondary indexes; nothing is
+  persisted (tests, demos, benchmarking the Python side alone).
+* ``sqlite``  - SQLAlchemyRepository; the database URI must be SQLite.
+* ``mysql``   - SQLAlchemyRepository; the database URI must be MySQL.
+* ``cached``  - SQLAlchemyRepository behind CachedRepository, whose
+  read-through cache covers the entities in ``REPOSITORY_CACHE_ENTITIES``
+  (the default, and the historic behaviour of the facade).
+* ``hybrid``  - HybridRepository: reads from an in-process working set
+  (dict + the memory indexes), writes through to SQL; workers stay in
+  sync by polling the change_log table.
+* ``embedded`` - EmbeddedRepository files (mmap'd records + dbm indexes)
+  under ``REPOSITORY_DATA_DIR``, for nodes without an SQL engine.
+
+Repositories are built once per application by :func:`get_repository`
+and kept in ``app.extensions``, so every facade of an app shares them
+(an in-memory store in particular must not be split per namespace).
+"""
+import atexit
+
+from flask import current_app
+from sqlalchemy.engine import make_url
+
+from app.models.user import User
+from app.persistence.cached_repository import CachedRepository
+from app.persistence.embedded_repository import EmbeddedRepository
+from app.persistence.hybrid_repository import HybridRepository, ensure_change_log
+from app.persistence.indexes import HashIndex, SortedIndex, UniqueIndex
+from app.persistence.repository import InMemoryRepository
+from app.persistence.sqlalchemy_repository import SQLAlchemyRepository
+from app.persistence.user_repository import UserRepository
+
+EXTENSION_KEY = "hbnb_repositories"
+BACKENDS = ("memory", "sqlite", "mysql", "cached", "hybrid", "embedded")
+SQL_BACKENDS = ("sqlite", "mysql", "cached", "hybrid")
+DEFAULT_BACKEND = "cached"
+
+# Indexes of the memory backend, by table name: the lookups the facade makes
+MEMORY_INDEXES = {
+    "users": lambda: [UniqueIndex("email")],
+    "places": lambda: [HashIndex("owner_id"), SortedIndex("price")],
+    "reviews": lambda: [HashIndex("place_id"), HashIndex("user_id")],
+}
+
+# Index files of the embedded backend: table -> (unique, non-unique attrs)
+EMBEDDED_INDEXES = {
+    "users": (("email",), ()),
+    "places": ((), ("owner_id",)),
+    "reviews": ((), ("place_id", "user_id")),
+}
+
+
+def resolve_backend(config):
+    """Return the validated backend name for an app *config*.
+
+    Raises ValueError for an unknown name, or when ``sqlite``/``mysql``
+    does not match the dialect of ``SQLALCHEMY_DATABASE_URI``.
+    """
+    backend = (config.get("REPOSITORY_BACKEND") or DEFAULT_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"REPOSITORY_BACKEND must be one of {', '.join(BACKENDS)}")
+    if backend in ("sqlite", "mysql"):
+        uri = config.get("SQLALCHEMY_DATABASE_URI")
+        dialect = make_url(uri).get_backend_name() if uri else None
+        if dialect != backend:
+            raise ValueError(
+                f"REPOSITORY_BACKEND={backend} needs a {backend} database URI, "
+                f"got {dialect or 'none'}"
+            )
+    if backend == "embedded" and not config.get("REPOSITORY_DATA_DIR"):
+        raise ValueError("REPOSITORY_BACKEND=embedded needs REPOSITORY_DATA_DIR")
+    return backend
+
+
+def create_repository(model, backend):
+    """Build a new repository for *model* on *backend*."""
+    if backend == "memory":
+        indexes = MEMORY_INDEXES.get(model.__tablename__, list)()
+        return InMemoryRepository(indexes=indexes)
+    if backend == "embedded":
+        unique, indexed = EMBEDDED_INDEXES.get(model.__tablename__, ((), ()))
+        repo = EmbeddedRepository(model, current_app.config["REPOSITORY_DATA_DIR"],
+                                  indexed=indexed, unique=unique)
+        atexit.register(repo.close)
+        return repo
+    if backend == "hybrid":
+        return HybridRepository(model, indexes=MEMORY_INDEXES.get(model.__tablename__))
+    inner = UserRepository() if model is User else SQLAlchemyRepository(model)
+    if backend == "cached":
+        return CachedRepository(inner)
+    return inner
+
+
+def register_repositories(app):
+    """Validate ``REPOSITORY_BACKEND`` at startup and prepare the registry."""
+    backend = resolve_backend(app.config)
+    app.extensions[EXTENSION_KEY] = {"backend": backend, "repositories": {}}
+    if backend == "hybrid":
+        from app import db
+        with app.app_context():
+            ensure_change_log(db.engine)
+    return backend
+
+
+def current_backend():
+    """Return the current app's backend name"""
+    if EXTENSION_KEY not in current_app.extensions:
+        register_repositories(current_app)
+    return current_app.extensions[EXTENSION_KEY]["backend"]
+
+
+def get_repository(model):
+    """Return the current app's repository for *model*, creating it once."""
+    if EXTENSION_KEY not in current_app.extensions:
+        register_repositories(current_app)
+    registry = current_app.extensions[EXTENSION_KEY]
+    repositories = registry["repositories"]
+    repo = repositories.get(model)
+    if repo is None:
+        # Two threads may race here: keep whichever repository landed first
+        repo = repositories.setdefault(
+            model, create_repository(model, registry["backend"])
+        )
+    return repo
@@ -0,0 +1,302 @@
+"""
+CachedRepository: read-through object cache wrapped around a
+SQLAlchemyRepository.
+
+``get`` results are kept in a per-entity LRU with a TTL, keyed by
+``(model, id)``. Cached objects are detached snapshots loaded (with the
+relationships of the active loading profile) in a side session on the
+request's connection; every hit is handed out through
+``session.merge(load=False)``, so a detail read costs no SQL at all.
+
+Entries are dropped when the wrapper's own update/delete methods run and,
+for writes made through any path, when the transaction that flushed them
+commits (``after_flush`` collects the touched keys, ``after_commit``
+invalidates them). Many-to-one parents of a flushed object are invalidated
+too, so adding a review evicts its place. Each entry also records the
+related objects its snapshot embeds, so renaming a user or an amenity
+evicts the cached places showing it. The cache is per process:
+``REPOSITORY_CACHE_TTL`` bounds how stale another worker's copy can be.
+"""
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.interfaces import MANYTOONE
+
+from app import db
+from app.persistence.loading import loader_options
+from app.persistence.repository import Repository
+
+DEFAULT_CACHE_MAX_ENTRIES = 1024
+DEFAULT_CACHE_TTL = 60.0
+
+# Every live cache, so commit events can reach all of them
+_caches = weakref.WeakSet()
+
+
+def _touched_keys(obj):
+    """Return ``(model, id)`` keys made stale by flushing *obj*"""
+    state = inspect(obj)
+    keys = {(state.mapper.class_, getattr(obj, "id", None))}
+    for rel in state.mapper.relationships:
+        if rel.direction is not MANYTOONE:
+            continue
+        for column in rel.local_columns:
+            history = state.attrs[column.key].history
+            for value in (*history.added, *history.unchanged, *history.deleted):
+                keys.add((rel.mapper.class_, value))
+    return keys
+
+
+def _embedded_keys(obj):
+    """Return ``(model, id)`` keys of the related objects loaded on *obj*.
+
+    A snapshot that embeds them (``place.owner`` under the detail profile)
+    is stale once any of them changes.
+    """
+    keys, seen, stack = set(), {id(obj)}, [obj]
+    while stack:
+        state = inspect(stack.pop())
+        for rel in state.mapper.relationships:
+            if rel.key not in state.dict:
+                continue  # not loaded (lazy or write-only)
+            value = state.dict[rel.key]
+            for item in (value if rel.uselist else [value]):
+                if item is None or id(item) in seen:
+                    continue
+                seen.add(id(item))
+                keys.add((type(item), item.id))
+                stack.append(item)
+    return keys
+
+
+def invalidate(keys):
+    """Drop *keys* from every cache"""
+    for cache in list(_caches):
+        cache.invalidate_keys(keys)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_stale_keys(session, flush_context):
+    stale = session.info.setdefault("cache_stale", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        stale.update(_touched_keys(obj))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.in_nested_transaction():
+        return  # released SAVEPOINT: wait for the real COMMIT
+    session.info.pop("cache_loaded", None)
+    stale = session.info.pop("cache_stale", None)
+    if stale:
+        invalidate(stale)
+
+
+@event.listens_for(Session, "after_rollback")
+def _invalidate_on_rollback(session):
+    # Snapshots taken inside the failed transaction may hold rolled-back rows
+    session.info.pop("cache_stale", None)
+    loaded = session.info.pop("cache_loaded", None)
+    if loaded:
+        invalidate(loaded)
+
+
+class CachedRepository(Repository):
+    """LRU + TTL read-through cache in front of a SQLAlchemyRepository.
+
+    Caching is enabled per entity: the wrapper only caches when the model's
+    table name is listed in ``REPOSITORY_CACHE_ENTITIES``, otherwise every
+    call goes straight to the wrapped repository.
+    """
+
+    def __init__(self, inner, max_entries=None, ttl=None, clock=time.monotonic):
+        self.inner = inner
+        self.model = inner.model
+        self.entity = inner.model.__tablename__
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        # (model, id) of an embedded object -> ids of the entries embedding it
+        self._dependents = {}
+        self._embeds = {}  # entry id -> the (model, id) keys it embeds
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+        _caches.add(self)
+
+    # -------- settings --------
+    def enabled(self):
+        return self.entity in current_app.config.get("REPOSITORY_CACHE_ENTITIES", ())
+
+    def _setting(self, value, key, default):
+        return value if value is not None else current_app.config.get(key, default)
+
+    # -------- cache bookkeeping --------
+    def stats(self):
+        """Return hit/miss/eviction/invalidation counters and the size"""
+        return {
+            "entity": self.entity,
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dependents.clear()
+            self._embeds.clear()
+
+    def _drop(self, obj_id):
+        """Remove one entry and its dependency records; call under the lock"""
+        for key in self._embeds.pop(obj_id, ()):
+            ids = self._dependents[key]
+            ids.discard(obj_id)
+            if not ids:
+                del self._dependents[key]
+        return self._entries.pop(obj_id, None)
+
+    def invalidate_keys(self, keys):
+        """Forget every ``(model, id)`` in *keys* that belongs to this cache,
+        and every entry whose snapshot embeds one of them"""
+        with self._lock:
+            for model, obj_id in keys:
+                stale = list(self._dependents.get((model, obj_id), ()))
+                if model is self.model:
+                    stale.append(obj_id)
+                for stale_id in stale:
+                    if self._drop(stale_id):
+                        self.invalidations += 1
+
+    def _lookup(self, obj_id):
+        with self._lock:
+            entry = self._entries.get(obj_id)
+            if entry is None:
+                return None
+            expires_at, obj = entry
+            if expires_at <= self._clock():
+                self._drop(obj_id)
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(obj_id)
+            return obj
+
+    def _store(self, obj_id, obj):
+        ttl = self._setting(self._ttl, "REPOSITORY_CACHE_TTL", DEFAULT_CACHE_TTL)
+        max_entries = self._setting(
+            self._max_entries, "REPOSITORY_CACHE_MAX_ENTRIES",
+            DEFAULT_CACHE_MAX_ENTRIES,
+        )
+        embedded = _embedded_keys(obj)
+        with self._lock:
+            self._drop(obj_id)
+            self._entries[obj_id] = (self._clock() + ttl, obj)
+            self._embeds[obj_id] = embedded
+            for key in embedded:
+                self._dependents.setdefault(key, set()).add(obj_id)
+            while len(self._entries) > max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        db.session.info.setdefault("cache_loaded", set()).add((self.model, obj_id))
+
+    def _snapshot(self, obj_id):
+        """Load a detached copy of one row with the active profile's relationships.
+
+        The side session shares the request's connection, so it sees rows
+        flushed earlier in the transaction without disturbing it.
+        """
+        with Session(bind=db.session.connection(), expire_on_commit=False) as side:
+            return side.get(self.model, obj_id, options=loader_options(self.model))
+
+    # -------- reads --------
+    def get(self, obj_id):
+        if not self.enabled():
+            return self.inner.get(obj_id)
+
+        # The session's own copy (possibly with pending changes) wins
+        present = db.session.identity_map.get(
+            db.session.identity_key(self.model, obj_id)
+        )
+        if present is not None:
+            return present
+
+        cached = self._lookup(obj_id)
+        if cached is not None:
+            self.hits += 1
+            return db.session.merge(cached, load=False)
+
+        self.misses += 1
+        snapshot = self._snapshot(obj_id)
+        if snapshot is None:
+            return self.inner.get(obj_id)  # e.g. pending, not yet flushed
+        self._store(obj_id, snapshot)
+        return db.session.merge(snapshot, load=False)
+
+    def get_many(self, obj_ids, chunk_size=None):
+        return self.inner.get_many(obj_ids, chunk_size)
+
+    def get_all(self):
+        return self.inner.get_all()
+
+    def get_by_attribute(self, attr_name, attr_value):
+        return self.inner.get_by_attribute(attr_name, attr_value)
+
+    def find(self, filters=None, order_by=None, limit=None, offset=0):
+        return self.inner.find(filters, order_by, limit, offset)
+
+    def get_page(self, cursor=None, limit=None, order_by="created_at",
+                 filters=None):
+        return self.inner.get_page(cursor, limit, order_by, filters)
+
+    def exists(self, **criteria):
+        return self.inner.exists(**criteria)
+
+    def count(self, **criteria):
+        return self.inner.count(**criteria)
+
+    def get_columns(self, obj_id, *columns):
+        return self.inner.get_columns(obj_id, *columns)
+
+    def iter_all(self, chunk_size=None, filters=None):
+        return self.inner.iter_all(chunk_size, filters)
+
+    # -------- writes (invalidate, then delegate) --------
+    def add(self, obj):
+        return self.inner.add(obj)
+
+    def add_many(self, objs, chunk_size=None):
+        return self.inner.add_many(objs, chunk_size)
+
+    def update(self, obj_id, data):
+        self.invalidate_keys({(self.model, obj_id)})
+        return self.inner.update(obj_id, data)
+
+    def delete(self, obj_id):
+        self.invalidate_keys({(self.model, obj_id)})
+        return self.inner.delete(obj_id)
+
+    def update_many(self, updates, chunk_size=None):
+        keys = {(self.model, obj_id) for obj_id in updates}
+        self.invalidate_keys(keys)
+        # Bulk UPDATE bypasses session.dirty: invalidate again on commit
+        db.session.info.setdefault("cache_stale", set()).update(keys)
+        return self.inner.update_many(updates, chunk_size)
+
+    def increment(self, obj_id, deltas, ratios=None):
+        keys = {(self.model, obj_id)}
+        self.invalidate_keys(keys)
+        # Like update_many, the UPDATE statement bypasses session.dirty
+        db.session.info.setdefault("cache_stale", set()).update(keys)
+        return self.inner.increment(obj_id, deltas, ratios)
+
+    def delete_many(self, obj_ids, chunk_size=None):
+        obj_ids = list(obj_ids)
+        self.invalidate_keys({(self.model, obj_id) for obj_id in obj_ids})
+        return self.inner.delete_many(obj_ids, chunk_size)
@@ -0,0 +1,346 @@
+"""
+EmbeddedRepository: file-backed repository for nodes without an SQL
+engine.
+
+Each table lives in ``<data_dir>/<table>/``:
+
+    records.dat     append-only records: 4-byte length + marshal payload
+    primary.*       dbm file, object id -> "offset:length" in records.dat
+    <attr>.*        dbm secondary index (see :class:`DbmIndex`)
+    columns.json    column names of the payloads, in order
+
+A record is the tuple of the model's column values (no keys, datetimes
+as ISO strings), so it is both small and fast to decode. ``records.dat``
+is read through ``mmap`` and each payload is decoded straight from a
+``memoryview`` of the map, without copying it first. Nothing is loaded
+at startup beyond what the dbm module keeps for its own index, and no
+object stays in memory after the call that returned it.
+
+Updates append a new record and repoint the primary index; the old bytes
+become garbage until :meth:`EmbeddedRepository.compact` rewrites the
+file. Querying (find, get_page, count...) reuses InMemoryRepository on
+top of the files: indexed attributes are answered from the index files,
+anything else scans. Returned objects are detached copies holding their
+column values only; relationships are not loaded. Changing a copy changes
+nothing on disk: writes must go through :meth:`EmbeddedRepository.update`.
+"""
+import dbm
+import json
+import marshal
+import mmap
+import os
+import struct
+import threading
+from collections.abc import MutableMapping
+from datetime import datetime
+
+from sqlalchemy import DateTime
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.persistence.repository import InMemoryRepository
+
+_LENGTH = struct.Struct("<I")
+MARSHAL_VERSION = 4
+
+
+def _value_key(value):
+    return b"v" + marshal.dumps(value, MARSHAL_VERSION)
+
+
+def _id_key(obj_id):
+    return b"i" + obj_id.encode("utf-8")
+
+
+class DbmIndex:
+    """Secondary index stored in a dbm file (same protocol as HashIndex).
+
+    ``v<value>`` maps a value to the newline-joined ids holding it and
+    ``i<id>`` maps an id back to its value, so stale entries can be
+    removed without reading the old record.
+    """
+
+    operators = ("eq", "in")
+
+    def __init__(self, path, attr, unique=False, lock=None):
+        self.attr = attr
+        self.unique = unique
+        self._db = dbm.open(path, "c")
+        self._lock = lock or threading.RLock()
+
+    def _ids(self, value):
+        raw = self._db.get(_value_key(value))
+        return set(raw.decode("utf-8").split("\n")) if raw else set()
+
+    def check(self, obj):
+        """Raise ValueError if *obj* would duplicate a unique value"""
+        value = getattr(obj, self.attr, None)
+        if not self.unique or value is None:
+            return
+        with self._lock:
+            if self._ids(value) - {obj.id}:
+                raise ValueError(
+                    f"Duplicate value for unique index {self.attr}: {value!r}"
+                )
+
+    def insert(self, obj):
+        value = getattr(obj, self.attr, None)
+        with self._lock:
+            ids = self._ids(value)
+            ids.add(obj.id)
+            self._db[_value_key(value)] = "\n".join(sorted(ids))
+            self._db[_id_key(obj.id)] = marshal.dumps(value, MARSHAL_VERSION)
+
+    def remove(self, obj_id):
+        with self._lock:
+            raw = self._db.get(_id_key(obj_id))
+            if raw is None:
+                return
+            value = marshal.loads(raw)
+            del self._db[_id_key(obj_id)]
+            ids = self._ids(value) - {obj_id}
+            if ids:
+                self._db[_value_key(value)] = "\n".join(sorted(ids))
+            else:
+                del self._db[_value_key(value)]
+
+    def lookup(self, op, value):
+        """Return the ids matching ``attr <op> value``"""
+        with self._lock:
+            if op == "in":
+                ids = set()
+                for item in value:
+                    ids |= self._ids(item)
+                return ids
+            return self._ids(value)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class RecordStore(MutableMapping):
+    """``{id: object}`` mapping over records.dat and its primary index"""
+
+    def __init__(self, model, path, lock):
+        self.model = model
+        self._lock = lock
+        self._columns = [column.key for column in model.__table__.columns]
+        self._datetimes = {
+            column.key for column in model.__table__.columns
+            if isinstance(column.type, DateTime)
+        }
+        os.makedirs(path, exist_ok=True)
+        self._path = path
+        self._stored_columns = self._load_columns()
+        self._primary = dbm.open(os.path.join(path, "primary"), "c")
+        self._file = open(os.path.join(path, "records.dat"), "a+b")
+        self._map = None
+        self._mapped = 0
+
+    def _load_columns(self):
+        meta = os.path.join(self._path, "columns.json")
+        if os.path.exists(meta):
+            with open(meta, encoding="utf-8") as f:
+                return json.load(f)
+        with open(meta, "w", encoding="utf-8") as f:
+            json.dump(self._columns, f)
+        return self._columns
+
+    # -------- encoding --------
+    def encode(self, obj):
+        values = []
+        for key in self._stored_columns:
+            value = getattr(obj, key, None)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            values.append(value)
+        return marshal.dumps(tuple(values), MARSHAL_VERSION)
+
+    def decode(self, payload):
+        obj = self.model.__mapper__.class_manager.new_instance()
+        for key, value in zip(self._stored_columns, marshal.loads(payload)):
+            if key not in self._columns:
+                continue  # column dropped since the file was written
+            if key in self._datetimes and value is not None:
+                value = datetime.fromisoformat(value)
+            set_committed_value(obj, key, value)
+        return obj
+
+    # -------- file access --------
+    def _view(self, offset, length):
+        """Return a zero-copy memoryview of ``length`` bytes at *offset*"""
+        end = offset + length
+        if end > self._mapped:
+            self._file.flush()
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped = len(self._map)
+        return memoryview(self._map)[offset:end]
+
+    def _location(self, obj_id):
+        raw = self._primary.get(obj_id.encode("utf-8"))
+        if raw is None:
+            return None
+        offset, length = raw.decode("ascii").split(":")
+        return int(offset), int(length)
+
+    def _append(self, payload):
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell() + _LENGTH.size
+        self._file.write(_LENGTH.pack(len(payload)) + payload)
+        self._file.flush()
+        return offset, len(payload)
+
+    # -------- mapping protocol --------
+    def __getitem__(self, obj_id):
+        with self._lock:
+            location = self._location(obj_id)
+            if location is None:
+                raise KeyError(obj_id)
+            view = self._view(*location)
+            try:
+                return self.decode(view)
+            finally:
+                view.release()
+
+    def __setitem__(self, obj_id, obj):
+        payload = self.encode(obj)
+        with self._lock:
+            offset, length = self._append(payload)
+            self._primary[obj_id.encode("utf-8")] = f"{offset}:{length}"
+
+    def __delitem__(self, obj_id):
+        with self._lock:
+            del self._primary[obj_id.encode("utf-8")]
+
+    def __contains__(self, obj_id):
+        with self._lock:
+            return obj_id.encode("utf-8") in self._primary
+
+    def __iter__(self):
+        with self._lock:
+            keys = list(self._primary.keys())
+        return (key.decode("utf-8") for key in keys)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._primary)
+
+    # -------- maintenance --------
+    def compact(self):
+        """Rewrite records.dat with the live records only"""
+        with self._lock:
+            path = os.path.join(self._path, "records.dat")
+            tmp = path + ".tmp"
+            locations = {}
+            with open(tmp, "wb") as out:
+                for key in list(self._primary.keys()):
+                    view = self._view(*self._location(key.decode("utf-8")))
+                    payload = bytes(view)
+                    view.release()
+                    locations[key] = (out.tell() + _LENGTH.size, len(payload))
+                    out.write(_LENGTH.pack(len(payload)) + payload)
+                out.flush()
+                os.fsync(out.fileno())
+            self._close_file()
+            os.replace(tmp, path)
+            self._file = open(path, "a+b")
+            for key, (offset, length) in locations.items():
+                self._primary[key] = f"{offset}:{length}"
+
+    def sync(self):
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            if hasattr(self._primary, "sync"):
+                self._primary.sync()
+
+    def _close_file(self):
+        if self._map is not None:
+            self._map.close()
+            self._map, self._mapped = None, 0
+        self._file.close()
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self.sync()
+            self._close_file()
+            self._primary.close()
+
+
+class EmbeddedRepository(InMemoryRepository):
+    """Repository persisted in an mmap'd record file plus dbm indexes"""
+
+    def __init__(self, model, data_dir, indexed=(), unique=()):
+        """Open (or create) the files of *model* under *data_dir*.
+
+        Args:
+            model: SQLAlchemy model class of the stored objects
+            data_dir: root directory; the table gets its own subdirectory
+            indexed: attributes with a non-unique secondary index file
+            unique: attributes with a unique secondary index file
+        """
+        path = os.path.join(data_dir, model.__tablename__)
+        os.makedirs(path, exist_ok=True)
+        lock = threading.RLock()
+        super().__init__(indexes=[
+            DbmIndex(os.path.join(path, attr), attr, attr in unique, lock)
+            for attr in (*unique, *indexed)
+        ])
+        self.model = model
+        self._lock = lock
+        self._storage = RecordStore(model, path, lock)
+
+    def _snapshot(self, name, build):
+        # Never cache every object in memory: rebuild from the files
+        return build()
+
+    # Index check + write must not interleave with another thread's
+    def add(self, obj):
+        with self._lock:
+            super().add(obj)
+
+    def add_many(self, objs, chunk_size=None):
+        with self._lock:
+            return super().add_many(objs, chunk_size)
+
+    def delete(self, obj_id):
+        with self._lock:
+            super().delete(obj_id)
+
+    def delete_many(self, obj_ids, chunk_size=None):
+        with self._lock:
+            return super().delete_many(obj_ids, chunk_size)
+
+    def increment(self, obj_id, deltas, ratios=None):
+        with self._lock:
+            return super().increment(obj_id, deltas, ratios)
+
+    def update(self, obj_id, data):
+        """Update a stored object: append its new record and reindex.
+
+        Raises ValueError, with nothing written, if the new values break
+        a unique index.
+        """
+        with self._lock:
+            obj = self._storage.get(obj_id)
+            if obj is None:
+                return
+            obj.update(data)
+            self._check_indexes(obj)
+            self._storage[obj_id] = obj
+            self._reindex(obj)
+            self._changed()
+
+    def compact(self):
+        """Reclaim the space of overwritten and deleted records"""
+        self._storage.compact()
+
+    def close(self):
+        """Flush everything to disk and close the files"""
+        self._storage.close()
+        for index in self._indexes:
+            index.close()
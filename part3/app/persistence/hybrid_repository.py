@@ -0,0 +1,441 @@
+"""
+HybridRepository: in-process working set in front of SQLAlchemy.
+
+Reads are served from an InMemoryRepository (dict + secondary indexes)
+holding detached snapshots of every row of the table; writes go straight
+through to a SQLAlchemyRepository, so the database stays the source of
+truth. The working set is loaded on first use ("warming").
+
+Workers stay consistent through the ``change_log`` table. Every flush
+that touches a row of a hybrid-backed model (and the many-to-one parents
+of that row, e.g. the place of a new review) appends ``(seq, entity,
+obj_id, deleted)`` in the same transaction. Rows the database deletes by
+``ON DELETE CASCADE`` (a deleted place's reviews) are looked up before
+the flush and logged as deleted too. Each repository remembers
+the highest ``seq`` it applied and, at most every
+``REPOSITORY_HYBRID_POLL_INTERVAL`` seconds (immediately after a local
+commit), reloads the rows that changed since. A sequence number may
+commit after a higher one; such holes are re-read until they fill or
+``HOLE_TIMEOUT`` passes (a rolled-back insert never fills its hole).
+
+Inside a transaction that already wrote to the model, reads bypass the
+working set and go to SQL so they see the uncommitted changes. Reads run
+under the repository lock, so a concurrent refresh is never seen half
+applied, and every object they return is merged into the session
+(``merge(load=False)``, no SQL): callers never share the snapshots.
+Snapshots are loaded with the ``detail`` loading profile; a row is
+reloaded when it changes, when one of its children changes, or when an
+object it embeds (``place.owner``, ``place.amenities``) changes.
+"""
+import threading
+import time
+import weakref
+from datetime import datetime, timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy import (
+    Boolean, Column, DateTime, Integer, MetaData, String, Table, delete, event,
+    func, insert, select,
+)
+from sqlalchemy.orm import Session
+
+from app import db
+from app.persistence.cached_repository import _embedded_keys, _touched_keys
+from app.persistence.loading import profile_options
+from app.persistence.repository import InMemoryRepository, Repository
+from app.persistence.sqlalchemy_repository import SQLAlchemyRepository
+from app.persistence.unit_of_work import unit_of_work
+
+EXTENSION_KEY = "hbnb_hybrid_repositories"
+DEFAULT_POLL_INTERVAL = 1.0
+HOLE_TIMEOUT = 30.0  # seconds; longer than any write transaction
+
+# Kept out of db.metadata like replica_heartbeat: created on demand
+change_log = Table(
+    "change_log",
+    MetaData(),
+    Column("seq", Integer, primary_key=True, autoincrement=True),
+    Column("entity", String(64), nullable=False),
+    Column("obj_id", String(36), nullable=False),
+    Column("deleted", Boolean, nullable=False, default=False),
+    Column("changed_at", DateTime, nullable=False, default=datetime.utcnow),
+)
+
+_ensured = weakref.WeakSet()
+
+
+def ensure_change_log(engine):
+    """Create the change_log table once per engine"""
+    if engine not in _ensured:
+        change_log.create(engine, checkfirst=True)
+        _ensured.add(engine)
+
+
+def prune_change_log(max_age):
+    """Delete change_log rows older than *max_age* seconds.
+
+    Run it from a periodic job; *max_age* must exceed the longest time a
+    worker can go without polling, or that worker misses changes.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=max_age)
+    with unit_of_work():
+        result = db.session.execute(
+            delete(change_log).where(change_log.c.changed_at < cutoff)
+        )
+    return result.rowcount
+
+
+def _app_hybrids():
+    if not has_app_context():
+        return ()
+    return list(current_app.extensions.get(EXTENSION_KEY, ()))
+
+
+def _log_rows(keys, deleted=()):
+    return [
+        {"entity": model.__tablename__, "obj_id": obj_id,
+         "deleted": (model, obj_id) in deleted}
+        for model, obj_id in keys if obj_id is not None
+    ]
+
+
+def _cascaded_deletes(connection, deleted):
+    """Return the ``(model, id)`` rows the database will delete along with
+    *deleted* through ``ON DELETE CASCADE`` foreign keys, transitively"""
+    tables = {mapper.local_table: mapper.class_
+              for mapper in db.Model.registry.mappers}
+    found, frontier = set(), set(deleted)
+    while frontier:
+        ids_by_table = {}
+        for model, obj_id in frontier:
+            ids_by_table.setdefault(model.__table__, set()).add(obj_id)
+        frontier = set()
+        for table, model in tables.items():
+            for fk in table.foreign_keys:
+                ids = ids_by_table.get(fk.column.table)
+                if not ids or (fk.ondelete or "").upper() != "CASCADE":
+                    continue
+                for obj_id in connection.execute(
+                    select(table.c.id).where(fk.parent.in_(ids))
+                ).scalars():
+                    key = (model, obj_id)
+                    if key not in found and key not in deleted:
+                        found.add(key)
+                        frontier.add(key)
+    return found
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_cascaded_deletes(session, flush_context, instances):
+    if not session.deleted or not _app_hybrids():
+        return
+    deleted = {(type(obj), getattr(obj, "id", None)) for obj in session.deleted}
+    session.info.setdefault("hybrid_cascaded", set()).update(
+        _cascaded_deletes(session.connection(), deleted)
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _log_flushed_changes(session, flush_context):
+    cascaded = session.info.pop("hybrid_cascaded", set())
+    hybrids = _app_hybrids()
+    if not hybrids:
+        return
+    tracked = {repo.model for repo in hybrids}
+    keys, deleted = set(cascaded), set(cascaded)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        keys.update(_touched_keys(obj))
+    for obj in session.deleted:
+        deleted.add((type(obj), getattr(obj, "id", None)))
+    keys = {key for key in keys if key[0] in tracked}
+    if keys:
+        session.connection().execute(insert(change_log), _log_rows(keys, deleted))
+        session.info.setdefault("hybrid_dirty", set()).update(m for m, _ in keys)
+
+
+@event.listens_for(Session, "after_commit")
+def _poll_after_commit(session):
+    if session.in_nested_transaction():
+        return
+    if session.info.pop("hybrid_dirty", None):
+        for repo in _app_hybrids():
+            repo.mark_due()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_dirty(session):
+    session.info.pop("hybrid_dirty", None)
+    session.info.pop("hybrid_cascaded", None)
+
+
+class HybridRepository(Repository):
+    """In-memory reads, write-through to SQL, change-log invalidation"""
+
+    def __init__(self, model, indexes=None, poll_interval=None,
+                 clock=time.monotonic):
+        """Must be created inside an application context.
+
+        Args:
+            model: SQLAlchemy model class
+            indexes: callable returning fresh secondary indexes for the
+                working set (called again on every warm)
+            poll_interval: seconds between change_log polls (default:
+                ``REPOSITORY_HYBRID_POLL_INTERVAL``)
+        """
+        self.model = model
+        self.entity = model.__tablename__
+        self.inner = SQLAlchemyRepository(model)
+        self._make_indexes = indexes or list
+        self._memory = None
+        # (entity, id) of an embedded object -> ids of the rows embedding it
+        self._dependents = {}
+        self._embeds = {}  # row id -> the (entity, id) keys it embeds
+        self._poll_interval = poll_interval
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._last_seq = 0
+        self._holes = {}  # seq -> clock() when first missed
+        self._last_poll = None
+        self._due = False
+        self.polls = self.reloads = 0
+        ensure_change_log(db.engine)
+        current_app.extensions.setdefault(EXTENSION_KEY, weakref.WeakSet()).add(self)
+
+    # -------- working set --------
+    def _interval(self):
+        if self._poll_interval is not None:
+            return self._poll_interval
+        return current_app.config.get("REPOSITORY_HYBRID_POLL_INTERVAL",
+                                      DEFAULT_POLL_INTERVAL)
+
+    def mark_due(self):
+        """Poll on the next read (a local commit changed the table)"""
+        self._due = True
+
+    def _load_options(self):
+        return profile_options(self.model, "detail")
+
+    def _side_session(self):
+        # Shares the request's connection: sees what it sees, commits nothing
+        return Session(bind=db.session.connection(), expire_on_commit=False)
+
+    def _track(self, obj):
+        keys = {(model.__tablename__, str(obj_id))
+                for model, obj_id in _embedded_keys(obj)}
+        self._embeds[obj.id] = keys
+        for key in keys:
+            self._dependents.setdefault(key, set()).add(obj.id)
+
+    def _untrack(self, obj_id):
+        for key in self._embeds.pop(obj_id, ()):
+            ids = self._dependents[key]
+            ids.discard(obj_id)
+            if not ids:
+                del self._dependents[key]
+
+    def warm(self):
+        """(Re)load every row into a fresh working set"""
+        with self._lock, self._side_session() as side:
+            # Start from the last change old enough to be settled: a younger
+            # seq may still be followed by a lower one committing late, so
+            # the next poll re-reads them (reloading a row is idempotent)
+            settled = datetime.utcnow() - timedelta(seconds=HOLE_TIMEOUT)
+            last_seq = side.scalar(
+                select(func.max(change_log.c.seq))
+                .where(change_log.c.changed_at < settled)
+            ) or 0
+            memory = InMemoryRepository(indexes=self._make_indexes())
+            stmt = select(self.model).options(*self._load_options())
+            objs = side.scalars(stmt).unique().all()
+            memory.add_many(objs)
+            self._memory = memory
+            self._dependents, self._embeds = {}, {}
+            for obj in objs:
+                self._track(obj)
+            self._last_seq, self._holes = last_seq, {}
+            self._last_poll, self._due = self._clock(), True
+
+    def refresh(self):
+        """Apply the change_log rows written since the last poll"""
+        with self._lock, self._side_session() as side:
+            now = self._clock()
+            self._holes = {seq: seen for seq, seen in self._holes.items()
+                           if now - seen < HOLE_TIMEOUT}
+            low = min(self._holes) - 1 if self._holes else self._last_seq
+            rows = side.execute(
+                select(change_log.c.seq, change_log.c.entity,
+                       change_log.c.obj_id, change_log.c.deleted)
+                .where(change_log.c.seq > low)
+                .order_by(change_log.c.seq)
+            ).all()
+            changed = {}
+            for seq, entity, obj_id, deleted in rows:
+                self._holes.pop(seq, None)
+                if seq > self._last_seq:
+                    for missing in range(self._last_seq + 1, seq):
+                        self._holes.setdefault(missing, now)
+                    self._last_seq = seq
+                if entity == self.entity:
+                    changed[obj_id] = deleted
+                for dependent in list(self._dependents.get((entity, obj_id), ())):
+                    changed.setdefault(dependent, False)
+            for obj_id, deleted in changed.items():
+                self._memory.delete(obj_id)
+                self._untrack(obj_id)
+                if not deleted:
+                    obj = side.get(self.model, obj_id,
+                                   options=self._load_options())
+                    if obj is not None:
+                        self._memory.add(obj)
+                        self._track(obj)
+            self.polls += 1
+            self.reloads += len(changed)
+            self._last_poll, self._due = now, False
+
+    def _working_set(self):
+        """Return the up-to-date working set; call with ``self._lock`` held"""
+        if self._memory is None:
+            self.warm()
+        elif self._due or self._clock() - self._last_poll >= self._interval():
+            self.refresh()
+        return self._memory
+
+    def _read(self, method, *args):
+        """Run one working-set read under the lock: refresh() mutates it"""
+        with self._lock:
+            return getattr(self._working_set(), method)(*args)
+
+    def _bypass(self):
+        """True when this transaction holds writes the working set lacks"""
+        session = db.session
+        if self.model in session.info.get("hybrid_dirty", ()):
+            return True
+        return any(isinstance(obj, self.model)
+                   for obj in (*session.new, *session.dirty, *session.deleted))
+
+    def _attach(self, obj):
+        return None if obj is None else db.session.merge(obj, load=False)
+
+    def _attach_all(self, objs):
+        return [self._attach(obj) for obj in objs]
+
+    def stats(self):
+        with self._lock:
+            size = self._memory.count() if self._memory is not None else 0
+        return {
+            "entity": self.entity,
+            "size": size,
+            "last_seq": self._last_seq,
+            "polls": self.polls,
+            "reloads": self.reloads,
+        }
+
+    # -------- reads --------
+    def get(self, obj_id):
+        if self._bypass():
+            return self.inner.get(obj_id)
+        present = db.session.identity_map.get(
+            db.session.identity_key(self.model, obj_id)
+        )
+        if present is not None:
+            return present
+        obj = self._read("get", obj_id)
+        if obj is None:
+            # Maybe created by another worker since the last poll
+            return self.inner.get(obj_id)
+        return self._attach(obj)
+
+    def get_many(self, obj_ids, chunk_size=None):
+        if self._bypass():
+            return self.inner.get_many(obj_ids, chunk_size)
+        found, missing = self._read("get_many", obj_ids, chunk_size)
+        if missing:
+            return self.inner.get_many(obj_ids, chunk_size)
+        return self._attach_all(found), missing
+
+    def get_all(self):
+        if self._bypass():
+            return self.inner.get_all()
+        return self._attach_all(self._read("get_all"))
+
+    def get_by_attribute(self, attr_name, attr_value):
+        if self._bypass():
+            return self.inner.get_by_attribute(attr_name, attr_value)
+        return self._attach(self._read("get_by_attribute", attr_name, attr_value))
+
+    def find(self, filters=None, order_by=None, limit=None, offset=0):
+        if self._bypass():
+            return self.inner.find(filters, order_by, limit, offset)
+        return self._attach_all(
+            self._read("find", filters, order_by, limit, offset)
+        )
+
+    def get_page(self, cursor=None, limit=None, order_by="created_at",
+                 filters=None):
+        if self._bypass():
+            return self.inner.get_page(cursor, limit, order_by, filters)
+        items, next_cursor = self._read("get_page", cursor, limit, order_by,
+                                        filters)
+        return self._attach_all(items), next_cursor
+
+    def exists(self, **criteria):
+        if self._bypass():
+            return self.inner.exists(**criteria)
+        with self._lock:
+            return self._working_set().exists(**criteria)
+
+    def count(self, **criteria):
+        if self._bypass():
+            return self.inner.count(**criteria)
+        with self._lock:
+            return self._working_set().count(**criteria)
+
+    def get_columns(self, obj_id, *columns):
+        if self._bypass():
+            return self.inner.get_columns(obj_id, *columns)
+        return self._read("get_columns", obj_id, *columns)
+
+    def iter_all(self, chunk_size=None, filters=None):
+        if self._bypass():
+            return self.inner.iter_all(chunk_size, filters)
+        # The working set is already in memory: take the matches under the
+        # lock, then hand them out one by one
+        return map(self._attach, self._read("find", filters or None))
+
+    # -------- writes (through to SQL) --------
+    def _log_bulk(self, keys):
+        """Log writes that bypass the ORM flush (UPDATE statements)"""
+        rows = _log_rows(keys)
+        if rows:
+            with unit_of_work():
+                db.session.execute(insert(change_log), rows)
+                db.session.info.setdefault("hybrid_dirty", set()).add(self.model)
+
+    def add(self, obj):
+        return self.inner.add(obj)
+
+    def update(self, obj_id, data):
+        return self.inner.update(obj_id, data)
+
+    def delete(self, obj_id):
+        return self.inner.delete(obj_id)
+
+    # add_many and delete_many flush through the ORM: the flush hook logs them
+    def add_many(self, objs, chunk_size=None):
+        return self.inner.add_many(objs, chunk_size)
+
+    def update_many(self, updates, chunk_size=None):
+        with unit_of_work():
+            count = self.inner.update_many(updates, chunk_size)
+            self._log_bulk({(self.model, obj_id) for obj_id in updates})
+        return count
+
+    def increment(self, obj_id, deltas, ratios=None):
+        with unit_of_work():
+            found = self.inner.increment(obj_id, deltas, ratios)
+            if found:
+                self._log_bulk({(self.model, obj_id)})
+        return found
+
+    def delete_many(self, obj_ids, chunk_size=None):
+        return self.inner.delete_many(obj_ids, chunk_size)
@@ -0,0 +1,84 @@
+"""
+Relationship loading profiles.
+
+Every relationship is lazy by default, so a read loads only the rows it
+asked for. A facade method that knows what its caller will serialize
+names a profile instead, and the SQL repositories turn it into loader
+options for the statements they run while the profile is active::
+
+    @loading("detail")
+    def get_place(self, place_id):
+        return self.place_repo.get(place_id)
+
+Profiles:
+
+    list    pages and ``?ids=`` batches: summary columns only, wide columns
+            the summaries never show (password, description) deferred
+    detail  one object with what its detail response shows (a place with
+            its owner and amenities; reviews are paged separately)
+    auth    a user looked up to log in: the credential columns only, and
+            relationships raise instead of loading
+
+A profile only changes what is loaded up front; anything it does not
+cover is still lazy-loaded on access (except under ``auth``). Backends
+that do not run SQL per read (memory, embedded) ignore profiles.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy.orm import defer, joinedload, load_only, raiseload, selectinload
+
+_current = ContextVar("hbnb_loading_profile", default=None)
+
+# profile -> table name -> model -> loader options
+PROFILES = {
+    "list": {
+        "users": lambda model: (defer(model.password),),
+        "places": lambda model: (defer(model.description),),
+    },
+    "detail": {
+        "places": lambda model: (
+            joinedload(model.owner),
+            selectinload(model.amenities),
+        ),
+    },
+    "auth": {
+        "users": lambda model: (
+            load_only(model.id, model.email, model.password, model.is_admin,
+                      model.first_name, model.last_name),
+            raiseload("*"),
+        ),
+    },
+}
+
+
+@contextmanager
+def loading(profile):
+    """Apply *profile* to the repository reads made inside the block.
+
+    Also usable as a decorator. Raises ValueError for an unknown profile.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown loading profile: {profile}")
+    token = _current.set(profile)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def current_profile():
+    """Return the name of the active profile, or None"""
+    return _current.get()
+
+
+def profile_options(model, profile):
+    """Return the loader options *profile* defines for *model*"""
+    build = PROFILES[profile].get(model.__tablename__)
+    return build(model) if build else ()
+
+
+def loader_options(model):
+    """Return the loader options of the active profile for *model*"""
+    profile = _current.get()
+    return profile_options(model, profile) if profile else ()
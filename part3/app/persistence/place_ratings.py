@@ -0,0 +1,107 @@
+"""
+Rating aggregate repair.
+
+``places.review_count``, ``rating_sum`` and ``rating_avg`` are kept by the
+facade's review writes, in the same transaction as the review. Writes
+that bypass the facade (raw SQL, ``ON DELETE CASCADE`` from a deleted
+user, imports) leave them stale. :func:`drifted_place_ratings` recomputes
+the aggregates from ``reviews`` with one grouped query and returns only
+the places whose stored values disagree; the facade's
+``repair_place_ratings`` writes them back through the place repository,
+so caches and working sets are invalidated as for any other update.
+Backends without SQL (memory, embedded) use :func:`scan_place_ratings`,
+which makes the same comparison over the repositories' objects.
+
+From the command line::
+
+    flask --app run repair-ratings
+"""
+import click
+from sqlalchemy import and_, func, literal_column, or_, select
+
+from app import db
+
+# A stored rating_avg within this of sum / count is not drift (float noise)
+AVG_TOLERANCE = 1e-9
+
+
+def drift_statement():
+    """SELECT ``(id, review_count, rating_sum)`` of places whose stored
+    aggregates disagree with their reviews"""
+    from app.models.place import Place
+    from app.models.review import Review
+
+    totals = (
+        select(Review.place_id,
+               func.count().label("review_count"),
+               func.sum(Review.rating).label("rating_sum"))
+        .group_by(Review.place_id)
+        .subquery()
+    )
+    count = func.coalesce(totals.c.review_count, 0)
+    total = func.coalesce(totals.c.rating_sum, 0)
+    average = total * literal_column("1e0") / func.nullif(count, 0)
+    return (
+        select(Place.id, count, total)
+        .outerjoin(totals, totals.c.place_id == Place.id)
+        .where(or_(
+            Place.review_count != count,
+            Place.rating_sum != total,
+            and_(Place.rating_avg.is_(None), count > 0),
+            and_(Place.rating_avg.is_not(None), count == 0),
+            func.abs(Place.rating_avg - average) > AVG_TOLERANCE,
+        ))
+    )
+
+
+def aggregates(count, total):
+    """The stored values for *count* reviews rating *total* in all"""
+    return {
+        "review_count": count,
+        "rating_sum": total,
+        "rating_avg": total / count if count else None,
+    }
+
+
+def is_drifted(place, expected):
+    """True when *place*'s stored aggregates differ from *expected*"""
+    if (place.review_count, place.rating_sum) != (
+            expected["review_count"], expected["rating_sum"]):
+        return True
+    if expected["rating_avg"] is None or place.rating_avg is None:
+        return expected["rating_avg"] is not place.rating_avg
+    return abs(place.rating_avg - expected["rating_avg"]) > AVG_TOLERANCE
+
+
+def drifted_place_ratings():
+    """Return ``{place_id: aggregates}`` for every place that needs repair"""
+    return {
+        place_id: aggregates(count, total)
+        for place_id, count, total in db.session.execute(drift_statement())
+    }
+
+
+def scan_place_ratings(places, reviews):
+    """:func:`drifted_place_ratings` over objects instead of SQL, for the
+    memory and embedded backends (reads every place and review once)"""
+    totals = {}
+    for review in reviews:
+        count, total = totals.get(review.place_id, (0, 0))
+        totals[review.place_id] = (count + 1, total + review.rating)
+    drifted = {}
+    for place in places:
+        expected = aggregates(*totals.get(place.id, (0, 0)))
+        if is_drifted(place, expected):
+            drifted[place.id] = expected
+    return drifted
+
+
+def register_rating_repair(app):
+    """Add the ``flask repair-ratings`` command to *app*"""
+
+    @app.cli.command("repair-ratings")
+    def repair_ratings():
+        """Recompute place rating aggregates from their reviews."""
+        from app.services.facade import HBnBFacade
+
+        click.echo(f"{HBnBFacade().repair_place_ratings()} places repaired")
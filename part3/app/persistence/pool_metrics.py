@@ -0,0 +1,171 @@
+"""
+Connection-pool telemetry.
+
+:class:`PoolMetrics` watches one engine's pool. It records how long each
+checkout takes (the wait for a free connection plus any pre-ping or new
+connect), the number of connections in use and the peak, connections
+opened beyond ``pool_size`` (overflow), and checkout timeouts. When the
+share of the pool in use reaches ``POOL_SATURATION_WARNING`` it logs a
+warning, once per crossing.
+
+The counters live in the serving process: read them from the admin-only
+``GET /api/v1/metrics/pool`` endpoint (a ``flask`` command would start a
+new process with an idle pool).
+"""
+import logging
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SATURATION_WARNING = 0.8
+EXTENSION_KEY = "hbnb_pool_metrics"
+
+
+class PoolMetrics:
+    """Counters for the pool of *engine*"""
+
+    def __init__(self, engine, saturation_warning=DEFAULT_SATURATION_WARNING,
+                 clock=time.perf_counter):
+        self.engine = engine
+        self.saturation_warning = saturation_warning
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._saturated = False
+        self.checkouts = 0
+        self.checkout_time = 0.0
+        self.max_checkout_time = 0.0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.overflow_connections = 0
+        self.timeouts = 0
+        self.saturation_warnings = 0
+
+        # Engine-level listeners follow the pool across engine.dispose()
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        self._raw_connection = engine.raw_connection
+        engine.raw_connection = self._timed_checkout
+
+    @property
+    def pool(self):
+        return self.engine.pool
+
+    # -------- capacity --------
+    def capacity(self):
+        """pool_size + max_overflow, or None for pools without a limit"""
+        size = getattr(self.pool, "size", None)
+        overflow = getattr(self.pool, "_max_overflow", None)
+        if size is None or overflow is None or overflow < 0:
+            return None
+        return size() + overflow
+
+    def saturation(self):
+        capacity = self.capacity()
+        return self.in_use / capacity if capacity else 0.0
+
+    # -------- pool hooks --------
+    def _timed_checkout(self):
+        start = self._clock()
+        try:
+            return self._raw_connection()
+        except PoolTimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            logger.warning("Connection pool timeout on %s (%d in use)",
+                           self._name(), self.in_use)
+            raise
+        finally:
+            elapsed = self._clock() - start
+            with self._lock:
+                self.checkout_time += elapsed
+                self.max_checkout_time = max(self.max_checkout_time, elapsed)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        # QueuePool counts a new connection before opening it, so overflow()
+        # is positive only while opening one beyond pool_size. A record that
+        # reconnects after an invalidation keeps its slot: count it once.
+        if "hbnb_counted" in connection_record.record_info:
+            return
+        connection_record.record_info["hbnb_counted"] = True
+        overflow = getattr(self.pool, "overflow", None)
+        if overflow is not None and overflow() > 0:
+            with self._lock:
+                self.overflow_connections += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            warn = self._check_saturation()
+        if warn:
+            logger.warning(
+                "Connection pool %s is %.0f%% saturated (%d/%d in use)",
+                self._name(), self.saturation() * 100, self.in_use,
+                self.capacity(),
+            )
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+            self._check_saturation()
+
+    def _check_saturation(self):
+        """Update the saturated flag; True when the threshold was just crossed"""
+        saturated = (
+            self.capacity() is not None
+            and self.saturation() >= self.saturation_warning
+        )
+        crossed = saturated and not self._saturated
+        self._saturated = saturated
+        if crossed:
+            self.saturation_warnings += 1
+        return crossed
+
+    def _name(self):
+        return self.engine.url.render_as_string(hide_password=True)
+
+    # -------- reporting --------
+    def snapshot(self):
+        """Return every counter plus the current saturation"""
+        with self._lock:
+            return {
+                "engine": self._name(),
+                "capacity": self.capacity(),
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "saturation": round(self.saturation(), 3),
+                "checkouts": self.checkouts,
+                "avg_checkout_ms": round(
+                    1000 * self.checkout_time / self.checkouts, 3
+                ) if self.checkouts else 0.0,
+                "max_checkout_ms": round(1000 * self.max_checkout_time, 3),
+                "overflow_connections": self.overflow_connections,
+                "timeouts": self.timeouts,
+                "saturation_warnings": self.saturation_warnings,
+            }
+
+
+def register_pool_metrics(app, db):
+    """Attach a PoolMetrics to every engine of *app*"""
+    threshold = app.config.get("POOL_SATURATION_WARNING",
+                               DEFAULT_SATURATION_WARNING)
+    with app.app_context():
+        engines = list(db.engines.values())
+    router = app.extensions.get("hbnb_replicas")
+    if router is not None:
+        engines.extend(router.replicas)
+    app.extensions[EXTENSION_KEY] = [
+        PoolMetrics(engine, threshold) for engine in engines
+    ]
+
+
+def pool_metrics():
+    """Return one snapshot per engine of the current app"""
+    return [m.snapshot() for m in current_app.extensions.get(EXTENSION_KEY, ())]
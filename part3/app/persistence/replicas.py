@@ -0,0 +1,240 @@
+"""
+Read-replica routing for the Flask-SQLAlchemy session.
+
+With ``DATABASE_REPLICA_URLS`` set, :class:`RoutingSession` sends plain
+SELECTs to a replica and everything else (flushes, bulk UPDATE/DELETE,
+``SELECT ... FOR UPDATE``) to the primary. Each session (one per request)
+takes the next replica round-robin and keeps it, so its reads come from a
+single replica. Once a
+session has written - or opened a unit of work, whose validation reads
+must see the primary - it stays pinned to the primary until it is
+removed at the end of the request, so a request always reads its own
+writes.
+
+Replica lag is measured with a heartbeat row: every
+``REPLICA_HEALTH_INTERVAL`` seconds a background thread stamps the
+primary's ``replica_heartbeat`` table and reads the stamp back from each
+replica. A replica whose stamp trails the primary's by more than
+``REPLICA_MAX_LAG`` seconds is taken out of rotation until it catches up;
+with no healthy replica, reads fall back to the primary. Requests only
+read the current rotation, so a slow replica never delays them.
+"""
+import atexit
+import itertools
+import threading
+from datetime import datetime
+
+from flask import current_app, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import (
+    Column, DateTime, Integer, MetaData, Table, create_engine, event, select,
+)
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql import Select
+
+DEFAULT_REPLICA_MAX_LAG = 5.0
+DEFAULT_REPLICA_HEALTH_INTERVAL = 5.0
+EXTENSION_KEY = "hbnb_replicas"
+
+# Kept out of db.metadata: the router creates it on the primary and it
+# reaches the replicas through replication like any other table.
+heartbeat_table = Table(
+    "replica_heartbeat",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("beat", DateTime, nullable=False),
+)
+
+
+def pin_primary(session):
+    """Route every later statement of *session* to the primary"""
+    session.info["primary_pinned"] = True
+
+
+def is_pinned(session):
+    return session.info.get("primary_pinned", False)
+
+
+class ReplicaRouter:
+    """Round-robin over the replicas that pass the lag probe"""
+
+    def __init__(self, primary, replicas, max_lag=DEFAULT_REPLICA_MAX_LAG,
+                 interval=DEFAULT_REPLICA_HEALTH_INTERVAL, now=datetime.utcnow):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self.interval = interval
+        self._now = now
+        self._lock = threading.Lock()
+        self._probing = threading.Lock()
+        self._healthy = list(self.replicas)
+        self._cycle = itertools.cycle(self._healthy)
+        self._stop = threading.Event()
+        self._thread = None
+        self.lag = {}
+
+    # -------- routing --------
+    def next_replica(self):
+        """Return the next healthy replica engine, or None"""
+        with self._lock:
+            return next(self._cycle, None)
+
+    # -------- health --------
+    def start(self):
+        """Probe now and then every ``interval`` seconds on a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="hbnb-replica-probe", daemon=True
+            )
+            self._thread.start()
+
+    def close(self, timeout=None):
+        """Stop the probe thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        self.probe()
+        while not self._stop.wait(self.interval):
+            self.probe()
+
+    def probe(self):
+        """Measure every replica's lag, then stamp a new heartbeat.
+
+        Lag is how far a replica's heartbeat trails the one the primary
+        held before this probe, so a replica that is fully caught up
+        reports zero. An unreachable replica counts as infinitely late.
+        Only one probe runs at a time: a call made while another is
+        running returns the current health without probing.
+        """
+        if not self._probing.acquire(blocking=False):
+            return self.health()
+        try:
+            return self._probe()
+        finally:
+            self._probing.release()
+
+    def _probe(self):
+        try:
+            primary_beat = self._read_beat(self.primary, create=True)
+        except SQLAlchemyError:
+            return self.health()  # primary unavailable: keep the rotation
+        lag = {}
+        for engine in self.replicas:
+            try:
+                replica_beat = self._read_beat(engine)
+            except SQLAlchemyError:
+                replica_beat = None
+            if primary_beat is None:
+                lag[engine] = 0.0  # first probe: nothing to compare yet
+            elif replica_beat is None:
+                lag[engine] = float("inf")
+            else:
+                lag[engine] = max(0.0, (primary_beat - replica_beat).total_seconds())
+
+        healthy = [engine for engine in self.replicas if lag[engine] <= self.max_lag]
+        with self._lock:
+            self.lag = lag
+            if healthy != self._healthy:
+                self._healthy = healthy
+                self._cycle = itertools.cycle(healthy)
+        self._write_beat()
+        return self.health()
+
+    def health(self):
+        """Return ``{replica url: {"lag": seconds, "healthy": bool}}``"""
+        return {
+            engine.url.render_as_string(hide_password=True): {
+                "lag": self.lag.get(engine),
+                "healthy": engine in self._healthy,
+            }
+            for engine in self.replicas
+        }
+
+    def _read_beat(self, engine, create=False):
+        with engine.connect() as conn:
+            if create:
+                heartbeat_table.create(conn, checkfirst=True)
+                conn.commit()
+            return conn.execute(
+                select(heartbeat_table.c.beat).where(heartbeat_table.c.id == 1)
+            ).scalar()
+
+    def _write_beat(self):
+        try:
+            with self.primary.begin() as conn:
+                values = {"beat": self._now()}
+                updated = conn.execute(
+                    heartbeat_table.update()
+                    .where(heartbeat_table.c.id == 1)
+                    .values(**values)
+                ).rowcount
+                if not updated:
+                    conn.execute(heartbeat_table.insert().values(id=1, **values))
+        except SQLAlchemyError:
+            pass  # the next probe tries again
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that reads from replicas when it can"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+            and not self._flushing
+            and not is_pinned(self)
+            and has_app_context()
+        ):
+            replica = self._replica()
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _replica(self):
+        """Pick a replica once per session so a request reads one snapshot"""
+        if "replica" not in self.info:
+            router = current_app.extensions.get(EXTENSION_KEY)
+            self.info["replica"] = router.next_replica() if router else None
+        return self.info["replica"]
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _pin_after_write(session, flush_context):
+    pin_primary(session)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _pin_on_dml(orm_execute_state):
+    state = orm_execute_state
+    if state.is_insert or state.is_update or state.is_delete:
+        pin_primary(state.session)
+
+
+def init_replicas(app, db):
+    """Create the replica engines listed in ``DATABASE_REPLICA_URLS``"""
+    urls = app.config.get("DATABASE_REPLICA_URLS") or ()
+    if not urls:
+        return None
+    options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+    with app.app_context():
+        primary = db.engine
+    router = ReplicaRouter(
+        primary,
+        [create_engine(url, **options) for url in urls],
+        max_lag=app.config.get("REPLICA_MAX_LAG", DEFAULT_REPLICA_MAX_LAG),
+        interval=app.config.get("REPLICA_HEALTH_INTERVAL",
+                                DEFAULT_REPLICA_HEALTH_INTERVAL),
+    )
+    app.extensions[EXTENSION_KEY] = router
+    router.start()
+    atexit.register(router.close, 5)
+    return router
+
+
+def replica_router():
+    """Return the current app's ReplicaRouter (None without replicas)"""
+    return current_app.extensions.get(EXTENSION_KEY)
@@ -1,5 +1,100 @@
 """Repository pattern implementation for data persistence"""
+import base64
+import json
+import operator
 from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import islice
+
+# Keyset pagination defaults (the API layer applies its own configured cap)
+DEFAULT_PAGE_SIZE = 50
+# Rows written per flush / statement by the bulk methods
+DEFAULT_CHUNK_SIZE = 500
+PAGE_ORDERINGS = ("created_at", "-created_at")
+# Operators accepted by find(): {"price__gte": 50, "email__in": [...], ...}
+FILTER_OPERATORS = ("eq", "ne", "in", "lt", "lte", "gt", "gte", "prefix", "isnull")
+
+
+def encode_cursor(obj):
+    """Return an opaque token for the (created_at, id) key of *obj*"""
+    key = [obj.created_at.isoformat(), obj.id]
+    raw = json.dumps(key, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """Turn a token produced by :func:`encode_cursor` back into a key"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, obj_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(obj_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid pagination cursor")
+
+
+def chunked(iterable, size):
+    """Yield lists of at most *size* items from *iterable*"""
+    if size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_filters(filters):
+    """Split ``{"attr__op": value}`` filters into ``(attr, op, value)`` triples.
+
+    A key without ``__op`` means equality. Raises ValueError on an unknown
+    operator.
+    """
+    parsed = []
+    for key, value in (filters or {}).items():
+        attr, _, op = key.partition("__")
+        op = op or "eq"
+        if op not in FILTER_OPERATORS:
+            raise ValueError(f"Unknown filter operator: {op}")
+        if op == "in":
+            value = list(value)
+        parsed.append((attr, op, value))
+    return parsed
+
+
+def parse_order_by(order_by):
+    """Turn ``"-price"`` or ``["-price", "title"]`` into ``(attr, desc)`` pairs"""
+    if not order_by:
+        return []
+    if isinstance(order_by, str):
+        order_by = [order_by]
+    return [(key.lstrip("-"), key.startswith("-")) for key in order_by]
+
+
+def check_page_args(limit, order_by):
+    """Validate *limit* / *order_by* shared by every get_page implementation"""
+    if order_by not in PAGE_ORDERINGS:
+        raise ValueError(f"order_by must be one of {', '.join(PAGE_ORDERINGS)}")
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return limit
+
+
+# Python equivalents of the comparison operators (also valid on SQL columns)
+COMPARATORS = {
+    "eq": operator.eq, "ne": operator.ne,
+    "lt": operator.lt, "lte": operator.le,
+    "gt": operator.gt, "gte": operator.ge,
+}
+
+
+def _sort_key(value):
+    """Sort key that places None first, like SQL's ascending NULL order"""
+    return (value is not None, value)
+
 
 class Repository(ABC):
     """Abstract base class for repository pattern"""
@@ -14,6 +109,16 @@ class Repository(ABC):
         """Retrieve an object by its ID"""
         pass
 
+    @abstractmethod
+    def get_many(self, obj_ids, chunk_size=None):
+        """Fetch several objects at once.
+
+        Returns ``(objects, missing_ids)``: *objects* follow the order of
+        *obj_ids* (duplicates collapsed), *missing_ids* lists the ids that
+        were not found, in input order.
+        """
+        pass
+
     @abstractmethod
     def get_all(self):
         """Retrieve all objects"""
@@ -34,40 +139,403 @@ class Repository(ABC):
         """Find an object by a specific attribute"""
         pass
 
+    @abstractmethod
+    def find(self, filters=None, order_by=None, limit=None, offset=0):
+        """Return the objects matching *filters*, sorted and sliced.
+
+        *filters* maps ``"attr"`` or ``"attr__op"`` to a value, with *op*
+        one of :data:`FILTER_OPERATORS`; *order_by* is a field name or a
+        list of them, ``"-"``-prefixed for descending order.
+        """
+        pass
+
+    @abstractmethod
+    def get_page(self, cursor=None, limit=None, order_by="created_at",
+                 filters=None):
+        """Return ``(items, next_cursor)`` using keyset pagination.
+
+        Objects are ordered by ``(created_at, id)`` (``"-created_at"`` for
+        newest first). *cursor* is the opaque token returned by the previous
+        call; ``next_cursor`` is ``None`` once the last page is reached.
+        *filters* uses the same syntax as :meth:`find`.
+        """
+        pass
+
+    @abstractmethod
+    def exists(self, **criteria):
+        """Return True if any object matches the equality *criteria*"""
+        pass
+
+    @abstractmethod
+    def count(self, **criteria):
+        """Return how many objects match the equality *criteria*"""
+        pass
+
+    @abstractmethod
+    def get_columns(self, obj_id, *columns):
+        """Return ``{column: value}`` for one object, or None if missing"""
+        pass
+
+    @abstractmethod
+    def iter_all(self, chunk_size=None, filters=None):
+        """Lazily yield every object (optionally ``filters``-matching).
+
+        Unlike :meth:`get_all` this never materialises the whole table;
+        *filters* is a dict of ``attribute: value`` equality predicates.
+        """
+        pass
+
+    @abstractmethod
+    def add_many(self, objs, chunk_size=None):
+        """Add several objects in one batch and return their ids"""
+        pass
+
+    @abstractmethod
+    def update_many(self, updates, chunk_size=None):
+        """Apply ``{obj_id: data}`` updates in one batch; return the count"""
+        pass
+
+    @abstractmethod
+    def increment(self, obj_id, deltas, ratios=None):
+        """Add *deltas* (``{column: amount}``) to one object's counters.
+
+        *ratios* maps a column to ``(numerator, denominator)`` columns and
+        sets it to their quotient after the increment (None when the
+        denominator is 0), e.g. a running average. The change is made
+        relative to the stored values, not to a copy the caller loaded,
+        so concurrent increments add up. Returns False if *obj_id* is
+        unknown.
+        """
+        pass
+
+    @abstractmethod
+    def delete_many(self, obj_ids, chunk_size=None):
+        """Delete several objects in one batch; return the count"""
+        pass
+
 
 class InMemoryRepository(Repository):
     """In-memory implementation of the repository pattern"""
     
-    def __init__(self):
-        """Initialize the in-memory storage"""
+    def __init__(self, indexes=None):
+        """Initialize the in-memory storage.
+
+        *indexes* lists the secondary indexes to maintain (see
+        :mod:`app.persistence.indexes`); lookups on other attributes scan.
+        """
         self._storage = {}
+        self._indexes = list(indexes or [])
+        # Bumped by every write; cached snapshots are tagged with it
+        self.version = 0
+        self._snapshots = {}
+
+    # -------- snapshots --------
+    def _changed(self):
+        self.version += 1
+        self._snapshots.clear()
+
+    def _snapshot(self, name, build):
+        """Return the cached snapshot *name*, rebuilt only after a write"""
+        snapshot = self._snapshots.get(name)
+        if snapshot is None:
+            snapshot = self._snapshots[name] = build()
+        return snapshot
+
+    def _ordered(self):
+        """``(objects, keys)`` sorted by (created_at, id), as tuples"""
+        def build():
+            objs = tuple(sorted(self._storage.values(),
+                                key=lambda obj: (obj.created_at, obj.id)))
+            return objs, tuple((obj.created_at, obj.id) for obj in objs)
+        return self._snapshot("ordered", build)
+
+    # -------- secondary indexes --------
+    def _index_for(self, attr, op):
+        for index in self._indexes:
+            if index.attr == attr and op in index.operators:
+                return index
+        return None
+
+    def _check_indexes(self, obj):
+        for index in self._indexes:
+            index.check(obj)
+
+    def _reindex(self, obj):
+        for index in self._indexes:
+            index.remove(obj.id)
+            index.insert(obj)
+
+    def _unindex(self, obj_id):
+        for index in self._indexes:
+            index.remove(obj_id)
 
     def add(self, obj):
         """Add an object to the repository"""
+        self._check_indexes(obj)
         self._storage[obj.id] = obj
+        self._reindex(obj)
+        self._changed()
 
     def get(self, obj_id):
         """Retrieve an object by its ID"""
         return self._storage.get(obj_id)
 
+    def get_many(self, obj_ids, chunk_size=None):
+        """Look up several ids; returns ``(objects, missing_ids)``"""
+        found, missing = [], []
+        for obj_id in dict.fromkeys(obj_ids):
+            obj = self._storage.get(obj_id)
+            if obj is None:
+                missing.append(obj_id)
+            else:
+                found.append(obj)
+        return found, missing
+
     def get_all(self):
-        """Retrieve all objects"""
-        return list(self._storage.values())
+        """Retrieve all objects as an immutable snapshot.
+
+        The tuple is cached until the next write, so repeated calls on an
+        unchanged repository cost nothing.
+        """
+        return self._snapshot("all", lambda: tuple(self._storage.values()))
 
     def update(self, obj_id, data):
-        """Update an object with new data"""
+        """Update an object with new data.
+
+        Raises ValueError, leaving the indexed attributes unchanged, if
+        the new values break a unique index.
+        """
         obj = self.get(obj_id)
-        if obj:
+        if not obj:
+            return
+        self._changed()
+        if not self._indexes:
             obj.update(data)
+            return
+        old = {index.attr: getattr(obj, index.attr, None) for index in self._indexes}
+        obj.update(data)
+        try:
+            self._check_indexes(obj)
+        except ValueError:
+            for attr, value in old.items():
+                setattr(obj, attr, value)
+            raise
+        self._reindex(obj)
 
     def delete(self, obj_id):
         """Delete an object by its ID"""
         if obj_id in self._storage:
             del self._storage[obj_id]
+            self._unindex(obj_id)
+            self._changed()
 
     def get_by_attribute(self, attr_name, attr_value):
         """Find an object by a specific attribute"""
+        index = self._index_for(attr_name, "eq")
+        if index is not None:
+            for obj_id in index.lookup("eq", attr_value):
+                return self._storage[obj_id]
+            return None
         for obj in self._storage.values():
             if hasattr(obj, attr_name) and getattr(obj, attr_name) == attr_value:
                 return obj
         return None
+
+    # -------- querying --------
+    @staticmethod
+    def _predicate(attr, op, value):
+        """Compile one parsed filter into a ``obj -> bool`` callable"""
+        if op == "isnull":
+            return lambda obj: (getattr(obj, attr, None) is None) == bool(value)
+        if op == "in":
+            choices = set(value)
+            return lambda obj: getattr(obj, attr, None) in choices
+        if op == "prefix":
+            return lambda obj: str(getattr(obj, attr, None) or "").startswith(value)
+        compare = COMPARATORS[op]
+
+        def predicate(obj):
+            current = getattr(obj, attr, None)
+            if value is None:  # SQL: only = / != NULL mean IS [NOT] NULL
+                return compare(current, None) if op in ("eq", "ne") else False
+            if current is None:  # a NULL never satisfies a comparison
+                return False
+            return compare(current, value)
+        return predicate
+
+    def _index_candidates(self, parsed):
+        """Return candidate objects from the secondary indexes, or None to scan.
+
+        Every filter an index can answer narrows the candidate ids (their
+        sets are intersected); the predicates still run on the result.
+        """
+        ids = None
+        for attr, op, value in parsed:
+            index = self._index_for(attr, op)
+            if index is None:
+                continue
+            matched = index.lookup(op, value)
+            ids = matched if ids is None else ids & matched
+        if ids is None:
+            return None
+        return [self._storage[obj_id] for obj_id in ids]
+
+    def _filter(self, filters):
+        """Apply *filters*: index probe if possible, else one compiled scan"""
+        parsed = parse_filters(filters)
+        candidates = self._index_candidates(parsed)
+        if candidates is None:
+            candidates = self._storage.values()
+        if not parsed:
+            return list(candidates)
+        predicates = [self._predicate(*p) for p in parsed]
+        return [obj for obj in candidates if all(p(obj) for p in predicates)]
+
+    def find(self, filters=None, order_by=None, limit=None, offset=0):
+        """Filter, sort and slice stored objects"""
+        objs = self._filter(filters)
+        # Stable multi-key sort: apply keys from last to first
+        for attr, descending in reversed(parse_order_by(order_by)):
+            objs.sort(
+                key=lambda obj: _sort_key(getattr(obj, attr, None)),
+                reverse=descending,
+            )
+        end = None if limit is None else offset + limit
+        return objs[offset:end]
+
+    def get_page(self, cursor=None, limit=None, order_by="created_at",
+                 filters=None):
+        """Return one keyset page of objects ordered by (created_at, id).
+
+        Without filters the page is sliced out of the cached ordered
+        snapshot: a bisect for the cursor plus O(limit) work.
+        """
+        limit = check_page_args(limit, order_by)
+        descending = order_by.startswith("-")
+        if not filters:
+            return self._snapshot_page(cursor, limit, descending)
+        objs = sorted(
+            self._filter(filters),
+            key=lambda obj: (obj.created_at, obj.id),
+            reverse=descending,
+        )
+        if cursor:
+            key = decode_cursor(cursor)
+            if descending:
+                objs = [o for o in objs if (o.created_at, o.id) < key]
+            else:
+                objs = [o for o in objs if (o.created_at, o.id) > key]
+        items = objs[:limit]
+        next_cursor = encode_cursor(items[-1]) if len(objs) > limit else None
+        return items, next_cursor
+
+    def _snapshot_page(self, cursor, limit, descending):
+        objs, keys = self._ordered()
+        if not descending:
+            start = bisect_right(keys, decode_cursor(cursor)) if cursor else 0
+            items = list(objs[start:start + limit])
+            more = start + limit < len(objs)
+        else:
+            end = bisect_left(keys, decode_cursor(cursor)) if cursor else len(objs)
+            start = max(0, end - limit)
+            items = list(reversed(objs[start:end]))
+            more = start > 0
+        return items, encode_cursor(items[-1]) if more else None
+
+    @staticmethod
+    def _matches(obj, criteria):
+        return all(getattr(obj, attr, None) == value
+                   for attr, value in criteria.items())
+
+    def _criteria_candidates(self, criteria):
+        candidates = self._index_candidates(parse_filters(criteria))
+        return self._storage.values() if candidates is None else candidates
+
+    def exists(self, **criteria):
+        """Return True if any stored object matches *criteria*"""
+        return any(self._matches(obj, criteria)
+                   for obj in self._criteria_candidates(criteria))
+
+    def count(self, **criteria):
+        """Count stored objects matching *criteria*"""
+        if not criteria:
+            return len(self._storage)
+        return sum(1 for obj in self._criteria_candidates(criteria)
+                   if self._matches(obj, criteria))
+
+    def get_columns(self, obj_id, *columns):
+        """Return the requested attributes of one object"""
+        obj = self._storage.get(obj_id)
+        if obj is None:
+            return None
+        return {column: getattr(obj, column) for column in columns}
+
+    def iter_all(self, chunk_size=None, filters=None):
+        """Yield stored objects lazily, skipping ones deleted meanwhile"""
+        filters = filters or {}
+        for obj_id in list(self._storage):
+            obj = self._storage.get(obj_id)
+            if obj is not None and self._matches(obj, filters):
+                yield obj
+
+    # -------- bulk writes --------
+    def add_many(self, objs, chunk_size=None):
+        """Add several objects and return their ids.
+
+        Unique indexes are checked for the whole batch first, so a
+        duplicate rejects the batch without storing any of it.
+        """
+        objs = list(objs)
+        for index in self._indexes:
+            if not index.unique:
+                continue
+            seen = set()
+            for obj in objs:
+                index.check(obj)
+                value = getattr(obj, index.attr, None)
+                if value is not None and value in seen:
+                    raise ValueError(
+                        f"Duplicate value for unique index {index.attr}: {value!r}"
+                    )
+                seen.add(value)
+        ids = []
+        for obj in objs:
+            self._storage[obj.id] = obj
+            self._reindex(obj)
+            ids.append(obj.id)
+        self._changed()
+        return ids
+
+    def update_many(self, updates, chunk_size=None):
+        """Update several objects; unknown ids are skipped"""
+        count = 0
+        for obj_id, data in updates.items():
+            if obj_id in self._storage:
+                self.update(obj_id, data)
+                count += 1
+        return count
+
+    def increment(self, obj_id, deltas, ratios=None):
+        """Add *deltas* to the stored object's counters"""
+        obj = self.get(obj_id)
+        if obj is None:
+            return False
+        values = {name: (getattr(obj, name) or 0) + delta
+                  for name, delta in deltas.items()}
+        for target, (numerator, denominator) in (ratios or {}).items():
+            num = values.get(numerator, getattr(obj, numerator))
+            den = values.get(denominator, getattr(obj, denominator))
+            values[target] = num / den if den else None
+        self.update(obj_id, values)
+        return True
+
+    def delete_many(self, obj_ids, chunk_size=None):
+        """Delete several objects; unknown ids are skipped"""
+        count = 0
+        for obj_id in obj_ids:
+            if self._storage.pop(obj_id, None) is not None:
+                self._unindex(obj_id)
+                count += 1
+        if count:
+            self._changed()
+        return count
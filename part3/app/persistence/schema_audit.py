@@ -0,0 +1,194 @@
+"""
+Index audit.
+
+:func:`audit` runs the facade's read paths against the configured
+database, records every SELECT they send to the engine, and asks the
+database how it would execute each one (``EXPLAIN QUERY PLAN`` on
+SQLite, ``EXPLAIN`` on MySQL). A statement that reads a whole table
+instead of seeking an index is a *full scan*; one that sorts its rows in
+a temporary structure instead of reading them in index order is a *sort*.
+
+Scenarios cover what the API serves: detail reads, ``?ids=`` batches,
+keyset pages with every query-string filter, and the single-column
+lookups made by writes (owner checks, duplicate reviews, email
+uniqueness). ``get_all_*`` and ``iter_*`` read whole tables on purpose
+and are not audited. Sample ids are taken from the first row of each
+table, so run it against a populated database for realistic plans.
+
+From the command line (exit status 1 when a full scan is found)::
+
+    flask --app run audit-indexes
+"""
+from contextlib import contextmanager
+
+import click
+from sqlalchemy import event, select
+
+from app import db
+
+# Placeholder bound when a table is empty: the plan does not depend on it
+MISSING = "audit"
+
+# (scenario, call) pairs; *call* gets the facade and the sample ids
+SCENARIOS = [
+    ("get_user", lambda f, s: f.get_user(s["user"])),
+    ("get_user_by_email", lambda f, s: f.get_user_by_email(s["email"])),
+    ("email_exists", lambda f, s: f.email_exists(s["email"])),
+    ("admin_exists", lambda f, s: f.admin_exists()),
+    ("get_users_by_ids", lambda f, s: f.get_users_by_ids([s["user"]])),
+    ("get_users_page", lambda f, s: f.get_users_page()),
+    ("get_place", lambda f, s: f.get_place(s["place"])),
+    ("place_exists", lambda f, s: f.place_exists(s["place"])),
+    ("get_place_owner_id", lambda f, s: f.get_place_owner_id(s["place"])),
+    ("get_places_by_ids", lambda f, s: f.get_places_by_ids([s["place"]])),
+    ("get_places_page", lambda f, s: f.get_places_page()),
+    ("get_places_page(owner_id)", lambda f, s: f.get_places_page(
+        filters={"owner_id": s["user"]})),
+    ("get_places_page(price)", lambda f, s: f.get_places_page(
+        filters={"price__gte": 0, "price__lte": 100})),
+    ("get_places_page(rating)", lambda f, s: f.get_places_page(
+        filters={"rating_avg__gte": 4})),
+    ("get_review", lambda f, s: f.get_review(s["review"])),
+    ("has_reviewed", lambda f, s: f.has_reviewed(s["user"], s["place"])),
+    ("get_reviews_by_place", lambda f, s: f.get_reviews_by_place(s["place"])),
+    ("get_place_reviews_page", lambda f, s: f.get_place_reviews_page(s["place"])),
+    ("count_place_reviews", lambda f, s: f.count_place_reviews(s["place"])),
+    ("get_reviews_page", lambda f, s: f.get_reviews_page()),
+    ("get_reviews_page(user_id)", lambda f, s: f.get_reviews_page(
+        filters={"user_id": s["user"]})),
+    ("get_amenity", lambda f, s: f.get_amenity(s["amenity"])),
+    ("get_amenities_by_ids", lambda f, s: f.get_amenities_by_ids([s["amenity"]])),
+    ("get_amenities_page", lambda f, s: f.get_amenities_page()),
+]
+
+
+def sample_ids():
+    """Return an existing id (or :data:`MISSING`) per entity, plus an email"""
+    from app.models.amenity import Amenity
+    from app.models.place import Place
+    from app.models.review import Review
+    from app.models.user import User
+
+    def first(column):
+        value = db.session.execute(select(column).limit(1)).scalar()
+        return MISSING if value is None else value
+
+    return {
+        "user": first(User.id),
+        "email": first(User.email),
+        "place": first(Place.id),
+        "review": first(Review.id),
+        "amenity": first(Amenity.id),
+    }
+
+
+@contextmanager
+def capture_selects(engine):
+    """Collect the ``(sql, parameters)`` of every SELECT run on *engine*"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def explain(conn, statement, parameters):
+    """Return ``(plan lines, full-scan tables, sorts)`` for one SELECT.
+
+    Walking a whole index counts as a full scan too, unless the statement
+    has a LIMIT and needs no sort: then the walk stops after LIMIT rows
+    (a keyset page reading its ORDER BY index).
+    """
+    dialect = conn.dialect.name
+    limited = " LIMIT " in statement.upper()
+    if dialect == "sqlite":
+        rows = conn.exec_driver_sql(
+            "EXPLAIN QUERY PLAN " + statement, parameters
+        ).all()
+        plan = [row[-1] for row in rows]
+        sorts = sum(line.startswith("USE TEMP B-TREE") for line in plan)
+        # "SEARCH" seeks an index; "SCAN t" reads the table and
+        # "SCAN t USING [COVERING] INDEX i" walks all of i
+        full_scans = [
+            line.split()[1] for line in plan
+            if line.startswith("SCAN ") and not line.startswith("SCAN CONSTANT")
+            and not (" USING " in line and limited and not sorts)
+        ]
+    elif dialect in ("mysql", "mariadb"):
+        rows = [row._mapping for row in
+                conn.exec_driver_sql("EXPLAIN " + statement, parameters)]
+        plan = [
+            f"{row['table']}: type={row['type']} key={row['key']} "
+            f"extra={row['Extra']}" for row in rows
+        ]
+        sorts = sum("filesort" in (row["Extra"] or "") for row in rows)
+        # type ALL reads the table, type index walks a whole index
+        full_scans = [
+            row["table"] for row in rows
+            if row["type"] == "ALL"
+            or (row["type"] == "index" and not (limited and not sorts))
+        ]
+    else:
+        raise ValueError(f"EXPLAIN is not supported for {dialect}")
+    return plan, full_scans, sorts
+
+
+def audit(facade, scenarios=None):
+    """Explain every SELECT the facade issues for each scenario.
+
+    Returns one finding per statement: a dict with ``scenario``, ``sql``,
+    ``plan`` (the database's plan lines), ``full_scans`` (tables read in
+    full) and ``sorts`` (temporary sorts). Must run in an app context with
+    a SQL repository backend; raises ValueError when no SQL was captured.
+    """
+    samples = sample_ids()
+    db.session.remove()
+    engine = db.engine
+    captured = []
+    for name, call in scenarios or SCENARIOS:
+        with capture_selects(engine) as statements:
+            call(facade, samples)
+        db.session.remove()
+        captured.extend((name, sql, params) for sql, params in statements)
+    if not captured:
+        raise ValueError("No SQL captured: is REPOSITORY_BACKEND a SQL backend?")
+
+    findings = []
+    with engine.connect() as conn:
+        for name, sql, params in captured:
+            plan, full_scans, sorts = explain(conn, sql, params)
+            findings.append({"scenario": name, "sql": sql, "plan": plan,
+                             "full_scans": full_scans, "sorts": sorts})
+    return findings
+
+
+def register_schema_audit(app):
+    """Add the ``flask audit-indexes`` command to *app*"""
+
+    @app.cli.command("audit-indexes")
+    @click.option("--verbose", "-v", is_flag=True,
+                  help="Print the plan of every statement.")
+    def audit_indexes(verbose):
+        """EXPLAIN the facade's queries and report full table scans."""
+        from app.services.facade import HBnBFacade
+
+        findings = audit(HBnBFacade())
+        failed = False
+        for finding in findings:
+            flags = [f"FULL SCAN {table}" for table in finding["full_scans"]]
+            if finding["sorts"]:
+                flags.append("SORT")
+            failed = failed or bool(finding["full_scans"])
+            if flags or verbose:
+                click.echo(f"{finding['scenario']}: {', '.join(flags) or 'ok'}")
+                for line in finding["plan"]:
+                    click.echo(f"    {line}")
+        click.echo(f"{len(findings)} statements, "
+                   f"{sum(bool(f['full_scans']) for f in findings)} full scans")
+        if failed:
+            raise SystemExit(1)
@@ -2,9 +2,175 @@
 SQLAlchemyRepository: implementation of the generic Repository interface
 using SQLAlchemy for permanent persistence.
 """
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import and_, func, inspect, literal, literal_column, or_, select, update
+from sqlalchemy.orm import raiseload
+from sqlalchemy.orm.util import identity_key
 
 from app import db
-from app.persistence.repository import Repository
+from app.persistence.loading import loader_options
+from app.persistence.repository import (
+    COMPARATORS,
+    DEFAULT_CHUNK_SIZE,
+    Repository,
+    check_page_args,
+    chunked,
+    decode_cursor,
+    encode_cursor,
+    parse_filters,
+    parse_order_by,
+)
+from app.persistence.unit_of_work import unit_of_work
+
+
+# ── Statement builders (shared with AsyncSQLAlchemyRepository) ───────────
+def model_column(model, attr):
+    """Return the table column *attr* of *model* or raise ValueError"""
+    column = model.__table__.columns.get(attr)
+    if column is None:
+        raise ValueError(f"Unknown field: {attr}")
+    return column
+
+
+def filter_conditions(model, filters):
+    """Compile find()-style *filters* into SQL boolean expressions"""
+    conditions = []
+    for attr, op, value in parse_filters(filters):
+        column = model_column(model, attr)
+        if op == "isnull":
+            conditions.append(column.is_(None) if value else column.is_not(None))
+        elif op == "in":
+            conditions.append(column.in_(value))
+        elif op == "prefix":
+            conditions.append(column.startswith(value, autoescape=True))
+        else:
+            conditions.append(COMPARATORS[op](column, value))
+    return conditions
+
+
+def find_statement(model, filters=None, order_by=None, limit=None, offset=0):
+    """SELECT for find(): filters, ORDER BY ... id, LIMIT/OFFSET"""
+    stmt = select(model).where(*filter_conditions(model, filters))
+    ordering = parse_order_by(order_by)
+    if ordering:
+        stmt = stmt.order_by(*(
+            model_column(model, attr).desc() if descending
+            else model_column(model, attr).asc()
+            for attr, descending in ordering
+        ), model.id)
+    if offset:
+        stmt = stmt.offset(offset)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def page_statement(model, cursor, limit, order_by, filters=None):
+    """Keyset SELECT on (created_at, id) fetching *limit* + 1 rows"""
+    created_at, pk = model.created_at, model.id
+    stmt = select(model).where(*filter_conditions(model, filters))
+    if order_by.startswith("-"):
+        stmt = stmt.order_by(created_at.desc(), pk.desc())
+        if cursor:
+            ts, obj_id = decode_cursor(cursor)
+            stmt = stmt.where(
+                or_(created_at < ts, and_(created_at == ts, pk < obj_id))
+            )
+    else:
+        stmt = stmt.order_by(created_at.asc(), pk.asc())
+        if cursor:
+            ts, obj_id = decode_cursor(cursor)
+            stmt = stmt.where(
+                or_(created_at > ts, and_(created_at == ts, pk > obj_id))
+            )
+    return stmt.limit(limit + 1)
+
+
+def split_page(rows, limit):
+    """Turn the limit + 1 rows of a keyset query into (items, next_cursor)"""
+    items = rows[:limit]
+    next_cursor = encode_cursor(items[-1]) if len(rows) > limit else None
+    return items, next_cursor
+
+
+def exists_statement(model, criteria):
+    """``SELECT 1 ... LIMIT 1`` for the equality *criteria*"""
+    return select(literal(1)).select_from(model).filter_by(**criteria).limit(1)
+
+
+def count_statement(model, criteria):
+    """``SELECT count(*)`` for the equality *criteria*"""
+    return select(func.count()).select_from(model).filter_by(**criteria)
+
+
+def columns_statement(model, obj_id, columns):
+    """Column-only SELECT of one row by primary key"""
+    table_columns = model.__table__.columns
+    unknown = [name for name in columns if name not in table_columns]
+    if unknown:
+        raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+    return (
+        select(*(table_columns[name] for name in columns))
+        .where(model.id == obj_id)
+    )
+
+
+def increment_statement(model, obj_id, deltas, ratios=None):
+    """Single UPDATE adding *deltas* to one row and recomputing *ratios*.
+
+    Ratio columns are assigned first and read only the old values plus the
+    deltas: MySQL evaluates SET left to right against the new values,
+    SQLite against the old ones, so this order gives the same result on
+    both. ``1e0`` forces true division; NULLIF turns x/0 into NULL.
+    """
+    def after(name):
+        column = model_column(model, name)
+        return column + deltas[name] if name in deltas else column
+
+    values = [
+        (model_column(model, target),
+         after(numerator) * literal_column("1e0")
+         / func.nullif(after(denominator), 0))
+        for target, (numerator, denominator) in (ratios or {}).items()
+    ]
+    values.extend((model_column(model, name), model_column(model, name) + delta)
+                  for name, delta in deltas.items())
+    values.append((model_column(model, "updated_at"), datetime.utcnow()))
+    return (
+        update(model)
+        .where(model.id == obj_id)
+        .ordered_values(*values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def validated_values(model, data):
+    """Return the column values ``obj.update(data)`` would set on *model*.
+
+    A bulk UPDATE skips the attribute events that run ``@validates``
+    methods and property setters, so each row is first applied to a
+    scratch instance (``__init__`` is not called): invalid values raise
+    as they would in ``update``, and unknown keys are dropped.
+    """
+    mapper = inspect(model)
+    scratch = mapper.class_manager.new_instance()
+    scratch.update(data)
+    columns = mapper.column_attrs
+    return {key: value for key, value in vars(scratch).items() if key in columns}
+
+
+def stream_statement(model, filters, chunk_size):
+    """Server-side-cursor SELECT for iter_all, relationships disabled"""
+    return (
+        select(model)
+        .filter_by(**(filters or {}))
+        .options(raiseload("*"))
+        .execution_options(yield_per=chunk_size, stream_results=True)
+    )
+
+
 
 class SQLAlchemyRepository(Repository):
     """Generic repository that delegates CRUD operations to SQLAlchemy."""
@@ -14,30 +180,168 @@ class SQLAlchemyRepository(Repository):
 
     # -------- CRUD --------
     def add(self, obj):
-        db.session.add(obj)
-        db.session.commit()
+        with unit_of_work():
+            db.session.add(obj)
+
+    def _query(self):
+        """``Model.query`` with the active loading profile applied"""
+        return self.model.query.options(*loader_options(self.model))
 
     def get(self, obj_id):
-        return self.model.query.get(obj_id)
+        return self._query().get(obj_id)
+
+    def get_many(self, obj_ids, chunk_size=None):
+        """One ``WHERE id IN (...)`` per chunk instead of one query per id."""
+        wanted = list(dict.fromkeys(obj_ids))
+        by_id = {}
+        for chunk in chunked(wanted, self._chunk_size(chunk_size)):
+            for obj in self._query().filter(self.model.id.in_(chunk)):
+                by_id[obj.id] = obj
+        found = [by_id[obj_id] for obj_id in wanted if obj_id in by_id]
+        missing = [obj_id for obj_id in wanted if obj_id not in by_id]
+        return found, missing
 
     def get_all(self):
-        return self.model.query.all()
+        return self._query().all()
 
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
-            for key, value in data.items():
-                setattr(obj, key, value)
-            db.session.commit()
+            with unit_of_work():
+                obj.update(data)
 
     def delete(self, obj_id):
         obj = self.get(obj_id)
         if obj:
-            db.session.delete(obj)
-            db.session.commit()
+            with unit_of_work():
+                db.session.delete(obj)
 
     # -------- extra helpers --------
     def get_by_attribute(self, attr_name, attr_value):
         return (
-            self.model.query.filter_by(**{attr_name: attr_value}).first()
+            self._query().filter_by(**{attr_name: attr_value}).first()
         )
+
+    # -------- queries that skip ORM hydration --------
+    def exists(self, **criteria):
+        """``SELECT 1 ... LIMIT 1``: no object or relationship is loaded."""
+        stmt = exists_statement(self.model, criteria)
+        return db.session.execute(stmt).scalar() is not None
+
+    def count(self, **criteria):
+        """``SELECT count(*)`` over the rows matching *criteria*."""
+        return db.session.execute(count_statement(self.model, criteria)).scalar_one()
+
+    def get_columns(self, obj_id, *columns):
+        """Select only *columns* of one row; returns a dict or None."""
+        stmt = columns_statement(self.model, obj_id, columns)
+        row = db.session.execute(stmt).first()
+        return dict(row._mapping) if row is not None else None
+
+    # -------- streaming --------
+    def iter_all(self, chunk_size=None, filters=None):
+        """Stream rows with ``yield_per`` and a server-side cursor.
+
+        Relationships are not loaded (``raiseload``): use the foreign-key
+        columns instead. Each chunk is expunged from the session once the
+        caller moves past it, so memory stays flat on very large tables.
+        """
+        stmt = stream_statement(self.model, filters, self._chunk_size(chunk_size))
+        result = db.session.execute(stmt)
+        try:
+            for chunk in result.scalars().partitions():
+                yield from chunk
+                for obj in chunk:
+                    if obj in db.session:
+                        db.session.expunge(obj)
+        finally:
+            result.close()
+
+    # -------- querying --------
+    def find(self, filters=None, order_by=None, limit=None, offset=0):
+        """Compile filters, ordering and slicing into a single SELECT."""
+        stmt = find_statement(self.model, filters, order_by, limit, offset)
+        stmt = stmt.options(*loader_options(self.model))
+        return db.session.execute(stmt).scalars().all()
+
+    # -------- pagination --------
+    def get_page(self, cursor=None, limit=None, order_by="created_at",
+                 filters=None):
+        """Keyset page on (created_at, id); fetches limit + 1 rows, no OFFSET."""
+        limit = check_page_args(limit, order_by)
+        stmt = page_statement(self.model, cursor, limit, order_by, filters)
+        stmt = stmt.options(*loader_options(self.model))
+        return split_page(db.session.execute(stmt).scalars().all(), limit)
+
+    # -------- bulk writes (one commit per call, or per enclosing unit) --------
+    def _chunk_size(self, chunk_size):
+        if chunk_size is None:
+            return current_app.config.get("BULK_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+        return chunk_size
+
+    def add_many(self, objs, chunk_size=None):
+        """INSERT in executemany batches of *chunk_size*, then commit once."""
+        ids = []
+        with unit_of_work():
+            for chunk in chunked(objs, self._chunk_size(chunk_size)):
+                db.session.add_all(chunk)
+                db.session.flush()
+                ids.extend(obj.id for obj in chunk)
+        return ids
+
+    def update_many(self, updates, chunk_size=None):
+        """Bulk UPDATE by primary key (executemany), then commit once.
+
+        Unknown ids are skipped, matching :class:`InMemoryRepository`.
+        Each row goes through :func:`validated_values` first, so it is
+        checked like a single :meth:`update`.
+        """
+        now = datetime.utcnow()
+        count = 0
+        with unit_of_work():
+            for chunk in chunked(updates, self._chunk_size(chunk_size)):
+                found = {
+                    obj_id for (obj_id,) in db.session.query(self.model.id)
+                    .filter(self.model.id.in_(chunk))
+                }
+                rows = [
+                    {"updated_at": now,
+                     **validated_values(self.model, updates[obj_id]),
+                     "id": obj_id}
+                    for obj_id in chunk if obj_id in found
+                ]
+                if rows:
+                    db.session.execute(update(self.model), rows)
+                count += len(rows)
+        return count
+
+    def increment(self, obj_id, deltas, ratios=None):
+        """One atomic ``UPDATE ... SET col = col + :delta``, then commit.
+
+        A copy of the row already in the session has those columns expired
+        so its next read sees the database's totals.
+        """
+        with unit_of_work():
+            result = db.session.execute(
+                increment_statement(self.model, obj_id, deltas, ratios)
+            )
+        obj = db.session.identity_map.get(identity_key(self.model, obj_id))
+        if obj is not None:
+            db.session.expire(obj, [*deltas, *(ratios or {})])
+        return result.rowcount == 1
+
+    def delete_many(self, obj_ids, chunk_size=None):
+        """Load each chunk with one IN query and delete it, then commit once.
+
+        Objects go through ``session.delete`` rather than a bare DELETE so
+        relationship cascades (e.g. a place's reviews) still apply.
+        """
+        count = 0
+        with unit_of_work():
+            for chunk in chunked(obj_ids, self._chunk_size(chunk_size)):
+                objs = self.model.query.filter(self.model.id.in_(chunk)).all()
+                for obj in objs:
+                    db.session.delete(obj)
+                db.session.flush()
+                count += len(objs)
+        return count
@@ -0,0 +1,69 @@
+"""
+SQLite performance profile.
+
+SQLite keeps most tuning per connection, so :func:`apply_sqlite_pragmas`
+registers a ``connect`` hook that runs the ``SQLITE_PRAGMAS`` settings on
+every new DBAPI connection. With ``journal_mode=WAL`` readers no longer
+wait for a writer, and ``synchronous=NORMAL`` is safe in WAL mode. When
+the process exits, ``PRAGMA optimize`` refreshes the query planner
+statistics for the tables that the workload used.
+"""
+import atexit
+import weakref
+
+from sqlalchemy import event
+
+
+def _pragma_statements(pragmas):
+    for name, value in pragmas.items():
+        if not name.isidentifier():
+            raise ValueError(f"Invalid SQLite pragma: {name}")
+        yield f"PRAGMA {name}={value}"
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Run *pragmas* on every connection *engine* opens (SQLite only)"""
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return False
+    statements = list(_pragma_statements(pragmas))
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    return True
+
+
+def optimize(engine):
+    """Run ``PRAGMA optimize`` on *engine* (SQLite only)"""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA optimize")
+
+
+def _optimize_at_exit(engine_ref):
+    engine = engine_ref()
+    if engine is not None:
+        try:
+            optimize(engine)
+        except Exception:
+            pass  # never fail interpreter shutdown over statistics
+
+
+def register_sqlite_pragmas(app, db):
+    """Apply ``SQLITE_PRAGMAS`` to every SQLite engine of *app*"""
+    pragmas = app.config.get("SQLITE_PRAGMAS") or {}
+    with app.app_context():
+        engines = list(db.engines.values())
+    router = app.extensions.get("hbnb_replicas")
+    if router is not None:
+        engines.extend(router.replicas)
+    for engine in engines:
+        if apply_sqlite_pragmas(engine, pragmas):
+            atexit.register(_optimize_at_exit, weakref.ref(engine))
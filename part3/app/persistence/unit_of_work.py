@@ -0,0 +1,146 @@
+"""
+Unit of work: groups repository writes so they reach the database in a
+single commit.
+
+Repositories wrap every write in :func:`unit_of_work`. When no unit is
+active the block opens one and commits on exit (the historic
+commit-per-call behaviour). When a unit is already active - a facade
+method decorated with :func:`transactional`, or the request scope installed
+by :func:`register_request_scope` - the block only flushes, and the single
+commit happens when the outermost unit ends. Entering a unit pins the
+session to the primary database when read replicas are configured.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import db
+from app.persistence.replicas import pin_primary
+
+_current = ContextVar("hbnb_unit_of_work", default=None)
+# Marker of the request-wide unit (see register_request_scope)
+_REQUEST_SCOPE = object()
+_commits = 0
+
+
+@event.listens_for(Session, "after_commit")
+def _count_commit(session):
+    """Count every outermost COMMIT issued by any session"""
+    global _commits
+    if session.in_nested_transaction():
+        return  # RELEASE SAVEPOINT, not a COMMIT
+    _commits += 1
+
+
+def commit_count():
+    """Return how many commits have been issued since the last reset"""
+    return _commits
+
+
+def reset_commit_count():
+    """Reset the commit counter (used by tests)"""
+    global _commits
+    _commits = 0
+
+
+def in_unit_of_work():
+    """Return True when a unit of work is currently active"""
+    return _current.get() is not None
+
+
+@contextmanager
+def unit_of_work(savepoint=False):
+    """Join the active unit of work, or open (and later commit) a new one.
+
+    Args:
+        savepoint: when joining an outer unit, run the block inside a
+                   SAVEPOINT so a failure only rolls back this block.
+    """
+    # Writes, and the reads that validate them, must see the primary
+    pin_primary(db.session)
+    if _current.get() is None:
+        token = _current.set(True)
+        try:
+            yield db.session
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            _current.reset(token)
+    elif savepoint:
+        nested = db.session.begin_nested()
+        try:
+            yield db.session
+            nested.commit()
+        except Exception:
+            nested.rollback()
+            raise
+    else:
+        yield db.session
+        db.session.flush()
+
+
+def _write_dispatcher():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get("hbnb_write_dispatcher")
+
+
+def transactional(method):
+    """Run a facade method inside :func:`unit_of_work`.
+
+    With the write dispatcher enabled, a call made outside any unit runs
+    on the writer thread instead (see ``write_dispatcher``). Inside a
+    request it joins the request's unit: the writer thread would commit
+    it at once, before the request can roll back on an error response,
+    and could wait forever on a lock the request's session holds.
+    """
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        dispatcher = _write_dispatcher()
+        if dispatcher is not None and _current.get() is None:
+            return dispatcher.call(method, *args, **kwargs)
+        with unit_of_work():
+            return method(*args, **kwargs)
+    return wrapper
+
+
+def register_request_scope(app):
+    """Give every request one unit of work, committed when it finishes.
+
+    The commit runs in ``after_request`` so a failing COMMIT still turns
+    into a 500 response; error responses (status >= 400) and unhandled
+    exceptions roll back instead.
+    """
+    @app.before_request
+    def _begin_unit_of_work():
+        g.unit_of_work_token = _current.set(_REQUEST_SCOPE)
+
+    @app.after_request
+    def _finish_unit_of_work(response):
+        token = g.pop("unit_of_work_token", None)
+        if token is None:
+            return response
+        try:
+            if response.status_code < 400:
+                db.session.commit()
+            else:
+                db.session.rollback()
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            _current.reset(token)
+        return response
+
+    @app.teardown_request
+    def _abandon_unit_of_work(exc):
+        token = g.pop("unit_of_work_token", None)
+        if token is not None:
+            db.session.rollback()
+            _current.reset(token)
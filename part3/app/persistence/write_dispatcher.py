@@ -0,0 +1,196 @@
+"""
+Single-writer group-commit dispatcher.
+
+SQLite allows one writer at a time: when several server threads commit
+at once, the losers wait on the database lock and eventually fail with
+"database is locked". With ``WRITE_DISPATCHER_ENABLED`` set, every
+``@transactional`` facade write made outside a unit of work (background
+jobs, CLI commands, worker threads) is handed to one dedicated writer
+thread instead of running on the caller's thread. Writes made during a
+request stay in the request's unit of work, which commits once when the
+request succeeds and rolls back on an error response.
+
+The writer drains the queue into batches of up to
+``WRITE_DISPATCHER_MAX_BATCH`` operations. It waits at most
+``WRITE_DISPATCHER_MAX_WAIT_MS`` for more work, then runs the batch in a
+single unit of work, so the whole batch costs one COMMIT. If any
+operation fails (e.g. a ValueError from validation) the batch is rolled
+back and replayed one operation per transaction, so only the failing
+operations report an error. Callers block on a
+:class:`concurrent.futures.Future` and get back the facade method's
+return value (ORM objects are merged into the caller's session) or its
+exception.
+"""
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from flask import current_app, has_app_context
+from sqlalchemy import inspect
+from sqlalchemy.orm import InstanceState
+
+from app import db
+from app.persistence.unit_of_work import unit_of_work
+
+EXTENSION_KEY = "hbnb_write_dispatcher"
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_WAIT_MS = 1.0
+DEFAULT_TIMEOUT = 30.0
+
+_STOP = object()
+
+
+def _fresh(args):
+    """Copy dict arguments: facade methods pop keys, and a batch may be replayed"""
+    return [dict(arg) if isinstance(arg, dict) else arg for arg in args]
+
+
+class WriteDispatcher:
+    """Queue of write operations served by one writer thread"""
+
+    def __init__(self, app, max_batch=DEFAULT_MAX_BATCH,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS, timeout=DEFAULT_TIMEOUT):
+        self.app = app
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.batches = 0
+        self.operations = 0
+
+    # -------- caller side --------
+    def submit(self, fn, *args, **kwargs):
+        """Queue ``fn(*args, **kwargs)`` and return its Future"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def call(self, fn, *args, **kwargs):
+        """Run *fn* on the writer thread and wait for its result.
+
+        The caller's session is expired (when it holds no pending
+        changes of its own) so later reads see the committed write, and a
+        returned ORM object is merged into it so it can be used as usual.
+        """
+        result = self.submit(fn, *args, **kwargs).result(self.timeout)
+        session = db.session
+        if not (session.new or session.dirty or session.deleted):
+            session.expire_all()
+        if isinstance(inspect(result, raiseerr=False), InstanceState):
+            return session.merge(result, load=False)
+        return result
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "operations": self.operations,
+            "queued": self._queue.qsize(),
+        }
+
+    def close(self, timeout=None):
+        """Finish the queued work and stop the writer thread"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    # -------- writer side --------
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="hbnb-write-dispatcher", daemon=True
+                )
+                self._thread.start()
+
+    def _next_batch(self):
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)  # stop after this batch
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        with self.app.app_context():
+            # Results are handed to other threads: keep their state loaded
+            db.session().expire_on_commit = False
+            while True:
+                batch = self._next_batch()
+                if batch is None:
+                    break
+                self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        batch = [job for job in batch if job[0].set_running_or_notify_cancel()]
+        if len(batch) == 1:
+            outcomes = [self._commit_one(batch[0])]
+        else:
+            try:
+                outcomes = self._group_commit(batch)
+            except Exception:
+                # Something failed: replay one unit of work per operation
+                # so only the failing operations report an error
+                outcomes = [self._commit_one(job) for job in batch]
+            finally:
+                db.session.expunge_all()
+        self.batches += 1
+        self.operations += len(outcomes)
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _group_commit(self, batch):
+        """Run every operation of *batch* in one unit of work (one COMMIT)"""
+        with unit_of_work():
+            return [(future, fn(*_fresh(args), **kwargs), None)
+                    for future, fn, args, kwargs in batch]
+
+    def _commit_one(self, job):
+        future, fn, args, kwargs = job
+        try:
+            with unit_of_work():
+                return future, fn(*args, **kwargs), None
+        except Exception as exc:
+            return future, None, exc
+        finally:
+            # A later rollback would expire what this one committed
+            db.session.expunge_all()
+
+
+def register_write_dispatcher(app):
+    """Create the app's WriteDispatcher when ``WRITE_DISPATCHER_ENABLED``"""
+    if not app.config.get("WRITE_DISPATCHER_ENABLED"):
+        return None
+    dispatcher = WriteDispatcher(
+        app,
+        max_batch=app.config.get("WRITE_DISPATCHER_MAX_BATCH", DEFAULT_MAX_BATCH),
+        max_wait_ms=app.config.get("WRITE_DISPATCHER_MAX_WAIT_MS",
+                                   DEFAULT_MAX_WAIT_MS),
+        timeout=app.config.get("WRITE_DISPATCHER_TIMEOUT", DEFAULT_TIMEOUT),
+    )
+    app.extensions[EXTENSION_KEY] = dispatcher
+    atexit.register(dispatcher.close, 5)
+    return dispatcher
+
+
+def write_dispatcher():
+    """Return the current app's WriteDispatcher, or None"""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get(EXTENSION_KEY)
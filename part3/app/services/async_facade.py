@@ -0,0 +1,384 @@
+"""
+Async variant of :class:`HBnBFacade` for ASGI deployments.
+
+Same operations and validation rules as the synchronous facade, on top of
+:class:`AsyncSQLAlchemyRepository`. Write methods are
+``@async_transactional`` (one commit each, or none inside an enclosing
+``async_unit_of_work``). Password hashing is CPU bound, so new users are
+built in a worker thread instead of on the event loop.
+"""
+import asyncio
+
+from app.persistence.async_repository import (
+    AsyncSQLAlchemyRepository,
+    async_transactional,
+    create_session_factory,
+)
+from app.models.ids import binary_id_format
+from app.persistence.loading import loading
+from app.persistence.repository import DEFAULT_CHUNK_SIZE
+from app.services.facade import check_review_pairs
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.models.amenity import Amenity
+
+
+class AsyncHBnBFacade:
+    """Facade class for managing all application operations (asyncio)."""
+
+    def __init__(self, session_factory, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Initialize one async repository per entity on *session_factory*."""
+        self.session_factory = session_factory
+        self.user_repo = AsyncSQLAlchemyRepository(User, session_factory, chunk_size)
+        self.place_repo = AsyncSQLAlchemyRepository(Place, session_factory, chunk_size)
+        self.review_repo = AsyncSQLAlchemyRepository(Review, session_factory, chunk_size)
+        self.amenity_repo = AsyncSQLAlchemyRepository(Amenity, session_factory, chunk_size)
+
+    @classmethod
+    def from_config(cls, config, **engine_options):
+        """Build a facade from a Flask config mapping.
+
+        ``ASYNC_DATABASE_URI`` wins; otherwise the driver of
+        ``SQLALCHEMY_DATABASE_URI`` is swapped for its asyncio equivalent.
+        """
+        uri = config.get("ASYNC_DATABASE_URI") or config["SQLALCHEMY_DATABASE_URI"]
+        return cls(
+            create_session_factory(uri, binary_id_format(config), **engine_options),
+            config.get("BULK_CHUNK_SIZE", DEFAULT_CHUNK_SIZE),
+        )
+
+    # ========== User Management ==========
+
+    @async_transactional
+    async def create_user(self, user_data):
+        """Create a new user."""
+        if await self.email_exists(user_data.get("email", "")):
+            raise ValueError("Email already registered")
+
+        if "password" not in user_data:
+            raise ValueError("Password is required")
+
+        user = await asyncio.to_thread(User, **user_data)
+        await self.user_repo.add(user)
+        return user
+
+    @async_transactional
+    async def create_users(self, users_data, chunk_size=None):
+        """Create many users in one batch and return their ids."""
+        emails = [data.get("email", "").lower() for data in users_data]
+        if len(set(emails)) != len(emails):
+            raise ValueError("Duplicate email in batch")
+        if any("password" not in data for data in users_data):
+            raise ValueError("Password is required")
+        if await self.user_repo.find({"email__in": emails}, limit=1):
+            raise ValueError("Email already registered")
+
+        users = await asyncio.to_thread(
+            lambda: [User(**data) for data in users_data]
+        )
+        return await self.user_repo.add_many(users, chunk_size)
+
+    async def get_user(self, user_id):
+        """Retrieve a user by ID."""
+        with loading("detail"):
+            return await self.user_repo.get(user_id)
+
+    async def get_user_by_email(self, email):
+        """Retrieve a user by email (case‑insensitive)."""
+        with loading("auth"):
+            return await self.user_repo.get_by_attribute("email", email.lower())
+
+    async def email_exists(self, email):
+        """Return True if a user already uses *email* (case‑insensitive)."""
+        return await self.user_repo.exists(email=email.lower())
+
+    async def admin_exists(self):
+        """Return True if at least one admin account exists."""
+        return await self.user_repo.exists(is_admin=True)
+
+    async def get_users_by_ids(self, user_ids):
+        """Retrieve several users at once as ``(users, missing_ids)``."""
+        with loading("list"):
+            return await self.user_repo.get_many(user_ids)
+
+    async def get_all_users(self):
+        """Retrieve all users."""
+        return await self.user_repo.get_all()
+
+    async def get_users_page(self, cursor=None, limit=None, order_by="created_at",
+                             filters=None):
+        """Retrieve one keyset page of users as ``(items, next_cursor)``."""
+        with loading("list"):
+            return await self.user_repo.get_page(cursor, limit, order_by, filters)
+
+    def iter_users(self, chunk_size=None, **filters):
+        """Stream users matching *filters* (``async for``)."""
+        return self.user_repo.iter_all(chunk_size, filters)
+
+    @async_transactional
+    async def update_user(self, user_id, user_data):
+        """Update a user's information."""
+        user = await self.get_user(user_id)
+        if not user:
+            return None
+
+        if "email" in user_data and user_data["email"].lower() != user.email:
+            if await self.email_exists(user_data["email"]):
+                raise ValueError("Email already registered")
+
+        user.update(user_data)
+        return user
+
+    # ========== Place Management ==========
+
+    @async_transactional
+    async def create_place(self, place_data):
+        """Create a new place."""
+        place_data = dict(place_data)
+        owner_id = place_data.pop("owner_id", None)
+        if not owner_id:
+            raise ValueError("Owner ID is required")
+
+        if not await self.user_repo.exists(id=owner_id):
+            raise ValueError("Owner not found")
+
+        place = Place(**place_data, owner_id=owner_id)
+        await self.place_repo.add(place)
+        return place
+
+    @async_transactional
+    async def create_places(self, places_data, chunk_size=None):
+        """Create many places in one batch and return their ids."""
+        owners = {}
+        places = []
+        for data in places_data:
+            data = dict(data)
+            owner_id = data.pop("owner_id", None)
+            if not owner_id:
+                raise ValueError("Owner ID is required")
+            if owner_id not in owners:
+                owners[owner_id] = await self.user_repo.exists(id=owner_id)
+            if not owners[owner_id]:
+                raise ValueError("Owner not found")
+            places.append(Place(**data, owner_id=owner_id))
+        return await self.place_repo.add_many(places, chunk_size)
+
+    async def get_place(self, place_id):
+        """Retrieve a place by ID."""
+        with loading("detail"):
+            return await self.place_repo.get(place_id)
+
+    async def place_exists(self, place_id):
+        """Return True if a place with *place_id* exists."""
+        return await self.place_repo.exists(id=place_id)
+
+    async def get_place_owner_id(self, place_id):
+        """Return the owner id of a place (None if the place is missing)."""
+        row = await self.place_repo.get_columns(place_id, "owner_id")
+        return row["owner_id"] if row else None
+
+    async def get_places_by_ids(self, place_ids):
+        """Retrieve several places at once as ``(places, missing_ids)``."""
+        with loading("list"):
+            return await self.place_repo.get_many(place_ids)
+
+    async def get_all_places(self):
+        """Retrieve all places."""
+        return await self.place_repo.get_all()
+
+    async def get_places_page(self, cursor=None, limit=None, order_by="created_at",
+                              filters=None):
+        """Retrieve one keyset page of places as ``(items, next_cursor)``."""
+        with loading("list"):
+            return await self.place_repo.get_page(cursor, limit, order_by, filters)
+
+    def iter_places(self, chunk_size=None, **filters):
+        """Stream places matching *filters* (``async for``)."""
+        return self.place_repo.iter_all(chunk_size, filters)
+
+    @async_transactional
+    async def update_place(self, place_id, place_data):
+        """Update a place's information."""
+        place = await self.place_repo.get(place_id)
+        if not place:
+            return None
+
+        place_data.pop("owner_id", None)
+        place_data.pop("owner", None)
+        for field in Place.RATING_FIELDS:
+            place_data.pop(field, None)
+
+        place.update(place_data)
+        return place
+
+    # ========== Review Management ==========
+
+    async def _rate(self, place_id, count, total):
+        """Atomically add *count* reviews rating *total* to a place."""
+        await self.place_repo.increment(
+            place_id, {"review_count": count, "rating_sum": total},
+            Place.RATING_AVERAGE,
+        )
+
+    @async_transactional
+    async def create_review(self, review_data):
+        """Create a new review."""
+        review_data = dict(review_data)
+        user_id = review_data.pop("user_id", None)
+        place_id = review_data.pop("place_id", None)
+
+        if not user_id or not place_id:
+            raise ValueError("User ID and Place ID are required")
+
+        if not await self.user_repo.exists(id=user_id):
+            raise ValueError("User not found")
+
+        if not await self.place_repo.exists(id=place_id):
+            raise ValueError("Place not found")
+
+        if await self.review_repo.exists(user_id=user_id, place_id=place_id):
+            raise ValueError("You have already reviewed this place")
+
+        review = Review(**review_data, place_id=place_id, user_id=user_id)
+        await self.review_repo.add(review)
+        await self._rate(place_id, 1, review.rating)
+        return review
+
+    @async_transactional
+    async def create_reviews(self, reviews_data, chunk_size=None):
+        """Create many reviews in one batch and return their ids."""
+        users, places = {}, {}
+        reviews = []
+        for data in reviews_data:
+            data = dict(data)
+            user_id = data.pop("user_id", None)
+            place_id = data.pop("place_id", None)
+            if not user_id or not place_id:
+                raise ValueError("User ID and Place ID are required")
+            if user_id not in users:
+                users[user_id] = await self.user_repo.exists(id=user_id)
+            if not users[user_id]:
+                raise ValueError("User not found")
+            if place_id not in places:
+                places[place_id] = await self.place_repo.exists(id=place_id)
+            if not places[place_id]:
+                raise ValueError("Place not found")
+            reviews.append(Review(**data, place_id=place_id, user_id=user_id))
+        check_review_pairs(reviews, await self.review_repo.find({
+            "user_id__in": list(users), "place_id__in": list(places),
+        }) if reviews else [])
+        ids = await self.review_repo.add_many(reviews, chunk_size)
+        totals = {place_id: [0, 0] for place_id in places}
+        for review in reviews:
+            totals[review.place_id][0] += 1
+            totals[review.place_id][1] += review.rating
+        for place_id, (count, total) in totals.items():
+            await self._rate(place_id, count, total)
+        return ids
+
+    async def get_review(self, review_id):
+        """Retrieve a review by ID."""
+        with loading("detail"):
+            return await self.review_repo.get(review_id)
+
+    async def get_all_reviews(self):
+        """Retrieve all reviews."""
+        return await self.review_repo.get_all()
+
+    async def get_reviews_page(self, cursor=None, limit=None, order_by="created_at",
+                               filters=None):
+        """Retrieve one keyset page of reviews as ``(items, next_cursor)``."""
+        with loading("list"):
+            return await self.review_repo.get_page(cursor, limit, order_by, filters)
+
+    def iter_reviews(self, chunk_size=None, **filters):
+        """Stream reviews matching *filters* (``async for``)."""
+        return self.review_repo.iter_all(chunk_size, filters)
+
+    async def has_reviewed(self, user_id, place_id):
+        """Return True if *user_id* has already reviewed *place_id*."""
+        return await self.review_repo.exists(user_id=user_id, place_id=place_id)
+
+    async def get_reviews_by_place(self, place_id):
+        """Retrieve all reviews for a specific place, oldest first."""
+        with loading("list"):
+            return await self.review_repo.find({"place_id": place_id},
+                                               order_by="created_at")
+
+    @async_transactional
+    async def update_review(self, review_id, review_data):
+        """Update a review."""
+        review = await self.get_review(review_id)
+        if not review:
+            return None
+
+        review_data.pop("user_id", None)
+        review_data.pop("place_id", None)
+
+        old_rating = review.rating
+        review.update(review_data)
+        if review.rating != old_rating:
+            await self._rate(review.place_id, 0, review.rating - old_rating)
+        return review
+
+    @async_transactional
+    async def delete_review(self, review_id):
+        """Delete a review."""
+        review = await self.review_repo.get(review_id)
+        if not review:
+            return False
+
+        place_id, rating = review.place_id, review.rating
+        await self.review_repo.delete(review_id)
+        await self._rate(place_id, -1, -rating)
+        return True
+
+    # ========== Amenity Management ==========
+
+    @async_transactional
+    async def create_amenity(self, amenity_data):
+        """Create a new amenity."""
+        amenity = Amenity(**amenity_data)
+        await self.amenity_repo.add(amenity)
+        return amenity
+
+    @async_transactional
+    async def create_amenities(self, amenities_data, chunk_size=None):
+        """Create many amenities in one batch and return their ids."""
+        amenities = [Amenity(**data) for data in amenities_data]
+        return await self.amenity_repo.add_many(amenities, chunk_size)
+
+    async def get_amenity(self, amenity_id):
+        """Retrieve an amenity by ID."""
+        with loading("detail"):
+            return await self.amenity_repo.get(amenity_id)
+
+    async def get_amenities_by_ids(self, amenity_ids):
+        """Retrieve several amenities at once as ``(amenities, missing_ids)``."""
+        with loading("list"):
+            return await self.amenity_repo.get_many(amenity_ids)
+
+    async def get_all_amenities(self):
+        """Retrieve all amenities."""
+        return await self.amenity_repo.get_all()
+
+    async def get_amenities_page(self, cursor=None, limit=None,
+                                 order_by="created_at", filters=None):
+        """Retrieve one keyset page of amenities as ``(items, next_cursor)``."""
+        with loading("list"):
+            return await self.amenity_repo.get_page(cursor, limit, order_by, filters)
+
+    def iter_amenities(self, chunk_size=None, **filters):
+        """Stream amenities matching *filters* (``async for``)."""
+        return self.amenity_repo.iter_all(chunk_size, filters)
+
+    @async_transactional
+    async def update_amenity(self, amenity_id, amenity_data):
+        """Update an amenity."""
+        amenity = await self.get_amenity(amenity_id)
+        if not amenity:
+            return None
+
+        amenity.update(amenity_data)
+        return amenity
@@ -2,29 +2,72 @@
 Suhail Al-aboud <10675@holbertonstudents.com>
 Facade pattern implementation for simplified access to business logic
 """
-from app.persistence.sqlalchemy_repository import SQLAlchemyRepository
+from app.persistence.backends import SQL_BACKENDS, current_backend, get_repository
+from app.persistence.loading import loading
+from app.persistence.place_ratings import drifted_place_ratings, scan_place_ratings
+from app.persistence.unit_of_work import transactional
 from app.models.user import User
 from app.models.place import Place
 from app.models.review import Review
 from app.models.amenity import Amenity
 
 
-class HBnBFacade:
-    """Facade class for managing all application operations."""
+def check_review_pairs(reviews, existing):
+    """Raise ValueError if a (user, place) pair repeats in *reviews* or
+    already has one of the *existing* reviews."""
+    seen = {(r.user_id, r.place_id) for r in existing}
+    for review in reviews:
+        pair = (review.user_id, review.place_id)
+        if pair in seen:
+            raise ValueError("Duplicate review for the same user and place")
+        seen.add(pair)
+
 
-    def __init__(self):
-        """Initialize repositories for all entities using SQLAlchemy."""
-        self.user_repo = SQLAlchemyRepository(User)
-        self.place_repo = SQLAlchemyRepository(Place)
-        self.review_repo = SQLAlchemyRepository(Review)
-        self.amenity_repo = SQLAlchemyRepository(Amenity)
+class HBnBFacade:
+    """Facade class for managing all application operations.
+
+    Write methods are ``@transactional``: the repository calls they make
+    join one unit of work, so each method costs a single commit (or none
+    when it runs inside a request, which commits once at the end).
+
+    Read methods name the loading profile their callers need (``list``,
+    ``detail`` or ``auth``, see ``app.persistence.loading``); relationships
+    outside the profile stay lazy.
+    """
+
+    # Repositories come from the current app's REPOSITORY_BACKEND, so
+    # module-level facades created before the app still pick them up.
+    @property
+    def user_repo(self):
+        return get_repository(User)
+
+    @property
+    def place_repo(self):
+        return get_repository(Place)
+
+    @property
+    def review_repo(self):
+        return get_repository(Review)
+
+    @property
+    def amenity_repo(self):
+        return get_repository(Amenity)
+
+    def cache_stats(self):
+        """Return the counters of every repository cache."""
+        return [
+            repo.stats()
+            for repo in (self.user_repo, self.place_repo,
+                         self.review_repo, self.amenity_repo)
+            if hasattr(repo, "stats")
+        ]
 
     # ========== User Management ==========
 
+    @transactional
     def create_user(self, user_data):
         """Create a new user."""
-        existing_user = self.get_user_by_email(user_data.get("email", ""))
-        if existing_user:
+        if self.email_exists(user_data.get("email", "")):
             raise ValueError("Email already registered")
 
         if "password" not in user_data:
@@ -34,18 +77,58 @@ class HBnBFacade:
         self.user_repo.add(user)
         return user
 
+    @transactional
+    def create_users(self, users_data, chunk_size=None):
+        """Create many users in one batch and return their ids."""
+        emails = [data.get("email", "").lower() for data in users_data]
+        if len(set(emails)) != len(emails):
+            raise ValueError("Duplicate email in batch")
+        if any("password" not in data for data in users_data):
+            raise ValueError("Password is required")
+        if self.user_repo.find({"email__in": emails}, limit=1):
+            raise ValueError("Email already registered")
+
+        users = [User(**data) for data in users_data]
+        return self.user_repo.add_many(users, chunk_size)
+
+    @loading("detail")
     def get_user(self, user_id):
         """Retrieve a user by ID."""
         return self.user_repo.get(user_id)
 
+    @loading("auth")
     def get_user_by_email(self, email):
         """Retrieve a user by email (case‑insensitive)."""
         return self.user_repo.get_by_attribute("email", email.lower())
 
+    def email_exists(self, email):
+        """Return True if a user already uses *email* (case‑insensitive)."""
+        return self.user_repo.exists(email=email.lower())
+
+    def admin_exists(self):
+        """Return True if at least one admin account exists."""
+        return self.user_repo.exists(is_admin=True)
+
+    @loading("list")
+    def get_users_by_ids(self, user_ids):
+        """Retrieve several users at once as ``(users, missing_ids)``."""
+        return self.user_repo.get_many(user_ids)
+
     def get_all_users(self):
         """Retrieve all users."""
         return self.user_repo.get_all()
 
+    @loading("list")
+    def get_users_page(self, cursor=None, limit=None, order_by="created_at",
+                       filters=None):
+        """Retrieve one keyset page of users as ``(items, next_cursor)``."""
+        return self.user_repo.get_page(cursor, limit, order_by, filters)
+
+    def iter_users(self, chunk_size=None, **filters):
+        """Stream users matching *filters* without loading the whole table."""
+        return self.user_repo.iter_all(chunk_size, filters)
+
+    @transactional
     def update_user(self, user_id, user_data):
         """Update a user's information."""
         user = self.get_user(user_id)
@@ -53,15 +136,17 @@ class HBnBFacade:
             return None
 
         if "email" in user_data and user_data["email"].lower() != user.email:
-            existing = self.get_user_by_email(user_data["email"])
-            if existing:
+            if self.email_exists(user_data["email"]):
                 raise ValueError("Email already registered")
 
-        user.update(user_data)
-        return user
+        # Through the repository: it reindexes (memory) or rewrites the
+        # record (embedded), where mutating *user* alone would be lost
+        self.user_repo.update(user_id, user_data)
+        return self.get_user(user_id)
 
     # ========== Place Management ==========
 
+    @transactional
     def create_place(self, place_data):
         """Create a new place."""
         owner_id = place_data.pop("owner_id", None)
@@ -72,33 +157,96 @@ class HBnBFacade:
         if not owner:
             raise ValueError("Owner not found")
 
-        place = Place(**place_data, owner=owner)
+        # owner_id is set up front: repositories that never flush (memory,
+        # embedded) index and return it as stored
+        place = Place(**place_data, owner_id=owner_id)
+        owner.add_place(place)  # write-only: owner.places is not loaded
         self.place_repo.add(place)
-        owner.add_place(place)
         return place
 
+    @transactional
+    def create_places(self, places_data, chunk_size=None):
+        """Create many places in one batch and return their ids."""
+        owners = {}
+        places = []
+        for data in places_data:
+            data = dict(data)
+            owner_id = data.pop("owner_id", None)
+            if not owner_id:
+                raise ValueError("Owner ID is required")
+            if owner_id not in owners:
+                owners[owner_id] = self.get_user(owner_id)
+            if not owners[owner_id]:
+                raise ValueError("Owner not found")
+            # Link by foreign key so owner.places is not loaded per row
+            places.append(Place(**data, owner_id=owner_id))
+        return self.place_repo.add_many(places, chunk_size)
+
+    @loading("detail")
     def get_place(self, place_id):
         """Retrieve a place by ID."""
         return self.place_repo.get(place_id)
 
+    def place_exists(self, place_id):
+        """Return True if a place with *place_id* exists."""
+        return self.place_repo.exists(id=place_id)
+
+    def get_place_owner_id(self, place_id):
+        """Return the owner id of a place (None if the place is missing)."""
+        row = self.place_repo.get_columns(place_id, "owner_id")
+        return row["owner_id"] if row else None
+
+    @loading("list")
+    def get_places_by_ids(self, place_ids):
+        """Retrieve several places at once as ``(places, missing_ids)``."""
+        return self.place_repo.get_many(place_ids)
+
     def get_all_places(self):
         """Retrieve all places."""
         return self.place_repo.get_all()
 
+    @loading("list")
+    def get_places_page(self, cursor=None, limit=None, order_by="created_at",
+                        filters=None):
+        """Retrieve one keyset page of places as ``(items, next_cursor)``."""
+        return self.place_repo.get_page(cursor, limit, order_by, filters)
+
+    def iter_places(self, chunk_size=None, **filters):
+        """Stream places matching *filters* without loading the whole table."""
+        return self.place_repo.iter_all(chunk_size, filters)
+
+    @transactional
     def update_place(self, place_id, place_data):
         """Update a place's information."""
-        place = self.get_place(place_id)
+        place = self.place_repo.get(place_id)
         if not place:
             return None
 
         place_data.pop("owner_id", None)
         place_data.pop("owner", None)
+        for field in Place.RATING_FIELDS:
+            place_data.pop(field, None)
 
-        place.update(place_data)
-        return place
+        self.place_repo.update(place_id, place_data)
+        return self.place_repo.get(place_id)
 
     # ========== Review Management ==========
 
+    def _rate(self, place_id, count, total):
+        """Add *count* reviews rating *total* to a place's aggregates.
+
+        Negative values remove reviews; ``(0, new - old)`` re-rates one.
+        One atomic increment relative to the stored totals, never to a
+        possibly stale loaded place, inside the review write's unit of
+        work. ``repair_place_ratings`` fixes any drift from writes made
+        outside the facade.
+        """
+        self.place_repo.increment(
+            place_id, {"review_count": count, "rating_sum": total},
+            Place.RATING_AVERAGE,
+        )
+
+    @transactional
     def create_review(self, review_data):
         """Create a new review."""
         user_id = review_data.pop("user_id", None)
@@ -107,19 +255,56 @@ class HBnBFacade:
         if not user_id or not place_id:
             raise ValueError("User ID and Place ID are required")
 
-        user = self.get_user(user_id)
-        if not user:
+        if not self.user_repo.exists(id=user_id):
             raise ValueError("User not found")
 
-        place = self.get_place(place_id)
-        if not place:
+        if not self.place_repo.exists(id=place_id):
             raise ValueError("Place not found")
 
-        review = Review(**review_data, place=place, user=user)
+        # Also enforced by the uq_reviews_user_place constraint
+        if self.has_reviewed(user_id, place_id):
+            raise ValueError("You have already reviewed this place")
+
+        # Link by foreign key: place.reviews is not loaded
+        review = Review(**review_data, place_id=place_id, user_id=user_id)
         self.review_repo.add(review)
-        place.add_review(review)
+        self._rate(place_id, 1, review.rating)
         return review
 
+    @transactional
+    def create_reviews(self, reviews_data, chunk_size=None):
+        """Create many reviews in one batch and return their ids."""
+        users, places = {}, {}
+        reviews = []
+        for data in reviews_data:
+            data = dict(data)
+            user_id = data.pop("user_id", None)
+            place_id = data.pop("place_id", None)
+            if not user_id or not place_id:
+                raise ValueError("User ID and Place ID are required")
+            if user_id not in users:
+                users[user_id] = self.user_repo.exists(id=user_id)
+            if not users[user_id]:
+                raise ValueError("User not found")
+            if place_id not in places:
+                places[place_id] = self.place_repo.exists(id=place_id)
+            if not places[place_id]:
+                raise ValueError("Place not found")
+            reviews.append(Review(**data, place_id=place_id, user_id=user_id))
+        check_review_pairs(reviews, self.review_repo.find({
+            "user_id__in": list(users), "place_id__in": list(places),
+        }) if reviews else [])
+        ids = self.review_repo.add_many(reviews, chunk_size)
+        # One aggregate update per place, not per review
+        totals = {place_id: [0, 0] for place_id in places}
+        for review in reviews:
+            totals[review.place_id][0] += 1
+            totals[review.place_id][1] += review.rating
+        for place_id, (count, total) in totals.items():
+            self._rate(place_id, count, total)
+        return ids
+
+    @loading("detail")
     def get_review(self, review_id):
         """Retrieve a review by ID."""
         return self.review_repo.get(review_id)
@@ -128,55 +313,122 @@ class HBnBFacade:
         """Retrieve all reviews."""
         return self.review_repo.get_all()
 
-    def get_reviews_by_place(self, place_id):
-        """Retrieve all reviews for a specific place."""
-        place = self.get_place(place_id)
-        if place:
-            return place.reviews
-        return []
+    @loading("list")
+    def get_reviews_page(self, cursor=None, limit=None, order_by="created_at",
+                         filters=None):
+        """Retrieve one keyset page of reviews as ``(items, next_cursor)``."""
+        return self.review_repo.get_page(cursor, limit, order_by, filters)
+
+    def iter_reviews(self, chunk_size=None, **filters):
+        """Stream reviews matching *filters* without loading the whole table."""
+        return self.review_repo.iter_all(chunk_size, filters)
 
+    def has_reviewed(self, user_id, place_id):
+        """Return True if *user_id* has already reviewed *place_id*."""
+        return self.review_repo.exists(user_id=user_id, place_id=place_id)
+
+    @loading("list")
+    def get_reviews_by_place(self, place_id):
+        """Retrieve all reviews for a specific place, oldest first."""
+        return self.review_repo.find({"place_id": place_id}, order_by="created_at")
+
+    def get_place_reviews_page(self, place_id, cursor=None, limit=None,
+                               order_by="created_at"):
+        """Retrieve one keyset page of a place's reviews."""
+        return self.get_reviews_page(cursor, limit, order_by,
+                                     filters={"place_id": place_id})
+
+    def count_place_reviews(self, place_id):
+        """Return how many reviews *place_id* has (``SELECT count(*)``)."""
+        return self.review_repo.count(place_id=place_id)
+
+    @transactional
+    def repair_place_ratings(self):
+        """Recompute drifted place rating aggregates and return how many
+        places were fixed (one grouped query on SQL backends, a scan of
+        the stored reviews otherwise)."""
+        if current_backend() in SQL_BACKENDS:
+            drifted = drifted_place_ratings()
+        else:
+            drifted = scan_place_ratings(self.place_repo.iter_all(),
+                                         self.review_repo.iter_all())
+        return self.place_repo.update_many(drifted)
+
+    @transactional
     def update_review(self, review_id, review_data):
         """Update a review."""
         review = self.get_review(review_id)
         if not review:
             return None
 
-        review.update(review_data)
+        # A review stays on its place (and author)
+        review_data.pop("user_id", None)
+        review_data.pop("place_id", None)
+
+        old_rating = review.rating
+        self.review_repo.update(review_id, review_data)
+        review = self.get_review(review_id)
+        if review.rating != old_rating:
+            self._rate(review.place_id, 0, review.rating - old_rating)
         return review
 
+    @transactional
     def delete_review(self, review_id):
         """Delete a review."""
-        review = self.get_review(review_id)
+        review = self.review_repo.get(review_id)
         if not review:
             return False
 
-        if review.place:
-            review.place.reviews.remove(review)
-
+        place_id, rating = review.place_id, review.rating
         self.review_repo.delete(review_id)
+        self._rate(place_id, -1, -rating)
         return True
 
     # ========== Amenity Management ==========
 
+    @transactional
     def create_amenity(self, amenity_data):
         """Create a new amenity."""
         amenity = Amenity(**amenity_data)
         self.amenity_repo.add(amenity)
         return amenity
 
+    @transactional
+    def create_amenities(self, amenities_data, chunk_size=None):
+        """Create many amenities in one batch and return their ids."""
+        amenities = [Amenity(**data) for data in amenities_data]
+        return self.amenity_repo.add_many(amenities, chunk_size)
+
+    @loading("detail")
     def get_amenity(self, amenity_id):
         """Retrieve an amenity by ID."""
         return self.amenity_repo.get(amenity_id)
 
+    @loading("list")
+    def get_amenities_by_ids(self, amenity_ids):
+        """Retrieve several amenities at once as ``(amenities, missing_ids)``."""
+        return self.amenity_repo.get_many(amenity_ids)
+
     def get_all_amenities(self):
         """Retrieve all amenities."""
         return self.amenity_repo.get_all()
 
+    @loading("list")
+    def get_amenities_page(self, cursor=None, limit=None, order_by="created_at",
+                           filters=None):
+        """Retrieve one keyset page of amenities as ``(items, next_cursor)``."""
+        return self.amenity_repo.get_page(cursor, limit, order_by, filters)
+
+    def iter_amenities(self, chunk_size=None, **filters):
+        """Stream amenities matching *filters* without loading the whole table."""
+        return self.amenity_repo.iter_all(chunk_size, filters)
+
+    @transactional
     def update_amenity(self, amenity_id, amenity_data):
         """Update an amenity."""
         amenity = self.get_amenity(amenity_id)
         if not amenity:
             return None
 
-        amenity.update(amenity_data)
-        return amenity
+        self.amenity_repo.update(amenity_id, amenity_data)
+        return self.get_amenity(amenity_id)
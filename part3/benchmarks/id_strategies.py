@@ -0,0 +1,118 @@
+"""
+Insert throughput and on-disk size of each ID_STRATEGY / ID_BINARY.
+
+Every configuration inserts the same users, places and reviews (two id
+columns plus the primary key per review, one review per user and place) into a fresh SQLite file, in
+BULK_CHUNK_SIZE batches each committed on its own, then reports:
+
+    rows/s      insert throughput
+    db KiB      size of the database file
+    pk KiB      size of the reviews primary-key index (needs SQLite's
+                dbstat table; "-" when it is not compiled in)
+
+Random uuid4 keys land all over the primary-key B-tree (on a table
+larger than the page cache, each insert touches a cold page);
+time-ordered keys append at its right edge.
+
+Usage (from part3/):
+    python -m benchmarks.id_strategies [--rows 50000]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from sqlalchemy import text
+
+from app import create_app, db
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.services.facade import HBnBFacade
+from config import TestingConfig
+
+CONFIGURATIONS = [
+    ("uuid4", False),
+    ("uuid7", False),
+    ("ulid", False),
+    ("uuid7", True),
+    ("ulid", True),
+]
+USERS = 50
+
+
+def index_size(table):
+    """KiB used by the primary-key index of *table*, or None without dbstat"""
+    try:
+        pages = db.session.execute(text(
+            # The primary key is the table's first automatic index
+            "SELECT sum(pgsize) FROM dbstat WHERE name = :index"
+        ), {"index": f"sqlite_autoindex_{table}_1"}).scalar()
+    except Exception:
+        db.session.rollback()
+        return None
+    return pages / 1024 if pages else None
+
+
+def run(strategy, binary, rows, data_dir):
+    path = os.path.join(data_dir, f"{strategy}-{int(binary)}.db")
+
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        REPOSITORY_BACKEND = "sqlite"
+        ID_STRATEGY = strategy
+        ID_BINARY = binary
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        facade = HBnBFacade()
+        owner = facade.create_user({"first_name": "O", "last_name": "W",
+                                    "email": "owner@example.com",
+                                    "password": "secret1"})
+        places = [Place(title=f"Place {i}", price=80.0, owner_id=owner.id)
+                  for i in range(-(-rows // USERS))]
+        place_ids = facade.place_repo.add_many(places)
+        users = [User(first_name="U", last_name=str(i), password="secret1",
+                      email=f"user{i}@example.com") for i in range(USERS)]
+        user_ids = facade.user_repo.add_many(users)
+        db.session.remove()
+
+        chunk = app.config["BULK_CHUNK_SIZE"]
+        start = time.perf_counter()
+        for offset in range(0, rows, chunk):
+            facade.review_repo.add_many([
+                Review(text="Nice", rating=4, place_id=place_ids[i // USERS],
+                       user_id=user_ids[i % USERS])
+                for i in range(offset, min(offset + chunk, rows))
+            ])
+            db.session.remove()
+        elapsed = time.perf_counter() - start
+
+        pk_size = index_size("reviews")
+        db.session.remove()
+        db.engine.dispose()
+    return rows / elapsed, os.path.getsize(path) / 1024, pk_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    try:
+        print(f"{'strategy':<10}{'storage':<12}{'rows/s':>10}{'db KiB':>10}"
+              f"{'pk KiB':>10}")
+        for strategy, binary in CONFIGURATIONS:
+            rate, size, pk_size = run(strategy, binary, args.rows, data_dir)
+            pk = f"{pk_size:.0f}" if pk_size is not None else "-"
+            storage = "BINARY(16)" if binary else "VARCHAR"
+            print(f"{strategy:<10}{storage:<12}{rate:>10.0f}{size:>10.0f}{pk:>10}")
+    finally:
+        shutil.rmtree(data_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+CRUD, lookup and pagination throughput of every REPOSITORY_BACKEND.
+
+Each backend gets the same data set and the same scenarios, built
+through ``create_repository`` exactly as the facade builds them:
+
+    insert   add_many() of the places
+    get      get() by random id
+    email    get_by_attribute("email") on random users
+    range    find() on a price band
+    pages    get_page() walk over every place, 50 per page
+    update   update() of the price of random places
+
+The cached backend caches every entity; the embedded one writes its
+files to a temporary directory. MySQL only runs when
+``--mysql-url`` is given (its tables are dropped and recreated).
+
+Usage (from part3/):
+    python -m benchmarks.repository_backends [--places 2000] [--ops 2000]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from app import create_app, db
+from app.models.place import Place
+from app.models.user import User
+from app.persistence.backends import create_repository
+from config import TestingConfig
+
+USERS = 100
+
+
+def make_app(uri, backend, data_dir):
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = uri
+        REPOSITORY_BACKEND = backend
+        REPOSITORY_DATA_DIR = data_dir
+        REPOSITORY_CACHE_ENTITIES = {"users", "places", "reviews", "amenities"}
+
+    return create_app(BenchConfig)
+
+
+def timed(results, name, ops, fn):
+    start = time.perf_counter()
+    fn()
+    results[name] = ops / (time.perf_counter() - start)
+    db.session.remove()
+
+
+def run(backend, places_count, ops):
+    users_repo = create_repository(User, backend)
+    places_repo = create_repository(Place, backend)
+    rng = random.Random(42)
+    users = [User(first_name="Bench", last_name=str(i),
+                  email=f"user{i}@example.com", password="secret1")
+             for i in range(USERS)]
+    users_repo.add_many(users)
+    user_ids = [u.id for u in users]
+    emails = [u.email for u in users]
+    places = [Place(title=f"Place {i}", price=float(rng.randint(10, 500)),
+                    owner_id=user_ids[i % USERS]) for i in range(places_count)]
+    place_ids = [p.id for p in places]
+    db.session.remove()
+
+    results = {}
+    timed(results, "insert", places_count, lambda: places_repo.add_many(places))
+    for _ in range(2):  # untimed: the hybrid backend warms up and catches up
+        users_repo.count()
+        places_repo.count()
+    db.session.remove()
+    timed(results, "get", ops, lambda: [
+        places_repo.get(rng.choice(place_ids)) for _ in range(ops)
+    ])
+    timed(results, "email", ops, lambda: [
+        users_repo.get_by_attribute("email", rng.choice(emails)) for _ in range(ops)
+    ])
+
+    def price_bands():
+        for _ in range(ops):
+            low = rng.randint(10, 490)
+            places_repo.find({"price__gte": low, "price__lt": low + 10})
+    timed(results, "range", ops, price_bands)
+
+    def walk_pages():
+        cursor, pages = None, 0
+        while True:
+            _, cursor = places_repo.get_page(cursor, limit=50)
+            pages += 1
+            if cursor is None:
+                return pages
+    page_count = -(-places_count // 50)
+    timed(results, "pages", page_count, walk_pages)
+
+    def updates():
+        for _ in range(ops):
+            places_repo.update(rng.choice(place_ids),
+                               {"price": float(rng.randint(10, 500))})
+    timed(results, "update", ops, updates)
+    for repo in (users_repo, places_repo):
+        if hasattr(repo, "close"):  # embedded: flush before the files go
+            repo.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--places", type=int, default=2000)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--mysql-url", help="e.g. mysql+pymysql://u:p@host/db")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    sqlite_uri = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    runs = [("memory", "sqlite:///:memory:"), ("sqlite", sqlite_uri),
+            ("cached", sqlite_uri), ("hybrid", sqlite_uri),
+            ("embedded", "sqlite:///:memory:")]
+    if args.mysql_url:
+        runs.append(("mysql", args.mysql_url))
+
+    print(f"{args.places} places, {USERS} users, {args.ops} ops per scenario "
+          "(operations/s; pages = pages/s)")
+    scenarios = ("insert", "get", "email", "range", "pages", "update")
+    print(f"{'backend':>8} " + " ".join(f"{name:>9}" for name in scenarios))
+    try:
+        for backend, uri in runs:
+            app = make_app(uri, backend, os.path.join(tmp, backend))
+            with app.app_context():
+                db.drop_all()
+                db.create_all()
+                results = run(backend, args.places, args.ops)
+                db.drop_all()
+                db.engine.dispose()
+            print(f"{backend:>8} "
+                  + " ".join(f"{results[name]:9.0f}" for name in scenarios))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Read throughput on SQLite while a writer is active.
+
+Runs the same workload twice: once with SQLite's default pragmas
+(rollback journal) and once with ``Config.SQLITE_PRAGMAS`` (WAL, ...).
+A writer thread inserts small batches in a loop while reader threads look
+up random rows by primary key.
+
+Usage (from part3/):
+    python -m benchmarks.sqlite_read_while_writing [--seconds 5] [--readers 4]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from sqlalchemy import (
+    Column, Integer, MetaData, String, Table, create_engine, insert, select,
+)
+from sqlalchemy.exc import OperationalError
+
+from app.persistence.sqlite_pragmas import apply_sqlite_pragmas
+from config import Config
+
+SEED_ROWS = 10_000
+WRITE_BATCH = 50
+
+metadata = MetaData()
+items = Table(
+    "items", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(64), nullable=False),
+)
+
+
+def make_engine(path, pragmas):
+    engine = create_engine(f"sqlite:///{path}",
+                           connect_args={"check_same_thread": False, "timeout": 30})
+    apply_sqlite_pragmas(engine, pragmas)
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(items), [{"name": f"item {i}"} for i in range(SEED_ROWS)])
+    return engine
+
+
+def run(engine, seconds, readers):
+    stop = threading.Event()
+    reads = [0] * readers
+    read_errors = [0] * readers
+    writes = [0]
+
+    def writer():
+        while not stop.is_set():
+            with engine.begin() as conn:
+                conn.execute(insert(items),
+                             [{"name": "new"} for _ in range(WRITE_BATCH)])
+            writes[0] += WRITE_BATCH
+
+    def reader(slot):
+        rng = random.Random(slot)
+        with engine.connect() as conn:
+            while not stop.is_set():
+                stmt = select(items.c.name).where(items.c.id == rng.randint(1, SEED_ROWS))
+                try:
+                    conn.execute(stmt).scalar()
+                    conn.commit()  # end the read transaction
+                    reads[slot] += 1
+                except OperationalError:  # "database is locked"
+                    conn.rollback()
+                    read_errors[slot] += 1
+
+    threads = [threading.Thread(target=writer)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(reads) / seconds, sum(read_errors), writes[0] / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+
+    profiles = [("default pragmas", {}), ("SQLITE_PRAGMAS", Config.SQLITE_PRAGMAS)]
+    print(f"{args.readers} readers + 1 writer, {args.seconds:g}s per profile")
+    for label, pragmas in profiles:
+        tmp = tempfile.mkdtemp()
+        try:
+            engine = make_engine(os.path.join(tmp, "bench.db"), pragmas)
+            reads, errors, writes = run(engine, args.seconds, args.readers)
+            engine.dispose()
+        finally:
+            shutil.rmtree(tmp)
+        print(f"{label:>16}: {reads:10.0f} reads/s  {errors:6d} locked  "
+              f"{writes:8.0f} rows written/s")
+
+
+if __name__ == "__main__":
+    main()
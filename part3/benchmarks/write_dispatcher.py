@@ -0,0 +1,95 @@
+"""
+Facade write throughput on SQLite with and without the write dispatcher.
+
+Several threads create amenities through ``HBnBFacade`` as fast as they
+can, first committing from their own threads, then through the
+single-writer dispatcher (``WRITE_DISPATCHER_ENABLED``). Lock errors are
+"database is locked" failures seen by the callers.
+
+Usage (from part3/):
+    python -m benchmarks.write_dispatcher [--seconds 5] [--threads 8]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from app import create_app, db
+from app.services.facade import HBnBFacade
+from config import TestingConfig
+
+
+def make_app(path, dispatcher, busy_timeout):
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        SQLITE_PRAGMAS = dict(TestingConfig.SQLITE_PRAGMAS,
+                              busy_timeout=busy_timeout)
+        WRITE_DISPATCHER_ENABLED = dispatcher
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def run(app, seconds, threads):
+    facade = HBnBFacade()
+    stop = threading.Event()
+    writes = [0] * threads
+    errors = [0] * threads
+
+    def worker(slot):
+        with app.app_context():
+            n = 0
+            while not stop.is_set():
+                try:
+                    facade.create_amenity({"name": f"amenity {slot}-{n}"})
+                    writes[slot] += 1
+                except OperationalError:
+                    errors[slot] += 1
+                finally:
+                    db.session.remove()
+                n += 1
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in pool:
+        thread.join()
+    return sum(writes) / seconds, sum(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--busy-timeout", type=int, default=100,
+                        help="SQLite busy_timeout in ms (default: 100)")
+    args = parser.parse_args()
+
+    print(f"{args.threads} writer threads, {args.seconds:g}s per mode, "
+          f"busy_timeout={args.busy_timeout}ms")
+    for label, dispatcher in (("per-thread commits", False),
+                              ("write dispatcher", True)):
+        tmp = tempfile.mkdtemp()
+        try:
+            app = make_app(os.path.join(tmp, "bench.db"), dispatcher,
+                           args.busy_timeout)
+            writes, errors = run(app, args.seconds, args.threads)
+            if dispatcher:
+                app.extensions["hbnb_write_dispatcher"].close()
+            with app.app_context():
+                db.engine.dispose()
+        finally:
+            shutil.rmtree(tmp)
+        print(f"{label:>18}: {writes:8.0f} writes/s  {errors:6d} lock errors")
+
+
+if __name__ == "__main__":
+    main()
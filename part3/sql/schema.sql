@@ -38,9 +38,12 @@ price       DECIMAL(10, 2) NOT NULL,
 latitude    FLOAT,
 longitude   FLOAT,
 owner\_id    CHAR(36)     NOT NULL,
+review\_count INT         NOT NULL DEFAULT 0,
+rating\_sum  INT          NOT NULL DEFAULT 0,
+rating\_avg  FLOAT,
 created\_at  DATETIME     DEFAULT CURRENT\_TIMESTAMP,
 updated\_at  DATETIME     DEFAULT CURRENT\_TIMESTAMP,
-FOREIGN KEY (owner\_id) REFERENCES users(id)
+FOREIGN KEY (owner\_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
 \-- ─────────────────────────────────────────────────────────────
@@ -54,9 +57,9 @@ user\_id    CHAR(36)    NOT NULL,
 place\_id   CHAR(36)    NOT NULL,
 created\_at DATETIME     DEFAULT CURRENT\_TIMESTAMP,
 updated\_at DATETIME     DEFAULT CURRENT\_TIMESTAMP,
-UNIQUE (user\_id, place\_id),
-FOREIGN KEY (user\_id)  REFERENCES users(id),
-FOREIGN KEY (place\_id) REFERENCES places(id)
+CONSTRAINT uq\_reviews\_user\_place UNIQUE (user\_id, place\_id),
+FOREIGN KEY (user\_id)  REFERENCES users(id)  ON DELETE CASCADE,
+FOREIGN KEY (place\_id) REFERENCES places(id) ON DELETE CASCADE
 );
 
 \-- ─────────────────────────────────────────────────────────────
@@ -66,6 +69,20 @@ CREATE TABLE IF NOT EXISTS place\_amenity (
 place\_id   CHAR(36) NOT NULL,
 amenity\_id CHAR(36) NOT NULL,
 PRIMARY KEY (place\_id, amenity\_id),
-FOREIGN KEY (place\_id)   REFERENCES places(id),
-FOREIGN KEY (amenity\_id) REFERENCES amenities(id)
+FOREIGN KEY (place\_id)   REFERENCES places(id)    ON DELETE CASCADE,
+FOREIGN KEY (amenity\_id) REFERENCES amenities(id) ON DELETE CASCADE
 );
+
+\-- ─────────────────────────────────────────────────────────────
+\-- INDEXES  (foreign keys and keyset pages; see `flask audit-indexes`)
+\-- ─────────────────────────────────────────────────────────────
+CREATE INDEX IF NOT EXISTS ix\_users\_is\_admin ON users (is\_admin);
+CREATE INDEX IF NOT EXISTS ix\_users\_created ON users (created\_at, id);
+CREATE INDEX IF NOT EXISTS ix\_amenities\_created ON amenities (created\_at, id);
+CREATE INDEX IF NOT EXISTS ix\_places\_owner\_created ON places (owner\_id, created\_at, id);
+CREATE INDEX IF NOT EXISTS ix\_places\_price ON places (price);
+CREATE INDEX IF NOT EXISTS ix\_places\_created ON places (created\_at, id);
+CREATE INDEX IF NOT EXISTS ix\_places\_rating\_avg ON places (rating\_avg);
+CREATE INDEX IF NOT EXISTS ix\_reviews\_place\_created ON reviews (place\_id, created\_at, id);
+CREATE INDEX IF NOT EXISTS ix\_reviews\_created ON reviews (created\_at, id);
+CREATE INDEX IF NOT EXISTS ix\_place\_amenity\_amenity ON place\_amenity (amenity\_id);
@@ -0,0 +1,223 @@
+"""Tests for the asyncio repository and facade (SQLite via aiosqlite)"""
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.models.base_model import BaseModel
+from app.models.user import User
+from app.persistence.async_repository import (
+    AsyncSQLAlchemyRepository,
+    async_database_uri,
+    async_unit_of_work,
+    create_session_factory,
+)
+from app.services.async_facade import AsyncHBnBFacade
+
+try:
+    import aiosqlite  # noqa: F401
+except ImportError:  # pragma: no cover - optional driver
+    aiosqlite = None
+
+
+class TestAsyncDatabaseUri(unittest.TestCase):
+    """Test the sync -> asyncio driver mapping"""
+
+    def test_sqlite_and_mysql_drivers_are_swapped(self):
+        self.assertEqual(async_database_uri("sqlite:///dev.db"),
+                         "sqlite+aiosqlite:///dev.db")
+        self.assertEqual(
+            async_database_uri("mysql+pymysql://u:p@localhost/hbnb"),
+            "mysql+asyncmy://u:p@localhost/hbnb",
+        )
+
+    def test_unknown_driver_is_rejected(self):
+        with self.assertRaises(ValueError):
+            async_database_uri("oracle://u:p@localhost/hbnb")
+
+
+@unittest.skipIf(aiosqlite is None, "aiosqlite is not installed")
+class AsyncTestCase(unittest.IsolatedAsyncioTestCase):
+    """Base class providing an empty SQLite file and an async facade"""
+
+    async def asyncSetUp(self):
+        """Create the schema in a temporary database file"""
+        create_app("config.TestingConfig")  # imports and maps every model
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.session_factory = create_session_factory(f"sqlite:///{self.path}")
+        self.engine = self.session_factory.kw["bind"]
+        async with self.engine.begin() as conn:
+            await conn.run_sync(db.metadata.create_all)
+        self.facade = AsyncHBnBFacade(self.session_factory)
+
+    async def asyncTearDown(self):
+        """Dispose of the engine and remove the database file"""
+        await self.engine.dispose()
+        os.remove(self.path)
+
+    async def make_user(self, email="owner@example.com"):
+        return await self.facade.create_user({
+            "first_name": "Owner",
+            "last_name": "User",
+            "email": email,
+            "password": "secret1",
+        })
+
+
+class TestAsyncRepository(AsyncTestCase):
+    """Test AsyncSQLAlchemyRepository against the Repository contract"""
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.repo = AsyncSQLAlchemyRepository(Amenity, self.session_factory)
+
+    async def seed_amenities(self, count):
+        """Add *count* amenities with strictly increasing created_at"""
+        start = datetime(2024, 1, 1)
+        amenities = []
+        for i in range(count):
+            amenity = Amenity(name=f"Amenity {i:03d}")
+            amenity.created_at = start + timedelta(seconds=i)
+            amenities.append(amenity)
+        await self.repo.add_many(amenities)
+        return amenities
+
+    async def test_crud_round_trip(self):
+        """add/get/update/delete behave like the sync repository"""
+        amenity = Amenity(name="Wifi")
+        await self.repo.add(amenity)
+        self.assertEqual((await self.repo.get(amenity.id)).name, "Wifi")
+        await self.repo.update(amenity.id, {"name": "Fast Wifi"})
+        self.assertEqual(
+            (await self.repo.get_by_attribute("name", "Fast Wifi")).id, amenity.id
+        )
+        await self.repo.delete(amenity.id)
+        self.assertIsNone(await self.repo.get(amenity.id))
+
+    async def test_get_page_walks_every_object_once(self):
+        """Following next_cursor yields every object in order"""
+        amenities = await self.seed_amenities(7)
+        seen, cursor = [], None
+        while True:
+            items, cursor = await self.repo.get_page(cursor, limit=3)
+            seen.extend(a.id for a in items)
+            if cursor is None:
+                break
+        self.assertEqual(seen, [a.id for a in amenities])
+
+    async def test_queries_without_hydration(self):
+        """exists/count/get_columns/find/get_many"""
+        amenities = await self.seed_amenities(4)
+        self.assertTrue(await self.repo.exists(name="Amenity 002"))
+        self.assertFalse(await self.repo.exists(name="Pool"))
+        self.assertEqual(await self.repo.count(), 4)
+        self.assertEqual(
+            await self.repo.get_columns(amenities[1].id, "name"),
+            {"name": "Amenity 001"},
+        )
+        found = await self.repo.find({"name__prefix": "Amenity"},
+                                     order_by="-name", limit=2)
+        self.assertEqual([a.name for a in found], ["Amenity 003", "Amenity 002"])
+        found, missing = await self.repo.get_many(
+            [amenities[0].id, "nope"], chunk_size=1
+        )
+        self.assertEqual([a.id for a in found], [amenities[0].id])
+        self.assertEqual(missing, ["nope"])
+
+    async def test_iter_all_streams_in_chunks(self):
+        """iter_all is an async iterator over every row"""
+        await self.seed_amenities(5)
+        names = [a.name async for a in self.repo.iter_all(chunk_size=2)]
+        self.assertEqual(sorted(names), [f"Amenity {i:03d}" for i in range(5)])
+
+    async def test_bulk_update_and_delete(self):
+        """update_many/delete_many skip unknown ids and report counts"""
+        amenities = await self.seed_amenities(3)
+        updated = await self.repo.update_many({
+            amenities[0].id: {"name": "Sauna"}, "nope": {"name": "x"},
+        })
+        self.assertEqual(updated, 1)
+        self.assertEqual((await self.repo.get(amenities[0].id)).name, "Sauna")
+        deleted = await self.repo.delete_many([a.id for a in amenities] + ["nope"])
+        self.assertEqual(deleted, 3)
+        self.assertEqual(await self.repo.count(), 0)
+
+    async def test_update_goes_through_the_model(self):
+        """update goes through BaseModel.update, like the sync repository"""
+        user = await self.make_user()
+        users = AsyncSQLAlchemyRepository(User, self.session_factory)
+        with self.assertRaises(ValueError):
+            await users.update(user.id, {"email": ""})
+        with mock.patch.object(User, "update", autospec=True,
+                               side_effect=BaseModel.update) as update:
+            await users.update(user.id, {"first_name": "Ada", "nickname": "x"})
+        update.assert_called_once()
+        self.assertFalse(hasattr(update.call_args.args[0], "nickname"))
+        stored = await users.get(user.id)
+        self.assertEqual((stored.first_name, stored.email),
+                         ("Ada", "owner@example.com"))
+
+    async def test_update_many_runs_model_validators(self):
+        user = await self.make_user()
+        users = AsyncSQLAlchemyRepository(User, self.session_factory)
+        with self.assertRaises(ValueError):
+            await users.update_many({user.id: {"email": ""}})
+        await users.update_many({user.id: {"email": "NEW@Example.com"}})
+        self.assertEqual((await users.get(user.id)).email, "new@example.com")
+
+    async def test_unit_of_work_rolls_back_on_error(self):
+        """Writes joined to a failing unit are not committed"""
+        with self.assertRaises(RuntimeError):
+            async with async_unit_of_work(self.session_factory):
+                await self.repo.add(Amenity(name="Wifi"))
+                raise RuntimeError("boom")
+        self.assertEqual(await self.repo.count(), 0)
+
+
+class TestAsyncFacade(AsyncTestCase):
+    """Test AsyncHBnBFacade end to end"""
+
+    async def test_user_place_review_flow(self):
+        """Create and read back a user, a place and a review"""
+        owner = await self.make_user()
+        guest = await self.make_user("guest@example.com")
+        self.assertTrue(owner.verify_password("secret1"))
+        with self.assertRaises(ValueError):
+            await self.make_user("OWNER@example.com")
+
+        place = await self.facade.create_place(
+            {"title": "Loft", "price": 80.0, "owner_id": owner.id}
+        )
+        self.assertEqual(await self.facade.get_place_owner_id(place.id), owner.id)
+
+        review = await self.facade.create_review({
+            "text": "Great", "rating": 5,
+            "user_id": guest.id, "place_id": place.id,
+        })
+        self.assertTrue(await self.facade.has_reviewed(guest.id, place.id))
+        reviews = await self.facade.get_reviews_by_place(place.id)
+        self.assertEqual([r.id for r in reviews], [review.id])
+
+        self.assertTrue(await self.facade.delete_review(review.id))
+        self.assertFalse(await self.facade.has_reviewed(guest.id, place.id))
+
+    async def test_update_is_persisted(self):
+        """update_* methods commit their changes"""
+        amenity = await self.facade.create_amenity({"name": "Wifi"})
+        await self.facade.update_amenity(amenity.id, {"name": "Pool"})
+        self.assertEqual((await self.facade.get_amenity(amenity.id)).name, "Pool")
+
+    async def test_missing_owner_is_rejected(self):
+        with self.assertRaises(ValueError):
+            await self.facade.create_place(
+                {"title": "Loft", "price": 80.0, "owner_id": "nope"}
+            )
+        self.assertEqual(await self.facade.place_repo.count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
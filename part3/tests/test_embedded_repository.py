@@ -0,0 +1,85 @@
+"""Tests for the file-backed EmbeddedRepository"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from app import create_app, db
+from app.models.place import Place
+from app.models.user import User
+from app.persistence.embedded_repository import EmbeddedRepository
+
+
+class TestEmbeddedRepository(unittest.TestCase):
+    """Persistence, secondary index files and compaction"""
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.data_dir = tempfile.mkdtemp()
+        # Cleanups run last-in first-out: repositories close before this
+        self.addCleanup(shutil.rmtree, self.data_dir)
+
+    def tearDown(self):
+        self.ctx.pop()
+
+    def open(self, model, **kwargs):
+        repo = EmbeddedRepository(model, self.data_dir, **kwargs)
+        self.addCleanup(repo.close)
+        return repo
+
+    def make_user(self, email):
+        return User(first_name="A", last_name="B", email=email, password="secret1")
+
+    def test_objects_survive_reopening(self):
+        """Records, timestamps and index files are read back after close"""
+        users = self.open(User, unique=("email",))
+        user = self.make_user("a@example.com")
+        users.add(user)
+        users.update(user.id, {"first_name": "Ann"})
+        users.close()
+
+        users = self.open(User, unique=("email",))
+        loaded = users.get_by_attribute("email", "a@example.com")
+        self.assertEqual((loaded.id, loaded.first_name), (user.id, "Ann"))
+        self.assertEqual(loaded.created_at, user.created_at)
+        self.assertTrue(loaded.verify_password("secret1"))
+        self.assertNotIn(loaded, db.session)
+
+    def test_unique_index_file(self):
+        users = self.open(User, unique=("email",))
+        users.add(self.make_user("a@example.com"))
+        other = self.make_user("b@example.com")
+        users.add(other)
+        with self.assertRaises(ValueError):
+            users.add(self.make_user("a@example.com"))
+        with self.assertRaises(ValueError):
+            users.update(other.id, {"email": "a@example.com"})
+        self.assertEqual(users.get(other.id).email, "b@example.com")
+
+    def test_owner_index_follows_deletes(self):
+        places = self.open(Place, indexed=("owner_id",))
+        kept = Place(title="Loft", price=80.0, owner_id="owner-1")
+        gone = Place(title="Barn", price=40.0, owner_id="owner-1")
+        places.add_many([kept, gone])
+        places.delete(gone.id)
+        self.assertEqual([p.id for p in places.find({"owner_id": "owner-1"})],
+                         [kept.id])
+
+    def test_compact_drops_garbage(self):
+        """Overwritten records are reclaimed and the rest stays readable"""
+        places = self.open(Place)
+        place = Place(title="Loft", price=80.0, owner_id="owner-1")
+        places.add(place)
+        for price in range(50):
+            places.update(place.id, {"price": float(price)})
+        path = os.path.join(self.data_dir, "places", "records.dat")
+        before = os.path.getsize(path)
+        places.compact()
+        self.assertLess(os.path.getsize(path), before / 10)
+        self.assertEqual(places.get(place.id).price, 49.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
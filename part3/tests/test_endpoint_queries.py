@@ -0,0 +1,191 @@
+"""Query budget of each API endpoint
+
+Relationships are lazy and every read names a loading profile, so the
+number of statements an endpoint runs does not depend on how much data
+hangs off the rows it returns. These tests pin that number per endpoint.
+"""
+import unittest
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.services.facade import HBnBFacade
+
+
+class TestEndpointQueryCounts(unittest.TestCase):
+    """Each endpoint issues a fixed number of SQL statements"""
+
+    PLACES = 3
+
+    def setUp(self):
+        """Seed an owner, a guest, places with amenities and reviews"""
+        self.app = create_app("config.TestingConfig")
+        self.client = self.app.test_client()
+        facade = HBnBFacade()
+        with self.app.app_context():
+            db.create_all()
+            self.engine = db.engine
+            owner = facade.create_user({"first_name": "O", "last_name": "W",
+                                        "email": "owner@example.com",
+                                        "password": "secret1"})
+            guest = facade.create_user({"first_name": "G", "last_name": "U",
+                                        "email": "guest@example.com",
+                                        "password": "secret1"})
+            amenities = [facade.create_amenity({"name": name})
+                         for name in ("Wifi", "Pool")]
+            places = []
+            for i in range(self.PLACES):
+                place = facade.create_place({"title": f"Place {i}", "price": 50.0,
+                                             "latitude": 1.0, "longitude": 2.0,
+                                             "owner_id": owner.id})
+                place.amenities.extend(amenities)
+                places.append(place)
+            db.session.commit()
+            reviews = [facade.create_review({"text": "Nice", "rating": 4,
+                                             "user_id": guest.id,
+                                             "place_id": place.id})
+                       for place in places]
+            self.owner_id, self.guest_id = owner.id, guest.id
+            self.place_id, self.amenity_id = places[0].id, amenities[0].id
+            self.review_id = reviews[0].id
+            self.owner_auth = self.bearer(owner.id)
+            self.guest_auth = self.bearer(guest.id)
+            self.admin_auth = self.bearer(owner.id, is_admin=True)
+            db.session.remove()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    @staticmethod
+    def bearer(user_id, is_admin=False):
+        token = create_access_token(identity=user_id,
+                                    additional_claims={"is_admin": is_admin})
+        return {"Authorization": f"Bearer {token}"}
+
+    def count(self, method, url, **kwargs):
+        """Run one request; return ``(response, statements issued)``"""
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(self.engine, "before_cursor_execute", record)
+        try:
+            response = getattr(self.client, method)(url, **kwargs)
+        finally:
+            event.remove(self.engine, "before_cursor_execute", record)
+        self.assertLess(response.status_code, 400, response.get_data(as_text=True))
+        return response, len(statements)
+
+    def assertQueries(self, expected, method, url, **kwargs):
+        _, queries = self.count(method, url, **kwargs)
+        self.assertEqual(queries, expected, f"{method.upper()} {url}")
+
+    # -------- reads --------
+    def test_list_endpoints(self):
+        """A page is one SELECT, whatever the rows are linked to"""
+        self.assertQueries(1, "get", "/api/v1/users/")
+        self.assertQueries(1, "get", "/api/v1/places/")
+        self.assertQueries(1, "get", "/api/v1/amenities/")
+        self.assertQueries(1, "get", "/api/v1/reviews/")
+        self.assertQueries(1, "get", f"/api/v1/places/?ids={self.place_id}")
+
+    def test_detail_endpoints(self):
+        self.assertQueries(1, "get", f"/api/v1/users/{self.owner_id}")
+        self.assertQueries(1, "get", f"/api/v1/amenities/{self.amenity_id}")
+        self.assertQueries(1, "get", f"/api/v1/reviews/{self.review_id}")
+        # place + owner (joined), amenities (selectin), first page of reviews
+        self.assertQueries(3, "get", f"/api/v1/places/{self.place_id}")
+        # existence check, one page
+        self.assertQueries(2, "get",
+                           f"/api/v1/reviews/places/{self.place_id}/reviews")
+
+    def test_detail_payload_is_complete(self):
+        response, _ = self.count("get", f"/api/v1/places/{self.place_id}")
+        body = response.get_json()
+        self.assertEqual(body["owner"]["id"], self.owner_id)
+        self.assertEqual(len(body["amenities"]), 2)
+        self.assertEqual(body["reviews"][0]["user_id"], self.guest_id)
+        self.assertEqual((body["review_count"], body["rating_avg"]), (1, 4.0))
+
+    def test_ratings_are_listed_without_reviews(self):
+        """Aggregates come from the places row: one SELECT, no reviews"""
+        response, queries = self.count("get", "/api/v1/places/?min_rating=4")
+        items = response.get_json()
+        self.assertEqual(queries, 1)
+        self.assertEqual(len(items), self.PLACES)
+        self.assertEqual({(i["review_count"], i["rating_avg"]) for i in items},
+                         {(1, 4.0)})
+
+    def test_list_does_not_load_relationships(self):
+        """Amenities linked to every place still cost a single SELECT"""
+        with self.app.app_context():
+            HBnBFacade().create_amenities([{"name": f"Extra {i}"} for i in range(5)])
+            self.assertEqual(Amenity.query.count(), 7)
+        self.assertQueries(1, "get", "/api/v1/amenities/")
+
+    def test_review_count_does_not_change_writes(self):
+        """Adding a review costs the same with 1 or 50 existing reviews"""
+        with self.app.app_context():
+            HBnBFacade().create_users([
+                {"first_name": "R", "last_name": str(i), "password": "secret1",
+                 "email": f"r{i}@example.com"} for i in range(49)
+            ])
+            users = HBnBFacade().iter_users()
+            HBnBFacade().create_reviews([
+                {"text": "Ok", "rating": 3, "user_id": user.id,
+                 "place_id": self.place_id}
+                for user in users if user.id not in (self.owner_id, self.guest_id)
+            ])
+            self.assertEqual(HBnBFacade().count_place_reviews(self.place_id), 50)
+        self.assertQueries(6, "post", "/api/v1/reviews/",
+                           json={"text": "Again", "rating": 3,
+                                 "place_id": self.place_id},
+                           headers=self.admin_auth)
+
+    def test_login(self):
+        """Login reads the credential columns of one user, nothing else"""
+        self.assertQueries(1, "post", "/api/v1/auth/login",
+                           json={"email": "guest@example.com",
+                                 "password": "secret1"})
+
+    # -------- writes --------
+    def test_create_endpoints(self):
+        self.assertQueries(2, "post", "/api/v1/users/",
+                           json={"first_name": "N", "last_name": "U",
+                                 "email": "new@example.com", "password": "secret1"})
+        self.assertQueries(1, "post", "/api/v1/amenities/",
+                           json={"name": "Spa"}, headers=self.admin_auth)
+        # owner, INSERT: owner.places is write-only and never loaded
+        self.assertQueries(2, "post", "/api/v1/places/",
+                           json={"title": "New", "price": 10.0, "latitude": 1.0,
+                                 "longitude": 2.0}, headers=self.owner_auth)
+        # owner_id column, user and place existence, duplicate check, INSERT,
+        # rating aggregates UPDATE
+        self.assertQueries(6, "post", "/api/v1/reviews/",
+                           json={"text": "Again", "rating": 3,
+                                 "place_id": self.place_id},
+                           headers=self.admin_auth)
+
+    def test_update_endpoints(self):
+        self.assertQueries(2, "put", f"/api/v1/users/{self.guest_id}",
+                           json={"first_name": "Renamed"}, headers=self.guest_auth)
+        self.assertQueries(3, "put", f"/api/v1/places/{self.place_id}",
+                           json={"title": "Renamed"}, headers=self.owner_auth)
+        self.assertQueries(2, "put", f"/api/v1/reviews/{self.review_id}",
+                           json={"text": "Great"}, headers=self.guest_auth)
+        self.assertQueries(2, "put", f"/api/v1/amenities/{self.amenity_id}",
+                           json={"name": "Fast Wifi"}, headers=self.admin_auth)
+
+    def test_delete_review(self):
+        # review, DELETE, rating aggregates UPDATE: neither the place nor
+        # place.reviews is loaded
+        self.assertQueries(3, "delete", f"/api/v1/reviews/{self.review_id}",
+                           headers=self.guest_auth)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,466 @@
+"""Tests for the HBnBFacade service layer"""
+import unittest
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, text
+
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.persistence.cached_repository import CachedRepository
+from app.persistence.sqlalchemy_repository import SQLAlchemyRepository
+from app.persistence.unit_of_work import (
+    commit_count,
+    reset_commit_count,
+    unit_of_work,
+)
+from app.services.facade import HBnBFacade
+from config import TestingConfig
+
+
+class FacadeTestCase(unittest.TestCase):
+    """Base class providing an empty database and a fresh facade"""
+
+    def setUp(self):
+        """Create an application context with empty tables"""
+        self.app = create_app("config.TestingConfig")
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.facade = HBnBFacade()
+
+    def tearDown(self):
+        """Drop every table and leave the application context"""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def make_user(self, email="owner@example.com"):
+        return self.facade.create_user({
+            "first_name": "Owner",
+            "last_name": "User",
+            "email": email,
+            "password": "secret1",
+        })
+
+
+class TestBulkCreate(FacadeTestCase):
+    """Test the batched create_* helpers"""
+
+    def test_create_places_links_owner(self):
+        """Every place in the batch is stored and attached to its owner"""
+        owner = self.make_user()
+        ids = self.facade.create_places([
+            {"title": f"Place {i}", "price": 10.0 + i, "owner_id": owner.id}
+            for i in range(3)
+        ], chunk_size=2)
+        self.assertEqual(len(ids), 3)
+        for place_id in ids:
+            self.assertEqual(self.facade.get_place(place_id).owner_id, owner.id)
+
+    def test_create_places_validates_before_writing(self):
+        """An unknown owner anywhere in the batch writes nothing"""
+        owner = self.make_user()
+        with self.assertRaises(ValueError):
+            self.facade.create_places([
+                {"title": "Good", "price": 10.0, "owner_id": owner.id},
+                {"title": "Bad", "price": 10.0, "owner_id": "missing"},
+            ])
+        self.assertEqual(self.facade.get_all_places(), [])
+
+    def test_create_users_rejects_duplicate_emails(self):
+        """Duplicate emails within the batch are refused"""
+        data = {"first_name": "A", "last_name": "B", "password": "secret1"}
+        with self.assertRaises(ValueError):
+            self.facade.create_users([
+                dict(data, email="dup@example.com"),
+                dict(data, email="DUP@example.com"),
+            ])
+
+
+
+class TestLightweightLookups(FacadeTestCase):
+    """Test the exists/column-based facade helpers"""
+
+    def test_email_exists_is_case_insensitive(self):
+        self.make_user("Someone@Example.com")
+        self.assertTrue(self.facade.email_exists("SOMEONE@example.com"))
+        self.assertFalse(self.facade.email_exists("nobody@example.com"))
+
+    def test_review_helpers(self):
+        """Owner lookup and duplicate-review check work without loading"""
+        owner = self.make_user()
+        guest = self.make_user("guest@example.com")
+        place = self.facade.create_place(
+            {"title": "Loft", "price": 80.0, "owner_id": owner.id}
+        )
+        self.assertEqual(self.facade.get_place_owner_id(place.id), owner.id)
+        self.assertIsNone(self.facade.get_place_owner_id("missing"))
+
+        self.assertFalse(self.facade.has_reviewed(guest.id, place.id))
+        self.facade.create_review({"text": "Nice", "rating": 5,
+                                   "user_id": guest.id, "place_id": place.id})
+        self.assertTrue(self.facade.has_reviewed(guest.id, place.id))
+
+    def test_one_review_per_user_and_place(self):
+        owner = self.make_user()
+        guest = self.make_user("guest@example.com")
+        place = self.facade.create_place(
+            {"title": "Loft", "price": 80.0, "owner_id": owner.id}
+        )
+        review = {"text": "Nice", "rating": 5,
+                  "user_id": guest.id, "place_id": place.id}
+        self.facade.create_review(dict(review))
+        with self.assertRaises(ValueError):
+            self.facade.create_review(dict(review))
+        with self.assertRaises(ValueError):
+            self.facade.create_reviews([review])
+        with self.assertRaises(ValueError):
+            self.facade.create_reviews([dict(review, user_id=owner.id)] * 2)
+        self.assertEqual(self.facade.count_place_reviews(place.id), 1)
+
+    def test_create_review_unknown_place(self):
+        guest = self.make_user("guest@example.com")
+        with self.assertRaises(ValueError):
+            self.facade.create_review({"text": "Nice", "rating": 5,
+                                       "user_id": guest.id, "place_id": "nope"})
+
+
+class TestWriteOnlyCollections(FacadeTestCase):
+    """Test the write-only user/place/amenity collections"""
+
+    def setUp(self):
+        super().setUp()
+        self.owner = self.make_user()
+        self.guest = self.make_user("guest@example.com")
+        self.place = self.facade.create_place(
+            {"title": "Loft", "price": 80.0, "owner_id": self.owner.id}
+        )
+
+    def test_reviews_are_counted_and_paged_in_sql(self):
+        guests = [self.guest] + [self.make_user(f"guest{i}@example.com")
+                                 for i in range(4)]
+        ids = self.facade.create_reviews([
+            {"text": f"Review {i}", "rating": 4, "user_id": guest.id,
+             "place_id": self.place.id} for i, guest in enumerate(guests)
+        ])
+        self.assertEqual(self.facade.count_place_reviews(self.place.id), 5)
+        page, cursor = self.facade.get_place_reviews_page(self.place.id, limit=2)
+        self.assertEqual(len(page), 2)
+        rest, _ = self.facade.get_place_reviews_page(self.place.id, cursor, limit=10)
+        self.assertEqual(sorted(r.id for r in page + rest), sorted(ids))
+
+    def test_add_review_links_the_place(self):
+        review = Review(text="Nice", rating=5, user_id=self.guest.id)
+        with unit_of_work():
+            self.place.add_review(review)
+        self.assertEqual(review.place_id, self.place.id)
+        self.assertEqual(db.session.scalars(self.place.reviews.select()).all(),
+                         [review])
+
+    def test_deleting_a_place_cascades_in_the_database(self):
+        """passive_deletes: ON DELETE CASCADE removes the reviews"""
+        self.facade.create_review({"text": "Nice", "rating": 5,
+                                   "user_id": self.guest.id,
+                                   "place_id": self.place.id})
+        self.facade.place_repo.delete(self.place.id)
+        self.assertEqual(self.facade.review_repo.count(), 0)
+
+
+class TestRatingAggregates(FacadeTestCase):
+    """Test the review_count / rating_sum / rating_avg columns of places"""
+
+    def setUp(self):
+        super().setUp()
+        owner = self.make_user()
+        self.guests = [self.make_user(f"guest{i}@example.com").id
+                       for i in range(3)]
+        self.place_id = self.facade.create_place(
+            {"title": "Loft", "price": 80.0, "owner_id": owner.id}
+        ).id
+
+    def ratings(self):
+        db.session.remove()
+        row = self.facade.place_repo.get_columns(
+            self.place_id, *Place.RATING_FIELDS)
+        return tuple(row.values())
+
+    def review(self, guest_id, rating):
+        return self.facade.create_review({"text": "Ok", "rating": rating,
+                                          "user_id": guest_id,
+                                          "place_id": self.place_id})
+
+    def test_review_writes_keep_the_aggregates(self):
+        self.assertEqual(self.ratings(), (0, 0, None))
+        first_id = self.review(self.guests[0], 5).id
+        self.review(self.guests[1], 2)
+        self.assertEqual(self.ratings(), (2, 7, 3.5))
+        self.facade.update_review(first_id, {"rating": 3})
+        self.assertEqual(self.ratings(), (2, 5, 2.5))
+        self.facade.delete_review(first_id)
+        self.assertEqual(self.ratings(), (1, 2, 2.0))
+
+    def test_batch_and_rollback(self):
+        self.facade.create_reviews([
+            {"text": "Ok", "rating": rating, "user_id": guest_id,
+             "place_id": self.place_id}
+            for guest_id, rating in zip(self.guests, (4, 5, 3))
+        ])
+        self.assertEqual(self.ratings(), (3, 12, 4.0))
+        with self.assertRaises(ValueError):
+            self.review(self.guests[0], 1)
+        self.assertEqual(self.ratings(), (3, 12, 4.0))
+
+    def concurrent_review(self, rating):
+        """Add a review's totals the way another worker would"""
+        with db.engine.begin() as conn:
+            conn.execute(text(
+                "UPDATE places SET review_count = review_count + 1, "
+                "rating_sum = rating_sum + :rating WHERE id = :id"
+            ), {"rating": rating, "id": self.place_id})
+
+    def test_stale_session_object(self):
+        """A place loaded before another worker's write is not written back"""
+        place = self.facade.get_place(self.place_id)
+        self.assertEqual(place.review_count, 0)
+        self.concurrent_review(5)
+        self.review(self.guests[0], 3)
+        self.assertEqual(place.review_count, 2)
+        self.assertEqual(self.ratings(), (2, 8, 4.0))
+
+    def test_stale_cached_place(self):
+        """A cached place is invalidated, not used as the base of the update"""
+        self.app.config["REPOSITORY_CACHE_ENTITIES"] = {"places"}
+        self.facade.get_place(self.place_id)
+        db.session.remove()
+        self.concurrent_review(5)
+        self.review(self.guests[0], 3)
+        self.assertEqual(self.ratings(), (2, 8, 4.0))
+        db.session.remove()
+        self.assertEqual(self.facade.get_place(self.place_id).rating_sum, 8)
+
+    def test_payload_cannot_set_aggregates(self):
+        self.facade.update_place(self.place_id, {"review_count": 99,
+                                                 "rating_avg": 5.0})
+        self.assertEqual(self.ratings(), (0, 0, None))
+
+    def test_repair_recomputes_in_sql(self):
+        self.review(self.guests[0], 4)
+        self.review(self.guests[1], 2)
+        db.session.execute(text(
+            "UPDATE places SET review_count = 7, rating_sum = 1, rating_avg = NULL"
+        ))
+        db.session.commit()
+        self.assertEqual(self.facade.repair_place_ratings(), 1)
+        self.assertEqual(self.ratings(), (2, 6, 3.0))
+        self.assertEqual(self.facade.repair_place_ratings(), 0)
+
+    def test_repair_stale_average(self):
+        """A wrong rating_avg is drift even when count and sum are right"""
+        self.review(self.guests[0], 4)
+        self.review(self.guests[1], 3)
+        db.session.execute(text("UPDATE places SET rating_avg = 1.0"))
+        db.session.commit()
+        self.assertEqual(self.facade.repair_place_ratings(), 1)
+        self.assertEqual(self.ratings(), (2, 7, 3.5))
+        self.assertEqual(self.facade.repair_place_ratings(), 0)
+
+    def test_repair_without_sql(self):
+        """The memory backend repairs by scanning its stored reviews"""
+        class MemoryConfig(TestingConfig):
+            REPOSITORY_BACKEND = "memory"
+
+        with create_app(MemoryConfig).app_context():
+            facade = HBnBFacade()
+            owner = facade.create_user({"first_name": "A", "last_name": "B",
+                                        "email": "a@example.com",
+                                        "password": "secret1"})
+            guest = facade.create_user({"first_name": "C", "last_name": "D",
+                                        "email": "c@example.com",
+                                        "password": "secret1"})
+            place = facade.create_place(
+                {"title": "Loft", "price": 80.0, "owner_id": owner.id})
+            facade.create_review({"text": "Ok", "rating": 4,
+                                  "user_id": guest.id, "place_id": place.id})
+            facade.place_repo.update(place.id, {"rating_avg": 1.0})
+            self.assertEqual(facade.repair_place_ratings(), 1)
+            self.assertEqual(facade.get_place(place.id).rating_avg, 4.0)
+            self.assertEqual(facade.repair_place_ratings(), 0)
+
+
+class TestUnitOfWork(FacadeTestCase):
+    """Test that facade writes are grouped into single commits"""
+
+    def test_create_place_commits_once(self):
+        """add + owner.add_place share one commit"""
+        owner = self.make_user()
+        reset_commit_count()
+        self.facade.create_place(
+            {"title": "Loft", "price": 80.0, "owner_id": owner.id}
+        )
+        self.assertEqual(commit_count(), 1)
+
+    def test_update_place_is_committed(self):
+        """update_place persists without an explicit repository commit"""
+        owner = self.make_user()
+        place = self.facade.create_place(
+            {"title": "Loft", "price": 80.0, "owner_id": owner.id}
+        )
+        reset_commit_count()
+        self.facade.update_place(place.id, {"title": "Attic"})
+        self.assertEqual(commit_count(), 1)
+        db.session.rollback()
+        self.assertEqual(self.facade.get_place(place.id).title, "Attic")
+
+    def test_savepoint_rolls_back_only_inner_block(self):
+        """A failing savepoint keeps the outer unit's writes"""
+        reset_commit_count()
+        with unit_of_work():
+            self.facade.create_amenity({"name": "Wi-Fi"})
+            with self.assertRaises(RuntimeError):
+                with unit_of_work(savepoint=True):
+                    self.facade.create_amenity({"name": "Pool"})
+                    raise RuntimeError("boom")
+        self.assertEqual(commit_count(), 1)
+        names = [a.name for a in self.facade.get_all_amenities()]
+        self.assertEqual(names, ["Wi-Fi"])
+
+    def test_request_commits_once(self):
+        """A POST request costs exactly one commit, issued at the end"""
+        owner = self.make_user()
+        token = create_access_token(identity=owner.id)
+        reset_commit_count()
+        response = self.app.test_client().post(
+            "/api/v1/places/",
+            json={"title": "Loft", "price": 80.0,
+                  "latitude": 1.0, "longitude": 2.0},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(commit_count(), 1)
+
+    def test_error_response_rolls_back(self):
+        """Writes made before an error response are discarded"""
+        @self.app.route("/fail")
+        def fail():
+            db.session.add(Amenity(name="Ghost"))
+            return {"error": "nope"}, 400
+
+        response = self.app.test_client().get("/fail")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.facade.get_all_amenities(), [])
+
+
+
+class TestCachedRepository(FacadeTestCase):
+    """Test the read-through place cache"""
+
+    def setUp(self):
+        super().setUp()
+        self.app.config["REPOSITORY_CACHE_ENTITIES"] = {"places"}
+        owner = self.make_user()
+        self.owner_id, self.owner_email = owner.id, owner.email
+        self.place_id = self.facade.create_place(
+            {"title": "Loft", "price": 80.0, "owner_id": owner.id}
+        ).id
+        self.end_request()
+
+    def end_request(self):
+        """Mimic request teardown: the session and its objects go away"""
+        db.session.remove()
+
+    def count_queries(self, func):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            result = func()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+        return result, len(statements)
+
+    def test_second_read_is_served_from_memory(self):
+        """A cache hit issues no SQL, relationships included"""
+        self.facade.get_place(self.place_id)
+        self.end_request()
+
+        def read():
+            place = self.facade.get_place(self.place_id)
+            return place.owner.email, [a.id for a in place.amenities]
+        (email, reviews), queries = self.count_queries(read)
+        self.assertEqual((email, reviews, queries), (self.owner_email, [], 0))
+        stats = self.facade.place_repo.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_commit_invalidates(self):
+        """Updates and child inserts are visible on the next read"""
+        self.facade.get_place(self.place_id)
+        self.end_request()
+        self.facade.update_place(self.place_id, {"title": "Attic"})
+        self.end_request()
+        self.assertEqual(self.facade.get_place(self.place_id).title, "Attic")
+        self.end_request()
+
+        guest = self.make_user("guest@example.com")
+        self.facade.create_review({"text": "Nice", "rating": 5,
+                                   "user_id": guest.id, "place_id": self.place_id})
+        self.end_request()
+        # The new review evicted its place (many-to-one parent) on commit
+        self.assertEqual(self.facade.place_repo.stats()["invalidations"], 2)
+        self.assertEqual(self.facade.count_place_reviews(self.place_id), 1)
+
+    def test_embedded_objects_invalidate_their_places(self):
+        """Renaming the owner or an amenity evicts places that show them"""
+        amenity = self.facade.create_amenity({"name": "Wifi"})
+        amenity_id = amenity.id
+        place = self.facade.get_place(self.place_id)
+        place.amenities.append(amenity)
+        db.session.commit()
+        self.end_request()
+        self.facade.get_place(self.place_id)  # cached with owner + amenities
+        self.end_request()
+
+        self.facade.update_user(self.owner_id, {"first_name": "Renamed"})
+        self.end_request()
+        place = self.facade.get_place(self.place_id)
+        self.assertEqual(place.owner.first_name, "Renamed")
+        self.end_request()
+
+        self.facade.update_amenity(amenity_id, {"name": "Fast Wifi"})
+        self.end_request()
+        place = self.facade.get_place(self.place_id)
+        self.assertEqual([a.name for a in place.amenities], ["Fast Wifi"])
+        stats = self.facade.place_repo.stats()
+        self.assertEqual((stats["invalidations"], stats["misses"]), (3, 4))
+
+    def test_lru_and_ttl_eviction(self):
+        """Entries beyond max_entries or past their TTL are evicted"""
+        now = [0.0]
+        cache = CachedRepository(SQLAlchemyRepository(Place), max_entries=1,
+                                 ttl=10, clock=lambda: now[0])
+        other_id = self.facade.create_place(
+            {"title": "Barn", "price": 40.0, "owner_id": self.owner_id}
+        ).id
+        self.end_request()
+        cache.get(self.place_id)
+        cache.get(other_id)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.end_request()
+        now[0] = 11
+        cache.get(other_id)
+        self.assertEqual(cache.stats()["evictions"], 2)
+        self.assertEqual(cache.stats()["hits"], 0)
+
+    def test_disabled_entity_passes_through(self):
+        self.app.config["REPOSITORY_CACHE_ENTITIES"] = set()
+        self.facade.get_place(self.place_id)
+        self.end_request()
+        self.facade.get_place(self.place_id)
+        self.assertEqual(self.facade.place_repo.stats()["misses"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,256 @@
+"""Tests for the write-through HybridRepository"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from sqlalchemy import event, insert, select
+
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.persistence.hybrid_repository import HybridRepository, change_log
+from app.services.facade import HBnBFacade
+from config import TestingConfig
+
+
+class Worker:
+    """One app (= one worker process) on the shared database file"""
+
+    def __init__(self, path):
+        class HybridConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+            REPOSITORY_BACKEND = "hybrid"
+
+        self.app = create_app(HybridConfig)
+        with self.app.app_context():
+            db.create_all()
+        self.now = [0.0]
+
+    def repo(self):
+        """The worker's amenity repository, with a controllable clock"""
+        return HybridRepository(Amenity, poll_interval=1.0,
+                                clock=lambda: self.now[0])
+
+
+class TestHybridRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "hbnb.db")
+        self.worker = Worker(self.path)
+        self.ctx = self.worker.app.app_context()
+        self.ctx.push()
+        self.repo = self.worker.repo()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+        with self.worker.app.app_context():
+            db.engine.dispose()
+        shutil.rmtree(self.tmp)
+
+    def settle(self):
+        """Warm the working set and apply the catch-up poll that follows"""
+        self.repo.get_all()
+        self.repo.get_all()
+        db.session.remove()
+
+    def count_queries(self, func):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            result = func()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+        return result, len(statements)
+
+    def test_reads_come_from_memory(self):
+        """After warming, list and lookup reads issue no SQL"""
+        self.repo.add(Amenity(name="Wifi"))
+        self.settle()
+        found, queries = self.count_queries(lambda: (
+            self.repo.find({"name": "Wifi"}),
+            self.repo.count(),
+            self.repo.get_page(limit=10),
+        ))
+        self.assertEqual(queries, 0)
+        self.assertEqual(found[1], 1)
+
+    def test_local_writes_are_visible_after_commit(self):
+        self.settle()
+        wifi = Amenity(name="Wifi")
+        wifi_id = wifi.id
+        self.repo.add(wifi)
+        self.repo.update(wifi_id, {"name": "Fast Wifi"})
+        db.session.remove()
+        self.assertEqual(self.repo.get(wifi_id).name, "Fast Wifi")
+        self.repo.delete(wifi_id)
+        db.session.remove()
+        self.assertEqual(self.repo.count(), 0)
+
+    def test_pending_writes_bypass_the_working_set(self):
+        """Inside a transaction that wrote, reads see the uncommitted rows"""
+        self.repo.get_all()
+        db.session.add(Amenity(name="Pool"))
+        self.assertEqual([a.name for a in self.repo.get_all()], ["Pool"])
+        db.session.rollback()
+        self.assertEqual(len(self.repo.get_all()), 0)
+
+    def test_bulk_writes_log_each_row_once(self):
+        """Flushed bulk writes are logged by the flush hook alone"""
+        ids = self.repo.add_many([Amenity(name=f"Amenity {i}") for i in range(3)])
+        self.repo.update_many({ids[0]: {"name": "Renamed"}})
+        self.repo.delete_many(ids[1:])
+        logged = db.session.execute(
+            select(change_log.c.obj_id, change_log.c.deleted)
+        ).all()
+        expected = [(str(obj_id), False) for obj_id in ids]
+        expected += [(str(ids[0]), False)]
+        expected += [(str(obj_id), True) for obj_id in ids[1:]]
+        self.assertEqual(sorted((obj_id, deleted) for obj_id, deleted in logged),
+                         sorted(expected))
+
+    def test_list_reads_are_attached(self):
+        """Every read hands out session objects, never the shared snapshots"""
+        self.repo.add(Amenity(name="Wifi"))
+        self.settle()
+        first = self.repo.find()[0]
+        self.assertIn(first, db.session)
+        self.assertIs(self.repo.get_all()[0], first)
+        self.assertIs(self.repo.get_page(limit=5)[0][0], first)
+        self.assertIs(next(iter(self.repo.iter_all())), first)
+        db.session.remove()
+        self.assertIsNot(self.repo.find()[0], first)
+
+    def test_reads_wait_for_a_running_refresh(self):
+        """A read never sees the working set halfway through a refresh"""
+        wifi, pool = Amenity(name="Wifi"), Amenity(name="Pool")
+        wifi_id = wifi.id
+        self.repo.add_many([wifi, pool])
+        self.settle()
+        with db.engine.begin() as conn:
+            conn.execute(insert(change_log).values(
+                entity="amenities", obj_id=wifi_id, deleted=True))
+
+        entered, release = threading.Event(), threading.Event()
+        memory = self.repo._memory
+        delete = memory.delete
+
+        def slow_delete(obj_id):
+            entered.set()
+            release.wait(5)
+            delete(obj_id)
+        memory.delete = slow_delete
+
+        def refresh():
+            with self.worker.app.app_context():
+                self.repo.refresh()
+                db.session.remove()
+
+        counts = []
+        refresher = threading.Thread(target=refresh)
+        reader = threading.Thread(
+            target=lambda: counts.append(len(self.repo._read("find", None))))
+        refresher.start()
+        self.assertTrue(entered.wait(5))
+        reader.start()
+        reader.join(0.1)
+        self.assertTrue(reader.is_alive())  # blocked on the refresh
+        release.set()
+        refresher.join()
+        reader.join()
+        self.assertEqual(counts, [1])
+
+    def test_other_workers_catch_up_by_polling(self):
+        """A write on another worker shows up once the poll interval passes"""
+        self.settle()
+
+        other = Worker(self.path)
+        with other.app.app_context():
+            HBnBFacade().create_amenity({"name": "Sauna"})
+            db.session.remove()
+            db.engine.dispose()
+
+        self.worker.now[0] = 0.5
+        self.assertEqual(self.repo.count(), 0)  # still within the interval
+        self.worker.now[0] = 2.0
+        self.assertEqual([a.name for a in self.repo.get_all()], ["Sauna"])
+
+    def test_late_committing_sequence_is_not_missed(self):
+        """A lower seq committed after a higher one is picked up later"""
+        self.settle()
+        early, late = Amenity(name="Early"), Amenity(name="Late")
+        early_id, late_id = early.id, late.id
+        db.session.add_all([early, late])
+        db.session.commit()
+        db.session.remove()
+        self.assertEqual(self.repo.count(), 2)
+
+        # seq N+2 arrives before N+1: N+1 is remembered as a hole
+        last = self.repo.stats()["last_seq"]
+        with db.engine.begin() as conn:
+            conn.execute(insert(change_log).values(
+                seq=last + 2, entity="amenities", obj_id=late_id, deleted=True))
+        self.repo.refresh()
+        with db.engine.begin() as conn:
+            conn.execute(insert(change_log).values(
+                seq=last + 1, entity="amenities", obj_id=early_id, deleted=True))
+        self.repo.refresh()
+        self.assertEqual(self.repo.count(), 0)
+
+
+class TestHybridFacade(unittest.TestCase):
+    """Working sets of related entities through the facade"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.worker = Worker(os.path.join(self.tmp, "hbnb.db"))
+        self.ctx = self.worker.app.app_context()
+        self.ctx.push()
+        self.facade = HBnBFacade()
+        owner = self.facade.create_user({"first_name": "Olive", "last_name": "W",
+                                         "email": "owner@example.com",
+                                         "password": "secret1"})
+        guest = self.facade.create_user({"first_name": "Gus", "last_name": "U",
+                                         "email": "guest@example.com",
+                                         "password": "secret1"})
+        place = self.facade.create_place({"title": "Loft", "price": 80.0,
+                                          "owner_id": owner.id})
+        self.facade.create_review({"text": "Nice", "rating": 5,
+                                   "user_id": guest.id, "place_id": place.id})
+        self.owner_id, self.place_id = owner.id, place.id
+        db.session.remove()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
+        with self.worker.app.app_context():
+            db.engine.dispose()
+        shutil.rmtree(self.tmp)
+
+    def test_database_cascades_leave_the_working_set(self):
+        """Reviews deleted by ON DELETE CASCADE are dropped, transitively"""
+        self.assertEqual(len(self.facade.get_all_reviews()), 1)
+        db.session.remove()
+        self.facade.user_repo.delete(self.owner_id)  # -> places -> reviews
+        db.session.remove()
+        self.assertEqual(self.facade.get_all_reviews(), [])
+        self.assertEqual(self.facade.get_all_places(), [])
+
+    def test_embedded_owner_is_reloaded(self):
+        """Renaming an owner refreshes the places that embed it"""
+        self.assertEqual(self.facade.get_place(self.place_id).owner.first_name,
+                         "Olive")
+        db.session.remove()
+        self.facade.update_user(self.owner_id, {"first_name": "Olivia"})
+        db.session.remove()
+        self.assertEqual(self.facade.get_place(self.place_id).owner.first_name,
+                         "Olivia")
+
+
+if __name__ == "__main__":
+    unittest.main()
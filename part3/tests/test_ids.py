@@ -0,0 +1,103 @@
+"""Tests for the id strategies and BINARY(16) id storage"""
+import unittest
+import uuid
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.models.ids import decode_ulid, encode_ulid, ulid_id, uuid7_id
+from app.services.facade import HBnBFacade
+from config import TestingConfig
+
+
+class TestIdGenerators(unittest.TestCase):
+    """Test the time-ordered generators"""
+
+    def test_uuid7_layout_and_order(self):
+        ids = [uuid7_id() for _ in range(2000)]
+        parsed = uuid.UUID(ids[0])
+        self.assertEqual((parsed.version, parsed.variant), (7, uuid.RFC_4122))
+        self.assertEqual(sorted(ids), ids)
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_ulid_round_trip_and_order(self):
+        ids = [ulid_id() for _ in range(2000)]
+        self.assertEqual(len(ids[0]), 26)
+        self.assertEqual(sorted(ids), ids)
+        self.assertEqual(encode_ulid(decode_ulid(ids[0].lower())), ids[0])
+        with self.assertRaises(ValueError):
+            decode_ulid("not-a-ulid")
+
+    def test_unknown_strategy_fails_fast(self):
+        class BadConfig(TestingConfig):
+            ID_STRATEGY = "uuid1"
+
+        with self.assertRaises(ValueError):
+            create_app(BadConfig)
+
+
+class BinaryIdsTestCase(unittest.TestCase):
+    """Facade round trips with ids stored as BINARY(16)"""
+
+    strategy = "uuid7"
+
+    def setUp(self):
+        config = type("BinaryConfig", (TestingConfig,),
+                      {"ID_BINARY": True, "ID_STRATEGY": self.strategy})
+        self.app = create_app(config)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.facade = HBnBFacade()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_round_trip(self):
+        owner = self.facade.create_user({"first_name": "O", "last_name": "W",
+                                         "email": "o@example.com",
+                                         "password": "secret1"})
+        place = self.facade.create_place({"title": "Loft", "price": 80.0,
+                                          "owner_id": owner.id})
+        review = self.facade.create_review({"text": "Nice", "rating": 5,
+                                            "user_id": owner.id,
+                                            "place_id": place.id})
+        ids = (owner.id, place.id, review.id)
+        db.session.remove()
+
+        stored = db.session.execute(
+            text("SELECT length(id), length(owner_id) FROM places")
+        ).one()
+        self.assertEqual(tuple(stored), (16, 16))
+        self.assertEqual(self.facade.get_place(ids[1]).owner.id, ids[0])
+        self.assertEqual(self.facade.get_place_owner_id(ids[1]), ids[0])
+        page, _ = self.facade.get_place_reviews_page(ids[1])
+        self.assertEqual([r.id for r in page], [ids[2]])
+        self.assertIsNone(self.facade.get_place("missing"))
+        self.assertEqual(self.facade.get_users_by_ids([ids[0], "missing"]),
+                         ([self.facade.get_user(ids[0])], ["missing"]))
+
+    def test_same_timestamp_pages_in_creation_order(self):
+        """Ties on created_at are broken by the id: insertion order"""
+        now = datetime.utcnow()
+        amenities = [Amenity(name=f"Amenity {i}", created_at=now) for i in range(5)]
+        self.facade.amenity_repo.add_many(amenities)
+        names, cursor = [], None
+        while True:
+            page, cursor = self.facade.get_amenities_page(cursor, limit=2)
+            names.extend(a.name for a in page)
+            if cursor is None:
+                break
+        self.assertEqual(names, [a.name for a in amenities])
+
+
+class TestBinaryUlids(BinaryIdsTestCase):
+    strategy = "ulid"
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""Tests for the connection-pool settings and telemetry"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app import create_app
+from app.persistence.pool_metrics import PoolMetrics, pool_metrics
+from config import engine_options_from_env
+
+
+class TestEngineOptions(unittest.TestCase):
+
+    def test_defaults(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            options = engine_options_from_env()
+        self.assertEqual(options["pool_size"], 10)
+        self.assertEqual(options["max_overflow"], 20)
+        self.assertTrue(options["pool_pre_ping"])
+
+    def test_environment_overrides(self):
+        env = {"DB_POOL_SIZE": "4", "DB_MAX_OVERFLOW": "2",
+               "DB_POOL_RECYCLE": "300", "DB_POOL_TIMEOUT": "2.5",
+               "DB_POOL_PRE_PING": "false"}
+        with mock.patch.dict(os.environ, env, clear=True):
+            self.assertEqual(engine_options_from_env(), {
+                "pool_size": 4, "max_overflow": 2, "pool_timeout": 2.5,
+                "pool_recycle": 300, "pool_pre_ping": False,
+            })
+
+
+class TestPoolMetrics(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.engine = create_engine(
+            f"sqlite:///{self.path}", poolclass=QueuePool,
+            pool_size=1, max_overflow=1, pool_timeout=0.05,
+        )
+        self.metrics = PoolMetrics(self.engine, saturation_warning=0.75)
+
+    def tearDown(self):
+        self.engine.dispose()
+        os.remove(self.path)
+
+    def test_counts_checkouts_and_overflow(self):
+        with self.engine.connect() as first:
+            first.execute(text("SELECT 1"))
+            with self.assertLogs("app.persistence.pool_metrics", "WARNING"):
+                second = self.engine.connect()
+            self.assertEqual(self.metrics.in_use, 2)
+            second.close()
+        stats = self.metrics.snapshot()
+        self.assertEqual(stats["capacity"], 2)
+        self.assertEqual(stats["in_use"], 0)
+        self.assertEqual(stats["peak_in_use"], 2)
+        self.assertEqual(stats["checkouts"], 2)
+        self.assertEqual(stats["overflow_connections"], 1)
+        self.assertEqual(stats["saturation_warnings"], 1)
+
+    def test_reused_connections_are_not_overflow(self):
+        """Checkouts that reuse a pooled connection open no overflow"""
+        with self.engine.connect():
+            with self.assertLogs("app.persistence.pool_metrics", "WARNING"):
+                self.engine.connect().close()
+            # The overflow connection went back to the queue: reused below
+            for _ in range(3):
+                with self.engine.connect():
+                    pass
+        stats = self.metrics.snapshot()
+        self.assertEqual(stats["checkouts"], 5)
+        self.assertEqual(stats["overflow_connections"], 1)
+
+    def test_timeout_is_recorded(self):
+        held = [self.engine.connect(), self.engine.connect()]
+        with self.assertRaises(PoolTimeoutError):
+            self.engine.connect()
+        for conn in held:
+            conn.close()
+        self.assertEqual(self.metrics.snapshot()["timeouts"], 1)
+
+    def test_survives_dispose(self):
+        self.engine.dispose()
+        with self.engine.connect():
+            pass
+        self.assertEqual(self.metrics.snapshot()["checkouts"], 1)
+
+
+class TestAppPoolMetrics(unittest.TestCase):
+
+    def test_app_engines_are_instrumented(self):
+        app = create_app("config.TestingConfig")
+        with app.app_context():
+            stats = pool_metrics()
+        self.assertEqual(len(stats), 1)
+        self.assertIn("avg_checkout_ms", stats[0])
+
+    def test_admin_endpoint(self):
+        app = create_app("config.TestingConfig")
+        client = app.test_client()
+        with app.app_context():
+            tokens = {admin: create_access_token(
+                identity="someone", additional_claims={"is_admin": admin})
+                for admin in (True, False)}
+
+        def get(admin):
+            return client.get("/api/v1/metrics/pool", headers={
+                "Authorization": f"Bearer {tokens[admin]}"})
+
+        self.assertEqual(get(False).status_code, 403)
+        response = get(True)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("overflow_connections", response.get_json()[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
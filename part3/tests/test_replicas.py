@@ -0,0 +1,194 @@
+"""Tests for read-replica routing (two SQLite files synced by backup)"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from sqlalchemy import create_engine, event
+
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.persistence.replicas import (
+    ReplicaRouter, heartbeat_table, replica_router,
+)
+from app.services.facade import HBnBFacade
+from config import TestingConfig
+
+
+def sync(source, target):
+    """Copy the whole *source* SQLite file into *target* (backup API)"""
+    src, dst = sqlite3.connect(source), sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+
+
+def count_statements(engine):
+    """Return a list that grows by one per statement run on *engine*"""
+    seen = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda *args: seen.append(args[2]))
+    return seen
+
+
+class ReplicaTestCase(unittest.TestCase):
+    """An app whose primary and two replicas are temporary SQLite files"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.primary = os.path.join(self.tmp, "primary.db")
+        self.replicas = [os.path.join(self.tmp, f"replica{i}.db") for i in (1, 2)]
+
+        class ReplicaConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{self.primary}"
+            DATABASE_REPLICA_URLS = tuple(f"sqlite:///{p}" for p in self.replicas)
+            REPLICA_HEALTH_INTERVAL = 3600
+
+        self.app = create_app(ReplicaConfig)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.router = replica_router()
+        self.router.close()  # after its first probe: tests probe by hand
+        self.sync()
+        self.facade = HBnBFacade()
+
+    def tearDown(self):
+        self.router.close()
+        db.session.remove()
+        db.engine.dispose()
+        for engine in self.router.replicas:
+            engine.dispose()
+        self.ctx.pop()
+        shutil.rmtree(self.tmp)
+
+    def sync(self):
+        for replica in self.replicas:
+            sync(self.primary, replica)
+
+    def end_request(self):
+        """Drop the session, as the app context teardown does"""
+        db.session.remove()
+
+
+class TestReplicaRouting(ReplicaTestCase):
+
+    def test_reads_go_to_replicas_round_robin(self):
+        amenity_id = self.facade.create_amenity({"name": "Wifi"}).id
+        self.end_request()
+        self.sync()
+        first, second = (count_statements(e) for e in self.router.replicas)
+
+        for _ in range(4):
+            self.assertEqual(self.facade.get_amenity(amenity_id).name, "Wifi")
+            self.end_request()
+        gets = [len([s for s in seen if "FROM amenities" in s])
+                for seen in (first, second)]
+        self.assertEqual(gets, [2, 2])
+
+    def test_writes_and_later_reads_use_the_primary(self):
+        """A read after a write in the same request sees the primary"""
+        replica_statements = [count_statements(e) for e in self.router.replicas]
+        amenity = self.facade.create_amenity({"name": "Wifi"})
+        # The replicas have not been synced: only the primary has the row
+        self.assertEqual(self.facade.get_amenity(amenity.id).name, "Wifi")
+        self.assertEqual(sum(map(len, replica_statements)), 0)
+
+    def test_new_request_reads_the_replica(self):
+        """A fresh request is not pinned, so it sees replica state"""
+        amenity_id = self.facade.create_amenity({"name": "Wifi"}).id
+        self.end_request()
+        self.assertIsNone(self.facade.get_amenity(amenity_id))
+        self.end_request()
+        self.sync()
+        self.assertIsNotNone(self.facade.get_amenity(amenity_id))
+
+    def test_without_replicas_everything_uses_the_primary(self):
+        app = create_app("config.TestingConfig")
+        with app.app_context():
+            self.assertIsNone(replica_router())
+
+
+class TestReplicaLagProbe(ReplicaTestCase):
+
+    def make_router(self, now):
+        # Start from no heartbeat, not the one the app's router wrote
+        with db.engine.begin() as conn:
+            heartbeat_table.drop(conn)
+        self.sync()
+        engines = [create_engine(f"sqlite:///{p}") for p in self.replicas]
+        self.addCleanup(lambda: [e.dispose() for e in engines])
+        return ReplicaRouter(db.engine, engines, max_lag=5, interval=3600,
+                             now=lambda: now[0])
+
+    def test_lagging_replica_leaves_rotation(self):
+        now = [datetime(2024, 1, 1)]
+        router = self.make_router(now)
+        router.probe()                      # first heartbeat on the primary
+        self.sync()
+
+        now[0] += timedelta(seconds=10)
+        health = router.probe()             # replicas hold the last beat
+        self.assertTrue(all(h["healthy"] for h in health.values()))
+        sync(self.primary, self.replicas[0])  # only replica 1 catches up
+
+        now[0] += timedelta(seconds=10)
+        health = router.probe()
+        lags = [h["lag"] for h in health.values()]
+        self.assertEqual(lags, [0.0, 10.0])
+        self.assertEqual(router.next_replica(), router.replicas[0])
+
+    def test_no_healthy_replica_falls_back_to_primary(self):
+        now = [datetime(2024, 1, 1)]
+        router = self.make_router(now)
+        router.probe()
+        now[0] += timedelta(seconds=10)
+        router.probe()                      # replicas never got a heartbeat
+        self.assertIsNone(router.next_replica())
+
+    def test_routing_does_not_probe(self):
+        """next_replica only reads the rotation; the timer probes"""
+        router = self.make_router([datetime(2024, 1, 1)])
+        primary = count_statements(db.engine)
+        replicas = [count_statements(e) for e in router.replicas]
+        for _ in range(3):
+            self.assertIn(router.next_replica(), router.replicas)
+        self.assertEqual(len(primary) + sum(map(len, replicas)), 0)
+
+    def test_one_probe_at_a_time(self):
+        """A probe started while another runs returns without probing"""
+        router = self.make_router([datetime(2024, 1, 1)])
+        entered, release = threading.Event(), threading.Event()
+        read_beat = router._read_beat
+
+        def slow_read_beat(engine, create=False):
+            entered.set()
+            release.wait(5)
+            return read_beat(engine, create)
+
+        with mock.patch.object(router, "_read_beat",
+                               side_effect=slow_read_beat) as reads:
+            worker = threading.Thread(target=router.probe)
+            worker.start()
+            entered.wait(5)
+            router.probe()
+            self.assertEqual(reads.call_count, 1)
+            release.set()
+            worker.join(5)
+        self.assertEqual(reads.call_count, 1 + len(router.replicas))
+
+    def test_app_router_probes_in_the_background(self):
+        self.assertFalse(self.router._thread.is_alive())
+        self.assertEqual(set(self.router.lag), set(self.router.replicas))
+        with db.engine.connect() as conn:
+            self.assertIsNotNone(conn.execute(heartbeat_table.select()).first())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,414 @@
+"""Tests for the repository implementations"""
+import unittest
+from datetime import datetime, timedelta
+
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.user import User
+from app.persistence.indexes import HashIndex, SortedIndex, UniqueIndex
+from app.persistence.repository import InMemoryRepository
+from app.persistence.sqlalchemy_repository import SQLAlchemyRepository
+
+
+class RepositoryContract:
+    """Scenarios every Repository implementation must pass"""
+
+    config_class = "config.TestingConfig"
+
+    def make_repo(self, model):
+        raise NotImplementedError
+
+    def setUp(self):
+        """Create an application context and an empty repository"""
+        self.app = create_app(self.config_class)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.repo = self.make_repo(Amenity)
+
+    def tearDown(self):
+        """Drop every table and leave the application context"""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def seed_amenities(self, count):
+        """Add *count* amenities with strictly increasing created_at"""
+        start = datetime(2024, 1, 1)
+        amenities = []
+        for i in range(count):
+            amenity = Amenity(name=f"Amenity {i:03d}")
+            amenity.created_at = start + timedelta(seconds=i)
+            self.repo.add(amenity)
+            amenities.append(amenity)
+        return amenities
+
+    def test_get_page_walks_every_object_once(self):
+        """Following next_cursor yields every object in order"""
+        amenities = self.seed_amenities(7)
+        seen, cursor = [], None
+        while True:
+            items, cursor = self.repo.get_page(cursor, limit=3)
+            seen.extend(a.id for a in items)
+            if cursor is None:
+                break
+        self.assertEqual(seen, [a.id for a in amenities])
+
+    def test_get_page_descending(self):
+        """-created_at returns the newest objects first"""
+        amenities = self.seed_amenities(4)
+        items, cursor = self.repo.get_page(limit=3, order_by="-created_at")
+        self.assertEqual([a.id for a in items], [a.id for a in amenities[:0:-1]])
+        items, cursor = self.repo.get_page(cursor, limit=3, order_by="-created_at")
+        self.assertEqual([a.id for a in items], [amenities[0].id])
+        self.assertIsNone(cursor)
+
+    def test_get_page_ties_broken_by_id(self):
+        """Objects sharing a created_at are neither skipped nor repeated"""
+        stamp = datetime(2024, 1, 1)
+        ids = []
+        for i in range(5):
+            amenity = Amenity(name=f"Tied {i}")
+            amenity.created_at = stamp
+            self.repo.add(amenity)
+            ids.append(amenity.id)
+        first, cursor = self.repo.get_page(limit=2)
+        rest, _ = self.repo.get_page(cursor, limit=10)
+        self.assertEqual([a.id for a in first + rest], sorted(ids))
+
+    def test_get_page_rejects_bad_arguments(self):
+        """Malformed cursors, limits and orderings raise ValueError"""
+        with self.assertRaises(ValueError):
+            self.repo.get_page("not-a-cursor")
+        with self.assertRaises(ValueError):
+            self.repo.get_page(limit=0)
+        with self.assertRaises(ValueError):
+            self.repo.get_page(order_by="name")
+
+    def test_iter_all_streams_in_chunks(self):
+        """iter_all yields every object exactly once"""
+        amenities = self.seed_amenities(5)
+        streamed = [a.id for a in self.repo.iter_all(chunk_size=2)]
+        self.assertEqual(sorted(streamed), sorted(a.id for a in amenities))
+
+    def test_iter_all_filters(self):
+        """iter_all applies equality filters"""
+        self.seed_amenities(3)
+        names = [a.name for a in self.repo.iter_all(filters={"name": "Amenity 001"})]
+        self.assertEqual(names, ["Amenity 001"])
+
+    def test_exists_and_count(self):
+        """exists/count evaluate equality criteria"""
+        self.seed_amenities(3)
+        self.assertTrue(self.repo.exists(name="Amenity 002"))
+        self.assertFalse(self.repo.exists(name="Sauna"))
+        self.assertEqual(self.repo.count(), 3)
+        self.assertEqual(self.repo.count(name="Amenity 000"), 1)
+
+    def test_get_columns(self):
+        """get_columns returns only the requested values"""
+        amenity = self.seed_amenities(1)[0]
+        self.assertEqual(
+            self.repo.get_columns(amenity.id, "name"), {"name": "Amenity 000"}
+        )
+        self.assertIsNone(self.repo.get_columns("missing-id", "name"))
+
+    def seed_places(self):
+        """Add one owner and four places with varied prices/descriptions"""
+        owner = User(first_name="O", last_name="W", email="o@example.com",
+                     password="secret1")
+        self.make_repo(User).add(owner)
+        places_repo = self.make_repo(Place)
+        for title, price, description in [
+            ("Beach house", 120.0, "Sea view"),
+            ("Beach hut", 40.0, None),
+            ("City loft", 90.0, "Central"),
+            ("Barn", 40.0, None),
+        ]:
+            places_repo.add(Place(title=title, price=price,
+                                  description=description, owner_id=owner.id))
+        return places_repo, owner
+
+    def test_find_operators(self):
+        """eq/in/range/prefix/null operators each narrow the result"""
+        places, owner = self.seed_places()
+
+        def titles(**kwargs):
+            return [p.title for p in places.find(order_by="title", **kwargs)]
+
+        self.assertEqual(titles(filters={"price": 40.0}), ["Barn", "Beach hut"])
+        self.assertEqual(titles(filters={"title__in": ["Barn", "Nope"]}), ["Barn"])
+        self.assertEqual(
+            titles(filters={"price__gte": 40.0, "price__lt": 100.0}),
+            ["Barn", "Beach hut", "City loft"],
+        )
+        self.assertEqual(titles(filters={"title__prefix": "Beach"}),
+                         ["Beach house", "Beach hut"])
+        self.assertEqual(titles(filters={"description__isnull": True}),
+                         ["Barn", "Beach hut"])
+        self.assertEqual(titles(filters={"owner_id": owner.id, "price__ne": 40.0}),
+                         ["Beach house", "City loft"])
+
+    def test_find_sort_and_slice(self):
+        """order_by supports several keys and descending order"""
+        places, _ = self.seed_places()
+        found = places.find(order_by=["price", "-title"], limit=2, offset=1)
+        self.assertEqual([p.title for p in found], ["Barn", "City loft"])
+
+    def test_find_rejects_unknown_operator(self):
+        with self.assertRaises(ValueError):
+            self.repo.find({"name__like": "x"})
+
+    def test_get_page_with_filters(self):
+        """Keyset pages honour find()-style filters"""
+        places, _ = self.seed_places()
+        items, cursor = places.get_page(limit=10, filters={"price__lte": 90.0})
+        self.assertEqual(sorted(p.title for p in items),
+                         ["Barn", "Beach hut", "City loft"])
+        self.assertIsNone(cursor)
+
+    def test_get_many_keeps_order_and_reports_missing(self):
+        """get_many follows input order and lists unknown ids"""
+        amenities = self.seed_amenities(5)
+        wanted = [amenities[3].id, "missing-id", amenities[0].id, amenities[3].id]
+        found, missing = self.repo.get_many(wanted, chunk_size=2)
+        self.assertEqual([a.id for a in found], [amenities[3].id, amenities[0].id])
+        self.assertEqual(missing, ["missing-id"])
+
+    def test_add_many_returns_ids_in_order(self):
+        """add_many stores every object and returns ids in input order"""
+        amenities = [Amenity(name=f"Bulk {i}") for i in range(5)]
+        ids = self.repo.add_many(amenities, chunk_size=2)
+        self.assertEqual(ids, [a.id for a in amenities])
+        self.assertEqual(len(self.repo.get_all()), 5)
+
+    def test_update_many_skips_unknown_ids(self):
+        """update_many applies known ids and counts only those"""
+        amenities = self.seed_amenities(3)
+        count = self.repo.update_many({
+            amenities[0].id: {"name": "Renamed"},
+            "missing-id": {"name": "Ghost"},
+        }, chunk_size=1)
+        self.assertEqual(count, 1)
+        self.assertEqual(self.repo.get(amenities[0].id).name, "Renamed")
+
+    def test_update_many_runs_model_validators(self):
+        """Rows are checked like update(): bad values raise, nothing is written"""
+        users = self.make_repo(User)
+        user = User(first_name="Ada", last_name="L", email="ada@example.com",
+                    password="secret1")
+        users.add(user)
+        with self.assertRaises(ValueError):
+            users.update_many({user.id: {"email": ""}})
+        self.assertEqual(users.get(user.id).email, "ada@example.com")
+        users.update_many({user.id: {"email": "ADA@Example.org", "nickname": "x"}})
+        self.assertEqual(users.get(user.id).email, "ada@example.org")
+
+    def test_increment_adds_to_the_stored_values(self):
+        """increment is relative and recomputes ratio columns"""
+        places, _ = self.seed_places()
+        place_id = places.find({"title": "Barn"})[0].id
+        ratings = {"review_count": 2, "rating_sum": 7}
+        self.assertTrue(places.increment(place_id, ratings, Place.RATING_AVERAGE))
+        self.assertTrue(places.increment(place_id, {"review_count": -1,
+                                                    "rating_sum": -5},
+                                         Place.RATING_AVERAGE))
+        self.assertEqual(
+            places.get_columns(place_id, *Place.RATING_FIELDS),
+            {"review_count": 1, "rating_sum": 2, "rating_avg": 2.0},
+        )
+        places.increment(place_id, {"review_count": -1, "rating_sum": -2},
+                         Place.RATING_AVERAGE)
+        self.assertIsNone(places.get_columns(place_id, "rating_avg")["rating_avg"])
+        self.assertFalse(places.increment("missing-id", ratings))
+
+    def test_delete_many(self):
+        """delete_many removes the listed ids and reports how many"""
+        amenities = self.seed_amenities(4)
+        count = self.repo.delete_many(
+            [amenities[0].id, amenities[2].id, "missing-id"], chunk_size=2
+        )
+        self.assertEqual(count, 2)
+        self.assertEqual(
+            sorted(a.id for a in self.repo.get_all()),
+            sorted([amenities[1].id, amenities[3].id]),
+        )
+
+
+class TestInMemoryRepository(RepositoryContract, unittest.TestCase):
+    """Contract tests for InMemoryRepository"""
+
+    def make_repo(self, model):
+        return InMemoryRepository()
+
+    def test_get_all_snapshot_is_reused_until_a_write(self):
+        """get_all returns the same immutable tuple until something changes"""
+        amenities = self.seed_amenities(3)
+        first = self.repo.get_all()
+        self.assertIsInstance(first, tuple)
+        self.assertIs(self.repo.get_all(), first)
+        version = self.repo.version
+        self.repo.update(amenities[0].id, {"name": "Renamed"})
+        self.assertGreater(self.repo.version, version)
+        self.assertIsNot(self.repo.get_all(), first)
+        self.repo.delete(amenities[1].id)
+        self.assertEqual(len(self.repo.get_all()), 2)
+
+    def test_snapshot_pages_match_filtered_pages(self):
+        """The snapshot fast path pages exactly like the filtered path"""
+        self.seed_amenities(7)
+        for order_by in ("created_at", "-created_at"):
+            pages = {}
+            for filters in (None, {"name__prefix": "Amenity"}):
+                cursor, ids = None, []
+                while True:
+                    items, cursor = self.repo.get_page(
+                        cursor, limit=3, order_by=order_by, filters=filters)
+                    ids.append([a.id for a in items])
+                    if cursor is None:
+                        break
+                pages[bool(filters)] = ids
+            self.assertEqual(pages[False], pages[True])
+
+
+class TestIndexedInMemoryRepository(RepositoryContract, unittest.TestCase):
+    """Contract tests for InMemoryRepository with secondary indexes"""
+
+    INDEXES = {
+        Amenity: lambda: [UniqueIndex("name")],
+        User: lambda: [UniqueIndex("email")],
+        Place: lambda: [HashIndex("owner_id"), HashIndex("title"),
+                        SortedIndex("price")],
+    }
+
+    def make_repo(self, model):
+        return InMemoryRepository(indexes=self.INDEXES[model]())
+
+    def test_unique_index_rejects_duplicates(self):
+        """add/update/add_many refuse a second holder of a unique value"""
+        wifi = Amenity(name="Wifi")
+        self.repo.add(wifi)
+        with self.assertRaises(ValueError):
+            self.repo.add(Amenity(name="Wifi"))
+        pool = Amenity(name="Pool")
+        self.repo.add(pool)
+        with self.assertRaises(ValueError):
+            self.repo.update(pool.id, {"name": "Wifi"})
+        self.assertEqual(pool.name, "Pool")
+        with self.assertRaises(ValueError):
+            self.repo.add_many([Amenity(name="Sauna"), Amenity(name="Sauna")])
+        self.assertEqual(self.repo.count(), 2)
+
+    def test_indexes_follow_writes(self):
+        """Lookups see updates and deletes"""
+        wifi = Amenity(name="Wifi")
+        self.repo.add(wifi)
+        self.repo.update(wifi.id, {"name": "Fast Wifi"})
+        self.assertIsNone(self.repo.get_by_attribute("name", "Wifi"))
+        self.assertIs(self.repo.get_by_attribute("name", "Fast Wifi"), wifi)
+        self.repo.delete(wifi.id)
+        self.assertIsNone(self.repo.get_by_attribute("name", "Fast Wifi"))
+        self.repo.add(Amenity(name="Fast Wifi"))
+
+    def test_range_lookup_skips_the_scan(self):
+        """A sorted index answers range filters without reading other rows"""
+        places, _ = self.seed_places()
+        self.assertEqual(
+            sorted(p.title for p in places._index_candidates(
+                [("price", "gt", 40.0), ("price", "lte", 120.0)])),
+            ["Beach house", "City loft"],
+        )
+        self.assertIsNone(places._index_candidates([("description", "eq", None)]))
+
+
+class TestSQLAlchemyRepository(RepositoryContract, unittest.TestCase):
+    """Contract tests for SQLAlchemyRepository"""
+
+    def make_repo(self, model):
+        return SQLAlchemyRepository(model)
+
+    def test_iter_all_expunges_finished_chunks(self):
+        """Chunks already consumed are no longer held by the session"""
+        self.seed_amenities(5)
+        db.session.expunge_all()
+        stream = self.repo.iter_all(chunk_size=2)
+        first = next(stream)
+        self.assertIn(first, db.session)
+        for _ in range(2):
+            next(stream)
+        self.assertNotIn(first, db.session)
+        stream.close()
+
+
+class TestListPagination(unittest.TestCase):
+    """Test the paginated list endpoints"""
+
+    def setUp(self):
+        """Set up test client with a few amenities"""
+        self.app = create_app("config.TestingConfig")
+        self.app.config["PAGE_SIZE_MAX"] = 2
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.client = self.app.test_client()
+        repo = SQLAlchemyRepository(Amenity)
+        for name in ("Wi-Fi", "Pool", "Parking"):
+            repo.add(Amenity(name=name))
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_limit_is_capped_and_next_link_followed(self):
+        """The page size is capped and the Link header leads to the rest"""
+        response = self.client.get("/api/v1/amenities/?limit=50")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()), 2)
+        self.assertIn('rel="next"', response.headers["Link"])
+
+        cursor = response.headers["X-Next-Cursor"]
+        response = self.client.get(f"/api/v1/amenities/?cursor={cursor}")
+        self.assertEqual(len(response.get_json()), 1)
+        self.assertNotIn("Link", response.headers)
+
+    def test_filters_are_pushed_down(self):
+        """Query-string filters reach the repository; bad values are 400s"""
+        owner = User(first_name="O", last_name="W", email="o@example.com",
+                     password="secret1")
+        SQLAlchemyRepository(User).add(owner)
+        SQLAlchemyRepository(Place).add_many([
+            Place(title="Cheap", price=20.0, owner_id=owner.id),
+            Place(title="Dear", price=200.0, owner_id=owner.id),
+        ])
+        response = self.client.get("/api/v1/places/?min_price=100")
+        self.assertEqual([p["title"] for p in response.get_json()], ["Dear"])
+        response = self.client.get("/api/v1/places/?min_price=lots")
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_lookup_by_ids(self):
+        """?ids= returns the requested objects and flags missing ones"""
+        listing = self.client.get("/api/v1/amenities/?limit=2").get_json()
+        ids = [listing[1]["id"], listing[0]["id"]]
+        response = self.client.get(f"/api/v1/amenities/?ids={','.join(ids)}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([a["id"] for a in response.get_json()], ids)
+        self.assertNotIn("X-Missing-Ids", response.headers)
+
+        response = self.client.get(f"/api/v1/amenities/?ids={ids[0]},missing-id")
+        self.assertEqual(len(response.get_json()), 1)
+        self.assertEqual(response.headers["X-Missing-Ids"], "missing-id")
+
+        too_many = ",".join(f"id{i}" for i in range(3))
+        response = self.client.get(f"/api/v1/amenities/?ids={too_many}")
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_cursor(self):
+        """A tampered cursor is a 400, not a 500"""
+        response = self.client.get("/api/v1/amenities/?cursor=garbage")
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
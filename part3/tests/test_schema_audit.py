@@ -0,0 +1,83 @@
+"""Tests for the declared indexes and the index audit"""
+import unittest
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from app import create_app, db
+from app.models.review import Review
+from app.persistence.schema_audit import audit
+from app.services.facade import HBnBFacade
+
+
+class TestSchemaAudit(unittest.TestCase):
+    """Audit the facade's queries against a small populated database"""
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.facade = HBnBFacade()
+        owner = self.facade.create_user({"first_name": "O", "last_name": "W",
+                                         "email": "owner@example.com",
+                                         "password": "secret1"})
+        guest = self.facade.create_user({"first_name": "G", "last_name": "U",
+                                         "email": "guest@example.com",
+                                         "password": "secret1"})
+        place = self.facade.create_place({"title": "Loft", "price": 80.0,
+                                          "owner_id": owner.id})
+        self.facade.create_review({"text": "Nice", "rating": 5,
+                                   "user_id": guest.id,
+                                   "place_id": place.id})
+        self.facade.create_amenity({"name": "Wi-Fi"})
+        self.guest_id, self.place_id = guest.id, place.id
+        db.session.remove()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_foreign_keys_are_indexed(self):
+        """Every foreign key column leads some index"""
+        inspector = inspect(db.engine)
+        for table in ("places", "reviews", "place_amenity"):
+            leading = {index["column_names"][0]
+                       for index in inspector.get_indexes(table)}
+            leading.update(constraint["column_names"][0] for constraint
+                           in inspector.get_unique_constraints(table))
+            leading.add(inspector.get_pk_constraint(table)["constrained_columns"][0])
+            for fk in inspector.get_foreign_keys(table):
+                self.assertIn(fk["constrained_columns"][0], leading,
+                              f"{table}.{fk['constrained_columns'][0]}")
+
+    def test_no_full_scans(self):
+        findings = audit(self.facade)
+        self.assertGreater(len(findings), 20)
+        scans = [(f["scenario"], f["plan"]) for f in findings if f["full_scans"]]
+        self.assertEqual(scans, [])
+
+    def test_missing_index_is_flagged(self):
+        with db.engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_reviews_place_created"))
+        findings = audit(self.facade)
+        flagged = {f["scenario"] for f in findings if f["full_scans"]}
+        self.assertIn("count_place_reviews", flagged)
+
+    def test_cli_command(self):
+        result = self.app.test_cli_runner().invoke(args=["audit-indexes"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("0 full scans", result.output)
+
+    def test_unique_review_per_user_and_place(self):
+        """The database refuses a duplicate even past the facade"""
+        db.session.add(Review(text="Again", rating=4, user_id=self.guest_id,
+                              place_id=self.place_id))
+        with self.assertRaises(IntegrityError):
+            db.session.flush()
+        db.session.rollback()
+
+
+if __name__ == "__main__":
+    unittest.main()
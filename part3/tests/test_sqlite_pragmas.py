@@ -0,0 +1,60 @@
+"""Tests for the SQLite pragma profile"""
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+
+from app import create_app, db
+from app.persistence.sqlite_pragmas import apply_sqlite_pragmas, optimize
+from config import TestingConfig
+
+
+class TestSqlitePragmas(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        path = os.path.join(self.tmp, "hbnb.db")
+
+        class FileConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+
+        self.app = create_app(FileConfig)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+        shutil.rmtree(self.tmp)
+
+    def pragma(self, name):
+        with db.engine.connect() as conn:
+            return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+    def test_profile_is_applied_on_connect(self):
+        self.assertEqual(self.pragma("journal_mode"), "wal")
+        self.assertEqual(self.pragma("synchronous"), 1)  # NORMAL
+        self.assertEqual(self.pragma("temp_store"), 2)   # MEMORY
+        self.assertEqual(self.pragma("busy_timeout"), 5000)
+        self.assertEqual(self.pragma("cache_size"), -64000)
+
+    def test_optimize_runs(self):
+        db.create_all()
+        optimize(db.engine)
+
+    def test_non_sqlite_engines_are_skipped(self):
+        engine = SimpleNamespace(dialect=SimpleNamespace(name="mysql"))
+        self.assertFalse(apply_sqlite_pragmas(engine, {"journal_mode": "WAL"}))
+
+    def test_invalid_pragma_name(self):
+        engine = create_engine("sqlite://")
+        with self.assertRaises(ValueError):
+            apply_sqlite_pragmas(engine, {"journal_mode; DROP": "WAL"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+"""Tests for the single-writer group-commit dispatcher"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.persistence.unit_of_work import commit_count, reset_commit_count
+from app.persistence.write_dispatcher import write_dispatcher
+from app.services.facade import HBnBFacade
+from config import TestingConfig
+
+
+class DispatcherTestCase(unittest.TestCase):
+    """A file-backed app with the write dispatcher enabled"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        path = os.path.join(self.tmp, "hbnb.db")
+
+        class DispatcherConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+            WRITE_DISPATCHER_ENABLED = True
+            WRITE_DISPATCHER_MAX_WAIT_MS = 20
+
+        self.app = create_app(DispatcherConfig)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.dispatcher = write_dispatcher()
+        self.facade = HBnBFacade()
+
+    def tearDown(self):
+        self.dispatcher.close()
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+        shutil.rmtree(self.tmp)
+
+
+class TestWriteDispatcher(DispatcherTestCase):
+
+    def test_disabled_by_default(self):
+        app = create_app("config.TestingConfig")
+        with app.app_context():
+            self.assertIsNone(write_dispatcher())
+
+    def test_write_runs_on_writer_thread(self):
+        """The result comes back attached to the caller's session"""
+        amenity = self.facade.create_amenity({"name": "Wifi"})
+        self.assertIn(amenity, db.session)
+        self.assertEqual(self.dispatcher.stats()["operations"], 1)
+        db.session.remove()
+        self.assertEqual(Amenity.query.count(), 1)
+
+    def test_errors_reach_the_caller(self):
+        with self.assertRaises(ValueError):
+            self.facade.create_place({"title": "Loft", "price": 1.0,
+                                      "owner_id": "missing"})
+        amenity = self.facade.create_amenity({"name": "Wifi"})
+        self.assertEqual(self.facade.get_amenity(amenity.id).name, "Wifi")
+
+    def test_failure_in_a_batch_only_fails_that_operation(self):
+        owner = self.facade.create_user({
+            "first_name": "Owner", "last_name": "User",
+            "email": "owner@example.com", "password": "secret1",
+        })
+        futures = [
+            self.dispatcher.submit(self.facade.create_place,
+                                   {"title": "Loft", "price": 1.0,
+                                    "owner_id": owner.id}),
+            self.dispatcher.submit(self.facade.create_place,
+                                   {"title": "Bad", "price": 1.0,
+                                    "owner_id": "missing"}),
+            self.dispatcher.submit(self.facade.create_amenity, {"name": "Wifi"}),
+        ]
+        self.assertEqual(futures[0].result(5).title, "Loft")
+        self.assertIsInstance(futures[1].exception(5), ValueError)
+        self.assertEqual(futures[2].result(5).name, "Wifi")
+
+    def test_update_is_visible_to_the_caller(self):
+        amenity = self.facade.create_amenity({"name": "Wifi"})
+        self.facade.update_amenity(amenity.id, {"name": "Pool"})
+        self.assertEqual(self.facade.get_amenity(amenity.id).name, "Pool")
+
+    def test_request_writes_stay_in_the_request_unit(self):
+        """A write followed by an error response is rolled back"""
+        @self.app.route("/write-then-fail", methods=["POST"])
+        def write_then_fail():
+            self.facade.create_amenity({"name": "Wifi"})
+            return {"error": "rejected"}, 400
+
+        response = self.app.test_client().post("/write-then-fail")
+        self.assertEqual(response.status_code, 400)
+        db.session.remove()
+        self.assertEqual(Amenity.query.count(), 0)
+        self.assertEqual(self.dispatcher.stats()["operations"], 0)
+
+    def test_concurrent_writes_are_group_committed(self):
+        """Writes from many threads share commits and none fails"""
+        errors = []
+        barrier = threading.Barrier(8)
+
+        def worker(n):
+            with self.app.app_context():
+                barrier.wait()
+                try:
+                    for i in range(5):
+                        self.facade.create_amenity({"name": f"A{n}-{i}"})
+                except Exception as exc:  # pragma: no cover - reported below
+                    errors.append(exc)
+                finally:
+                    db.session.remove()
+
+        reset_commit_count()
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(Amenity.query.count(), 40)
+        self.assertLess(commit_count(), 40)
+        self.assertEqual(self.dispatcher.stats()["operations"], 40)
+
+
+if __name__ == "__main__":
+    unittest.main()